@@ -0,0 +1,370 @@
+"""
+Eye Texture Atlas Builder for Experimental Theatre Digital Program
+
+This module handles:
+- Incremental packing of eye crops into fixed-size sprite sheets (texture atlases)
+- A grid of equal slots per sheet; new eyes take the first free slot, nothing is repacked
+- A UV manifest mapping every eye crop to its sheet and texture coordinates
+- Persistence of sheets and manifest so atlases survive restarts, written by a
+  background thread so detection workers never encode sheets
+- Synchronisation with the cropped eyes directory (add missing crops, free deleted ones)
+
+Clients fetch the manifest plus a handful of sheets instead of one request
+and one texture upload per eye. UVs follow the OpenGL/three.js convention:
+origin bottom-left, v increasing upwards.
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MANIFEST_FORMAT_VERSION = 1
+MANIFEST_FILENAME = 'atlas_manifest.json'
+
+
+class EyeAtlasBuilder:
+    def __init__(self, atlas_dir, atlas_size: int = 2048, slot_size=(128, 64),
+                 jpeg_quality: int = 92, save_interval: float = 2.0):
+        """
+        Initialize the atlas builder
+
+        Args:
+            atlas_dir: Directory holding the sheet images and the manifest
+            atlas_size: Width and height of every sheet in pixels
+            slot_size: (width, height) of one slot; crops are fitted and centred in it
+            jpeg_quality: JPEG quality of the written sheets
+            save_interval: Seconds between background writes of changed sheets (see start)
+        """
+        self.atlas_dir = Path(atlas_dir)
+        self.atlas_dir.mkdir(parents=True, exist_ok=True)
+        self.atlas_size = int(atlas_size)
+        self.slot_width, self.slot_height = (int(v) for v in slot_size)
+        self.jpeg_quality = jpeg_quality
+        self.save_interval = save_interval
+
+        self.columns = self.atlas_size // self.slot_width
+        self.rows = self.atlas_size // self.slot_height
+        self.slots_per_sheet = self.columns * self.rows
+        if self.slots_per_sheet == 0:
+            raise Exception(f"Atlas slot {slot_size} does not fit in a {atlas_size}px sheet")
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # One flush (encode, write, replace) at a time
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._sheets: List[np.ndarray] = []
+        self._sheet_versions: List[int] = []
+        self._dirty_sheets = set()
+        self._manifest_dirty = False
+        self._last_save = 0.0
+
+        # filename -> {'sheet', 'slot', 'x', 'y', 'width', 'height', 'uv'}
+        self.entries: Dict[str, Dict] = {}
+        # Free slot indices per sheet (kept sorted so sheets fill top-left first)
+        self._free_slots: List[List[int]] = []
+
+        self._load()
+
+    def _sheet_path(self, sheet_index: int) -> Path:
+        return self.atlas_dir / f"atlas_{sheet_index}.jpg"
+
+    def _new_sheet(self):
+        """Append an empty (black) sheet (caller holds the lock)"""
+        self._sheets.append(np.zeros((self.atlas_size, self.atlas_size, 3), dtype=np.uint8))
+        self._sheet_versions.append(0)
+        self._free_slots.append(list(range(self.slots_per_sheet)))
+
+    def _load(self):
+        """Restore sheets and manifest written by a previous run"""
+        manifest_path = self.atlas_dir / MANIFEST_FILENAME
+        try:
+            if not manifest_path.exists():
+                return
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+
+            layout = (manifest.get('atlas_size'), manifest.get('slot_width'), manifest.get('slot_height'))
+            if (manifest.get('version') != MANIFEST_FORMAT_VERSION
+                    or layout != (self.atlas_size, self.slot_width, self.slot_height)):
+                logger.info("Atlas layout changed - rebuilding atlases from scratch")
+                return
+
+            for sheet in manifest.get('sheets', []):
+                img = cv2.imread(str(self._sheet_path(sheet['index'])))
+                if img is None or img.shape[:2] != (self.atlas_size, self.atlas_size):
+                    logger.warning("Atlas sheet missing or damaged - rebuilding atlases from scratch")
+                    self._sheets, self._sheet_versions, self._free_slots = [], [], []
+                    return
+                self._sheets.append(img)
+                self._sheet_versions.append(sheet.get('version', 0))
+                self._free_slots.append(list(range(self.slots_per_sheet)))
+
+            for filename, entry in manifest.get('entries', {}).items():
+                if entry['sheet'] < len(self._sheets):
+                    self.entries[filename] = entry
+                    self._free_slots[entry['sheet']].remove(entry['slot'])
+
+            logger.info(f"Loaded {len(self._sheets)} eye atlas sheets with {len(self.entries)} eyes")
+        except Exception as e:
+            logger.error(f"Error loading eye atlas manifest: {e}")
+            self._sheets, self._sheet_versions, self._free_slots = [], [], []
+            self.entries = {}
+
+    def _slot_origin(self, slot: int):
+        """Top-left pixel of a slot within its sheet"""
+        return (slot % self.columns) * self.slot_width, (slot // self.columns) * self.slot_height
+
+    def _fit(self, eye_img: np.ndarray) -> np.ndarray:
+        """Scale a crop down (never up) to fit a slot, preserving aspect ratio"""
+        height, width = eye_img.shape[:2]
+        scale = min(self.slot_width / width, self.slot_height / height, 1.0)
+        if scale < 1.0:
+            size = (max(1, int(width * scale)), max(1, int(height * scale)))
+            eye_img = cv2.resize(eye_img, size, interpolation=cv2.INTER_AREA)
+        if eye_img.ndim == 2:
+            eye_img = cv2.cvtColor(eye_img, cv2.COLOR_GRAY2BGR)
+        return eye_img
+
+    def add(self, filename: str, eye_img: np.ndarray) -> Optional[Dict]:
+        """
+        Place an eye crop in the first free slot (or overwrite its existing slot)
+
+        Args:
+            filename: Eye crop filename (manifest key)
+            eye_img: BGR crop pixels
+
+        Returns:
+            The manifest entry of the crop
+        """
+        if eye_img is None or eye_img.size == 0:
+            return None
+
+        fitted = self._fit(eye_img)
+        height, width = fitted.shape[:2]
+
+        with self._lock:
+            entry = self.entries.get(filename)
+            if entry is None:
+                sheet_index = next((i for i, free in enumerate(self._free_slots) if free), None)
+                if sheet_index is None:
+                    self._new_sheet()
+                    sheet_index = len(self._sheets) - 1
+                slot = self._free_slots[sheet_index].pop(0)
+            else:
+                sheet_index, slot = entry['sheet'], entry['slot']
+
+            slot_x, slot_y = self._slot_origin(slot)
+            x = slot_x + (self.slot_width - width) // 2
+            y = slot_y + (self.slot_height - height) // 2
+
+            sheet = self._sheets[sheet_index]
+            sheet[slot_y:slot_y + self.slot_height, slot_x:slot_x + self.slot_width] = 0
+            sheet[y:y + height, x:x + width] = fitted
+
+            entry = {
+                'sheet': sheet_index,
+                'slot': slot,
+                'x': x,
+                'y': y,
+                'width': width,
+                'height': height,
+                'uv': [
+                    round(x / self.atlas_size, 6),
+                    round(1.0 - (y + height) / self.atlas_size, 6),
+                    round((x + width) / self.atlas_size, 6),
+                    round(1.0 - y / self.atlas_size, 6)
+                ]
+            }
+            self.entries[filename] = entry
+            self._mark_dirty(sheet_index)
+
+        return dict(entry)
+
+    def remove(self, filename: str) -> bool:
+        """Free and clear the slot of an eye crop"""
+        with self._lock:
+            entry = self.entries.pop(filename, None)
+            if entry is None:
+                return False
+            slot_x, slot_y = self._slot_origin(entry['slot'])
+            self._sheets[entry['sheet']][slot_y:slot_y + self.slot_height,
+                                         slot_x:slot_x + self.slot_width] = 0
+            free = self._free_slots[entry['sheet']]
+            free.append(entry['slot'])
+            free.sort()
+            self._mark_dirty(entry['sheet'])
+        return True
+
+    def _mark_dirty(self, sheet_index: int):
+        """
+        Flag a sheet for writing (caller holds the lock)
+
+        The sheet version is bumped on the first change after a write, so URLs
+        handed out before the write already point at the new content; the
+        Flask routes flush before serving.
+        """
+        if sheet_index not in self._dirty_sheets:
+            self._dirty_sheets.add(sheet_index)
+            self._sheet_versions[sheet_index] += 1
+        self._manifest_dirty = True
+
+    def get_entry(self, filename: str) -> Optional[Dict]:
+        """Get the manifest entry of an eye crop, with the URL of its sheet"""
+        with self._lock:
+            entry = self.entries.get(filename)
+            if entry is None:
+                return None
+            return dict(entry, url=self._sheet_url(entry['sheet']))
+
+    def _sheet_url(self, sheet_index: int) -> str:
+        """Sheet URL including its version, so clients refetch changed sheets (caller holds the lock)"""
+        return f"/atlas/{sheet_index}.jpg?v={self._sheet_versions[sheet_index]}"
+
+    def sync(self, cropped_eyes_dir, extensions=('.jpg', '.jpeg', '.png')) -> Dict:
+        """
+        Bring the atlases in line with the crops on disk
+
+        Crops missing from the atlases are added; entries whose crop file was
+        deleted are freed.
+
+        Returns:
+            Dictionary with the number of added and removed crops
+        """
+        cropped_eyes_dir = Path(cropped_eyes_dir)
+        on_disk = {path.name for path in cropped_eyes_dir.iterdir()
+                   if path.is_file() and path.suffix.lower() in extensions}
+
+        with self._lock:
+            known = set(self.entries)
+
+        removed = [name for name in known - on_disk if self.remove(name)]
+        added = 0
+        for name in sorted(on_disk - known):
+            img = cv2.imread(str(cropped_eyes_dir / name))
+            if img is not None and self.add(name, img) is not None:
+                added += 1
+
+        if added or removed:
+            logger.info(f"Eye atlas sync: {added} crops added, {len(removed)} removed")
+            self.flush()
+        return {'added': added, 'removed': len(removed)}
+
+    def start(self):
+        """Start the background thread writing changed sheets every save_interval seconds"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._flush_loop, name='eye-atlas-flush', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and write pending changes"""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(self.save_interval):
+            self.flush()
+
+    def flush(self):
+        """
+        Write changed sheets and the manifest to disk
+
+        Flushes run one at a time, so the files on disk always come from the
+        latest snapshot. Only the sheet copy happens under the slot lock;
+        adding crops is not blocked while sheets are encoded.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty_sheets and not self._manifest_dirty:
+                    return
+                dirty = sorted(self._dirty_sheets)
+                self._dirty_sheets.clear()
+                self._manifest_dirty = False
+                self._last_save = time.time()
+
+                # Copy under the lock so a sheet is never written half-updated
+                snapshots = {sheet_index: self._sheets[sheet_index].copy() for sheet_index in dirty}
+                manifest = self._build_manifest()
+
+            encoded = {}
+            for sheet_index, sheet in snapshots.items():
+                success, data = cv2.imencode('.jpg', sheet, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+                if success:
+                    encoded[sheet_index] = data
+            self._write(encoded, manifest)
+
+    def _write(self, encoded: Dict, manifest: Dict):
+        """Write encoded sheets, then the manifest that refers to them (caller holds the flush lock)"""
+        try:
+            for sheet_index, data in encoded.items():
+                sheet_path = self._sheet_path(sheet_index)
+                tmp_path = sheet_path.with_suffix('.tmp')
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, sheet_path)
+
+            manifest_path = self.atlas_dir / MANIFEST_FILENAME
+            tmp_path = manifest_path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, manifest_path)
+        except Exception as e:
+            logger.error(f"Error writing eye atlases: {e}")
+
+    def _build_manifest(self) -> Dict:
+        """Build the UV manifest (caller holds the lock)"""
+        return {
+            'version': MANIFEST_FORMAT_VERSION,
+            'atlas_size': self.atlas_size,
+            'slot_width': self.slot_width,
+            'slot_height': self.slot_height,
+            'sheets': [
+                {'index': i, 'version': version, 'url': self._sheet_url(i)}
+                for i, version in enumerate(self._sheet_versions)
+            ],
+            'entries': {filename: dict(entry) for filename, entry in self.entries.items()}
+        }
+
+    def get_manifest(self) -> Dict:
+        """Get the current UV manifest, writing pending changes first"""
+        self.flush()
+        with self._lock:
+            return self._build_manifest()
+
+    def get_sheet_path(self, sheet_index: int) -> Optional[Path]:
+        """Get the file of a sheet, writing pending changes first"""
+        self.flush()
+        with self._lock:
+            if not 0 <= sheet_index < len(self._sheets):
+                return None
+        return self._sheet_path(sheet_index)
+
+    def get_stats(self) -> Dict:
+        """Get sheet count and slot usage"""
+        with self._lock:
+            total_slots = len(self._sheets) * self.slots_per_sheet
+            return {
+                'sheets': len(self._sheets),
+                'eyes': len(self.entries),
+                'slots_per_sheet': self.slots_per_sheet,
+                'free_slots': sum(len(free) for free in self._free_slots),
+                'fill_ratio': round(len(self.entries) / total_slots, 3) if total_slots else 0.0
+            }
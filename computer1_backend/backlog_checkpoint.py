@@ -0,0 +1,163 @@
+"""
+Startup Backlog Checkpoint for Experimental Theatre Digital Program
+
+This module handles:
+- Persistent record of which originals have been processed (by name and file
+  signature: size, mtime, ctime and inode) and the eye crops they produced
+- Resuming the startup backlog after a restart instead of starting over
+- Starting over when the detection parameters fingerprint changes
+- Pruning entries of originals that no longer exist; originals whose crops were
+  deleted are processed again
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FORMAT_VERSION = 2
+
+
+def file_signature(path) -> Optional[Tuple[int, int, int, int]]:
+    """
+    (size, mtime_ns, ctime_ns, inode) of a file, or None if it does not exist
+
+    ctime and inode tell a file apart from one copied over it with the same
+    size and (preserved) mtime.
+    """
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_ino
+
+
+class BacklogCheckpoint:
+    def __init__(self, checkpoint_file, cropped_eyes_dir, save_interval: float = 2.0):
+        """
+        Initialize the checkpoint
+
+        Args:
+            checkpoint_file: JSON file used to persist the processed originals
+            cropped_eyes_dir: Directory holding the eye crops of processed originals
+            save_interval: Minimum seconds between automatic saves to disk
+        """
+        self.checkpoint_file = Path(checkpoint_file)
+        self.cropped_eyes_dir = Path(cropped_eyes_dir)
+        self.save_interval = save_interval
+
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # Serializes writers of the shared .tmp file
+        self._dirty = False
+        self._last_save = 0.0
+
+        data = self._load()
+        self.fingerprint: Optional[str] = data['fingerprint']
+        self.done: Dict[str, Dict] = data['done']  # name -> {'signature', 'eyes'}
+
+    def _load(self) -> Dict:
+        """Load the checkpoint from its JSON file"""
+        empty = {'version': CHECKPOINT_FORMAT_VERSION, 'fingerprint': None, 'done': {}}
+        try:
+            if self.checkpoint_file.exists():
+                with open(self.checkpoint_file, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') == CHECKPOINT_FORMAT_VERSION:
+                    data.setdefault('done', {})
+                    data.setdefault('fingerprint', None)
+                    logger.info(f"Loaded backlog checkpoint with {len(data['done'])} processed originals")
+                    return data
+                logger.info("Backlog checkpoint format changed - starting over")
+        except Exception as e:
+            logger.error(f"Error loading backlog checkpoint: {e}")
+        return empty
+
+    def save(self):
+        """Write the checkpoint to disk atomically; concurrent callers write one after another"""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = {
+                    'version': CHECKPOINT_FORMAT_VERSION,
+                    'fingerprint': self.fingerprint,
+                    'done': dict(self.done)
+                }
+                self._dirty = False
+                self._last_save = time.time()
+
+            try:
+                self.checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.checkpoint_file.with_suffix('.tmp')
+                with open(tmp_file, 'w') as f:
+                    json.dump(data, f)
+                os.replace(tmp_file, self.checkpoint_file)
+            except Exception as e:
+                logger.error(f"Error saving backlog checkpoint: {e}")
+
+    def begin(self, fingerprint: str, existing_names: Iterable[str]):
+        """
+        Prepare for a backlog run
+
+        Forgets every original if the detection parameters changed, and
+        entries of originals that were deleted since the last run.
+        """
+        existing = set(existing_names)
+        with self._lock:
+            if self.fingerprint != fingerprint:
+                if self.done:
+                    logger.info("Detection parameters changed - reprocessing all originals")
+                self.done = {}
+                self.fingerprint = fingerprint
+                self._dirty = True
+            stale = [name for name in self.done if name not in existing]
+            for name in stale:
+                del self.done[name]
+            if stale:
+                self._dirty = True
+        self.save()
+
+    def reset(self):
+        """Forget every processed original (the next run starts over)"""
+        with self._lock:
+            self.done = {}
+            self._dirty = True
+        self.save()
+
+    def is_done(self, name: str, signature) -> bool:
+        """
+        Whether an original with this name and file_signature was already
+        processed and all of its eye crops still exist
+        """
+        if signature is None:
+            return False
+        with self._lock:
+            entry = self.done.get(name)
+        if entry is None or entry['signature'] != list(signature):
+            return False
+        return all((self.cropped_eyes_dir / filename).exists() for filename in entry['eyes'])
+
+    def mark_done(self, name: str, signature, eye_filenames: Iterable[str] = ()):
+        """Record a processed original (saved to disk at most every save_interval)"""
+        if signature is None:
+            return
+        with self._lock:
+            self.done[name] = {'signature': list(signature), 'eyes': list(eye_filenames)}
+            self._dirty = True
+        if time.time() - self._last_save >= self.save_interval:
+            self.save()
+
+    def get_stats(self) -> Dict:
+        """Number of originals recorded as processed"""
+        with self._lock:
+            return {'processed': len(self.done), 'file': str(self.checkpoint_file)}
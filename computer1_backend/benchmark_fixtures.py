@@ -0,0 +1,173 @@
+"""
+Benchmark Fixtures for Experimental Theatre Digital Program
+
+This module handles:
+- Locating the shared test images
+- Preparing benchmark inputs: copies, upscaled frames, fixed-megapixel frames
+  and synthetic group photos (mosaics of the test faces)
+- Building an ImageProcessor configured for measurement (no detection cache,
+  optional detection_params/processing_config overrides)
+- Small helpers shared by the benchmark scripts (percentiles, JSON output)
+
+Used by pipeline_benchmark.py and the per-feature *_benchmark.py scripts.
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import json
+import math
+import shutil
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from image_processor import ImageProcessor
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_IMAGES_DIR = BASE_DIR.parent / 'shared' / 'test_images'
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif'}
+
+
+def list_images(images_dir):
+    """Sorted image paths in a directory"""
+    return sorted(p for p in Path(images_dir).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+
+
+def prepare_images(images_dir, work_dir, upscale=1.0):
+    """
+    Copy the benchmark images into a working directory, optionally upscaled
+
+    Args:
+        images_dir: Directory containing the source images
+        work_dir: Directory to write the prepared images to
+        upscale: Linear scale factor applied to every image
+
+    Returns:
+        Sorted list of prepared image paths
+    """
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    prepared = []
+
+    for source in list_images(images_dir):
+        if upscale == 1.0:
+            target = work_dir / source.name
+            shutil.copy2(source, target)
+        else:
+            img = cv2.imread(str(source))
+            if img is None:
+                continue
+            size = (int(img.shape[1] * upscale), int(img.shape[0] * upscale))
+            img = cv2.resize(img, size, interpolation=cv2.INTER_CUBIC)
+            target = work_dir / f"{source.stem}_x{upscale:g}.jpg"
+            cv2.imwrite(str(target), img, [cv2.IMWRITE_JPEG_QUALITY, 92])
+
+        prepared.append(target)
+
+    return prepared
+
+
+def prepare_megapixel_images(images_dir, work_dir, megapixels):
+    """
+    Scale every benchmark image to (about) the given resolution in megapixels
+
+    Scaling keeps the aspect ratio and uses bicubic interpolation and a
+    fixed JPEG quality, so the same inputs always give the same files.
+
+    Returns:
+        Sorted list of prepared JPEG paths
+    """
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    prepared = []
+
+    for source in list_images(images_dir):
+        img = cv2.imread(str(source))
+        if img is None:
+            continue
+        scale = math.sqrt(megapixels * 1e6 / float(img.shape[0] * img.shape[1]))
+        size = (int(round(img.shape[1] * scale)), int(round(img.shape[0] * scale)))
+        img = cv2.resize(img, size, interpolation=cv2.INTER_CUBIC)
+        target = work_dir / f"{source.stem}_{megapixels}mp.jpg"
+        cv2.imwrite(str(target), img, [cv2.IMWRITE_JPEG_QUALITY, 92])
+        prepared.append(target)
+
+    return prepared
+
+
+def prepare_group_images(images_dir, work_dir, grid=(5, 4), cell_size=520, count=2):
+    """
+    Build synthetic group photos by tiling downscaled test faces into a grid
+
+    Returns:
+        List of mosaic image paths (JPEG)
+    """
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    sources = [cv2.imread(str(p)) for p in list_images(images_dir)]
+    sources = [img for img in sources if img is not None]
+    if not sources:
+        return []
+
+    cols, rows = grid
+    prepared = []
+    for index in range(count):
+        mosaic = np.zeros((rows * cell_size, cols * cell_size, 3), dtype=np.uint8)
+        for cell in range(cols * rows):
+            img = sources[(cell + index) % len(sources)]
+            scale = cell_size / float(max(img.shape[:2]))
+            resized = cv2.resize(img, (int(img.shape[1] * scale), int(img.shape[0] * scale)),
+                                 interpolation=cv2.INTER_AREA)
+            row, col = divmod(cell, cols)
+            y, x = row * cell_size, col * cell_size
+            mosaic[y:y + resized.shape[0], x:x + resized.shape[1]] = resized
+        target = work_dir / f"group_{index}_{cols}x{rows}.jpg"
+        cv2.imwrite(str(target), mosaic, [cv2.IMWRITE_JPEG_QUALITY, 92])
+        prepared.append(target)
+
+    return prepared
+
+
+def make_processor(output_dir, name, num_workers=1, param_overrides=None):
+    """
+    Build an ImageProcessor for measurement
+
+    The detection cache is disabled so every call does real detection work.
+
+    Args:
+        output_dir: Scratch directory of the benchmark
+        name: Subdirectory of output_dir receiving the eye crops
+        num_workers: Detection worker threads
+        param_overrides: Optional detection_params overrides; keys prefixed with
+                         'processing.' override processing_config instead
+
+    Returns:
+        ImageProcessor instance (call stop_monitoring() when done)
+    """
+    processor = ImageProcessor(originals_dir=Path(output_dir) / 'unused',
+                               cropped_eyes_dir=Path(output_dir) / name, num_workers=num_workers)
+    for key, value in (param_overrides or {}).items():
+        if key.startswith('processing.'):
+            processor.processing_config[key.split('.', 1)[1]] = value
+        else:
+            processor.detection_params[key] = value
+    processor.detection_cache = None
+    return processor
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def write_json(results, path):
+    """Write benchmark results as indented JSON if a path was given"""
+    if path:
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,297 @@
+"""
+Eye Crop Post-Processing Pipeline for Experimental Theatre Digital Program
+
+This module handles:
+- The resize -> sharpen -> colour adjust -> encode stages applied to every eye crop
+- Smaller level-of-detail variants (e.g. 32/64 px, JPEG or WebP) encoded from the same pixels
+- Content digests of encoded crops, used as immutable, content-addressed filenames
+- Kernels and lookup tables precomputed once per parameter set
+- Reusable output buffers per pipeline instance (one instance per worker thread)
+- Per-stage timing shared across threads
+
+Every stage writes into a view of a per-stage backing buffer sized
+max_dimension x max_dimension, which holds any crop after the resize stage,
+so steady-state processing allocates only the encoded JPEG.
+
+The default 'exact' sharpen mode reproduces the original
+filter2D + addWeighted output byte for byte. The optional 'fused' mode folds
+the blend into a single kernel (one pass, one buffer) but skips the
+intermediate uint8 saturation of the sharpened image. Around bright
+catchlights that changes pixels by up to ~90 levels, so it is opt-in.
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import re
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from pipeline_metrics import metrics_enabled, record_stage
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STAGES = ('resize', 'sharpen', 'colour', 'encode', 'variants')
+
+# Encoder flags per level-of-detail variant format
+VARIANT_FORMATS = {
+    'jpg': ('.jpg', cv2.IMWRITE_JPEG_QUALITY),
+    'webp': ('.webp', cv2.IMWRITE_WEBP_QUALITY)
+}
+
+# Original 3x3 sharpening kernel (blended 80/20 with the unsharpened crop)
+SHARPEN_KERNEL = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]], dtype=np.float32)
+
+# Crop filenames derived from their encoded bytes: '<digest>.jpg' for crops,
+# '<crop digest>_<size>_<variant digest>.<ext>' for level-of-detail variants
+CONTENT_ADDRESSED_NAME = re.compile(r'^[0-9a-f]{16}(_\d+_[0-9a-f]{8})?\.[a-z]+$')
+
+# Stage timing statistics, shared by all pipeline instances and threads
+_stage_lock = threading.Lock()
+_stage_stats: Dict[str, Dict] = {}
+
+
+def target_size(width: int, height: int, max_dim: int, min_dim: int) -> Optional[Tuple[int, int]]:
+    """
+    Get the (width, height) a crop is resized to, or None if it is already small enough
+
+    Preserves the aspect ratio and enforces min_dim on both sides.
+    """
+    if max(width, height) <= max_dim:
+        return None
+
+    if width > height:
+        new_w = max_dim
+        new_h = int((height * max_dim) / width)
+    else:
+        new_h = max_dim
+        new_w = int((width * max_dim) / height)
+
+    return max(new_w, min_dim), max(new_h, min_dim)
+
+
+def content_digest(data, length: int = 16) -> str:
+    """Hex SHA-256 digest (truncated) of encoded image bytes"""
+    return hashlib.sha256(data).hexdigest()[:length]
+
+
+def is_content_addressed(filename: str) -> bool:
+    """Whether a crop filename was derived from its content (safe to cache forever)"""
+    return CONTENT_ADDRESSED_NAME.match(filename) is not None
+
+
+class CropPipeline:
+    def __init__(self, detection_params: Dict):
+        """
+        Initialize the crop pipeline
+
+        Args:
+            detection_params: ImageProcessor.detection_params (read on every call,
+                              so parameter changes take effect immediately)
+        """
+        self.detection_params = detection_params
+
+        self._buffers: Dict[str, np.ndarray] = {}
+        self._kernel_key = None
+        self._fused_kernel = None
+        self._lut_key = None
+        self._lut = None
+        self._unsupported_formats = set()
+
+    def _buffer(self, stage: str, shape) -> np.ndarray:
+        """Get a uint8 view of the given shape into the stage's reusable backing buffer"""
+        height, width = shape[:2]
+        backing = self._buffers.get(stage)
+        if (backing is None or backing.shape[0] < height or backing.shape[1] < width
+                or backing.shape[2:] != tuple(shape[2:])):
+            side = self.detection_params['max_dimension']
+            backing = np.empty((max(side, height), max(side, width)) + tuple(shape[2:]), dtype=np.uint8)
+            self._buffers[stage] = backing
+        return backing[:height, :width]
+
+    def _get_fused_kernel(self, amount: float) -> np.ndarray:
+        """Kernel equivalent to (1 - amount) * crop + amount * sharpened, built once per amount"""
+        if self._kernel_key != amount:
+            identity = np.zeros((3, 3), dtype=np.float32)
+            identity[1, 1] = 1.0
+            self._fused_kernel = (1.0 - amount) * identity + amount * SHARPEN_KERNEL
+            self._kernel_key = amount
+        return self._fused_kernel
+
+    def _get_colour_lut(self, gain: float, gamma: float) -> np.ndarray:
+        """256-entry lookup table for gain/gamma colour adjustment, built once per setting"""
+        key = (gain, gamma)
+        if self._lut_key != key:
+            levels = np.arange(256, dtype=np.float64) / 255.0
+            self._lut = np.clip(np.round(255.0 * gain * np.power(levels, gamma)), 0, 255).astype(np.uint8)
+            self._lut_key = key
+        return self._lut
+
+    def resize(self, eye_img: np.ndarray) -> np.ndarray:
+        """Downscale to max_dimension (Lanczos) or pass the crop through unchanged"""
+        size = target_size(eye_img.shape[1], eye_img.shape[0],
+                           self.detection_params['max_dimension'],
+                           self.detection_params['min_dimension'])
+        if size is None:
+            # Later stages never write to their input, so no defensive copy is needed
+            return eye_img
+
+        dst = self._buffer('resize', (size[1], size[0]) + eye_img.shape[2:])
+        return cv2.resize(eye_img, size, dst=dst, interpolation=cv2.INTER_LANCZOS4)
+
+    def sharpen(self, img: np.ndarray) -> np.ndarray:
+        """Apply the subtle 3x3 sharpening blend"""
+        amount = self.detection_params.get('crop_sharpen_amount', 0.2)
+        if amount <= 0:
+            return img
+
+        out = self._buffer('sharpen', img.shape)
+        if self.detection_params.get('crop_sharpen_mode', 'exact') == 'fused':
+            return cv2.filter2D(img, -1, self._get_fused_kernel(amount), dst=out)
+
+        sharpened = cv2.filter2D(img, -1, SHARPEN_KERNEL, dst=self._buffer('sharpen_tmp', img.shape))
+        return cv2.addWeighted(img, 1.0 - amount, sharpened, amount, 0, dst=out)
+
+    def colour(self, img: np.ndarray) -> np.ndarray:
+        """Apply the optional gain/gamma adjustment through a lookup table"""
+        gain = self.detection_params.get('crop_colour_gain', 1.0)
+        gamma = self.detection_params.get('crop_colour_gamma', 1.0)
+        if gain == 1.0 and gamma == 1.0:
+            return img
+
+        return cv2.LUT(img, self._get_colour_lut(gain, gamma), dst=self._buffer('colour', img.shape))
+
+    def encode(self, img: np.ndarray) -> Optional[np.ndarray]:
+        """Encode the crop as JPEG (1-D uint8 array, usable wherever bytes are accepted)"""
+        quality = self.detection_params.get('crop_jpeg_quality', 95)
+        success, encoded = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        return encoded if success else None
+
+    def _variant_format(self) -> str:
+        """Configured variant format, falling back to JPEG if this OpenCV build cannot write it"""
+        fmt = self.detection_params.get('crop_variant_format', 'jpg')
+        if fmt not in VARIANT_FORMATS:
+            fmt = 'jpg'
+        if fmt != 'jpg' and not cv2.haveImageWriter(VARIANT_FORMATS[fmt][0]):
+            if fmt not in self._unsupported_formats:
+                self._unsupported_formats.add(fmt)
+                logger.warning(f"OpenCV cannot encode {fmt}; writing JPEG crop variants instead")
+            fmt = 'jpg'
+        return fmt
+
+    def encode_variants(self, img: np.ndarray) -> List[Dict]:
+        """
+        Encode the configured level-of-detail variants of a finished crop
+
+        Variant sizes are the longest side in pixels. Sizes at or above the
+        crop's own longest side are skipped (the full crop serves them).
+
+        Returns:
+            List of {'size', 'format', 'width', 'height', 'data'} dictionaries, smallest first
+        """
+        sizes = sorted(set(self.detection_params.get('crop_variant_sizes') or []))
+        if not sizes:
+            return []
+
+        fmt = self._variant_format()
+        extension, quality_flag = VARIANT_FORMATS[fmt]
+        quality = self.detection_params.get('crop_variant_quality', 85)
+        height, width = img.shape[:2]
+
+        variants = []
+        for size in sizes:
+            if size >= max(width, height):
+                break
+            scale = size / max(width, height)
+            variant_size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+            dst = self._buffer(f'variant_{size}', (variant_size[1], variant_size[0]) + img.shape[2:])
+            small = cv2.resize(img, variant_size, dst=dst, interpolation=cv2.INTER_AREA)
+            success, encoded = cv2.imencode(extension, small, [quality_flag, quality])
+            if not success:
+                logger.error(f"Failed to encode {size}px {fmt} crop variant")
+                continue
+            variants.append({
+                'size': size,
+                'format': fmt,
+                'width': variant_size[0],
+                'height': variant_size[1],
+                'data': encoded
+            })
+        return variants
+
+    def process(self, eye_img: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], List[Dict]]:
+        """
+        Run every stage on one eye crop
+
+        Returns:
+            (encoded JPEG, final pixels, encoded variants). The pixel array may
+            be a view of a reused buffer and is only valid until the next call
+            on this pipeline.
+        """
+        timings = {}
+
+        start = time.perf_counter()
+        img = self.resize(eye_img)
+        now = time.perf_counter()
+        timings['resize'] = now - start
+
+        start = now
+        img = self.sharpen(img)
+        now = time.perf_counter()
+        timings['sharpen'] = now - start
+
+        start = now
+        img = self.colour(img)
+        now = time.perf_counter()
+        timings['colour'] = now - start
+
+        start = now
+        encoded = self.encode(img)
+        now = time.perf_counter()
+        timings['encode'] = now - start
+
+        start = now
+        variants = self.encode_variants(img) if encoded is not None else []
+        timings['variants'] = time.perf_counter() - start
+
+        record_stage_times(timings)
+        return encoded, img, variants
+
+
+def record_stage_times(timings: Dict[str, float]):
+    """Accumulate the stage timings of one crop (also recorded as 'crop_<stage>' histograms)"""
+    with _stage_lock:
+        for stage, seconds in timings.items():
+            stats = _stage_stats.setdefault(stage, {'calls': 0, 'seconds': 0.0})
+            stats['calls'] += 1
+            stats['seconds'] += seconds
+    if metrics_enabled():
+        for stage, seconds in timings.items():
+            record_stage(f"crop_{stage}", seconds)
+
+
+def get_stage_timings() -> Dict[str, Dict]:
+    """Get the mean time per crop of every pipeline stage"""
+    with _stage_lock:
+        return {
+            stage: {
+                'calls': stats['calls'],
+                'seconds': round(stats['seconds'], 4),
+                'mean_us': round(stats['seconds'] * 1e6 / stats['calls'], 1) if stats['calls'] else None
+            }
+            for stage, stats in _stage_stats.items()
+        }
+
+
+def reset_stage_timings():
+    """Clear the accumulated stage timings"""
+    with _stage_lock:
+        _stage_stats.clear()
@@ -0,0 +1,196 @@
+"""
+Crop Pipeline Benchmark for Experimental Theatre Digital Program
+
+This module handles:
+- The original crop post-processing of _save_eye_image_enhanced, kept as the reference
+- Padded eye crops collected from the test images (and upscaled copies)
+- Output equality, time, transient memory and retained allocations per crop
+  of the reference and the staged CropPipeline variants
+
+Usage:
+    python crop_pipeline_benchmark.py
+    python crop_pipeline_benchmark.py --repeats 50 --json crop_pipeline.json
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import argparse
+import logging
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from benchmark_fixtures import DEFAULT_IMAGES_DIR, list_images, make_processor, write_json
+from crop_pipeline import CropPipeline, STAGES, get_stage_timings, reset_stage_timings
+
+
+def reference_enhance_eye_image(eye_img, detection_params):
+    """The original crop post-processing of _save_eye_image_enhanced, returning JPEG bytes"""
+    original_h, original_w = eye_img.shape[:2]
+    max_dim = detection_params['max_dimension']
+
+    if max(original_w, original_h) > max_dim:
+        if original_w > original_h:
+            new_w = max_dim
+            new_h = int((original_h * max_dim) / original_w)
+        else:
+            new_h = max_dim
+            new_w = int((original_w * max_dim) / original_h)
+        if new_w < detection_params['min_dimension']:
+            new_w = detection_params['min_dimension']
+        if new_h < detection_params['min_dimension']:
+            new_h = detection_params['min_dimension']
+        resized_eye = cv2.resize(eye_img, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
+    else:
+        resized_eye = eye_img.copy()
+
+    kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
+    sharpened = cv2.filter2D(resized_eye, -1, kernel)
+    final_image = cv2.addWeighted(resized_eye, 0.8, sharpened, 0.2, 0)
+    _, encoded = cv2.imencode('.jpg', final_image, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    return encoded, final_image, []
+
+
+def collect_eye_crops(processor, image_paths, upscale=4.0):
+    """
+    Collect padded eye crops (views into the colour frame, as in the detection path)
+
+    Images are upscaled so that most crops exceed max_dimension and get resized.
+    """
+    face_cascade, eye_cascade = processor._get_thread_cascades()
+    crops = []
+
+    for image_path in image_paths:
+        img = cv2.imread(str(image_path))
+        if img is None:
+            continue
+        gray = cv2.equalizeHist(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))
+        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=4, minSize=(100, 100))
+        for (x, y, w, h) in faces:
+            eyes = eye_cascade.detectMultiScale(gray[y:y + h, x:x + w], scaleFactor=1.05,
+                                                minNeighbors=6, minSize=(15, 15))
+            for (ex, ey, ew, eh) in eyes:
+                crop = processor._extract_eye_with_padding(img[y:y + h, x:x + w], ex, ey, ew, eh)
+                if crop is None:
+                    continue
+                crops.append(crop)
+                if upscale != 1.0:
+                    crops.append(cv2.resize(crop, None, fx=upscale, fy=upscale, interpolation=cv2.INTER_CUBIC))
+
+    return crops
+
+
+def benchmark_crop_pipeline(image_paths, work_dir, repeats=20):
+    """
+    Compare the staged crop pipeline with the original post-processing
+
+    Reports output equality, time per crop, transient memory allocated per
+    crop (tracemalloc peak, which also sees NumPy/OpenCV buffers), the number
+    of allocations still alive after a pass and per-stage timings.
+    """
+    processor = make_processor(work_dir, 'crop_pipeline')
+    params = processor.detection_params
+    crops = collect_eye_crops(processor, image_paths)
+    processor.stop_monitoring()
+    results = {'crops': len(crops), 'variants': {}}
+    if not crops:
+        return results
+
+    expected = [reference_enhance_eye_image(crop, params) for crop in crops]
+
+    variants = {
+        'reference': None,
+        'pipeline_exact': dict(params, crop_sharpen_mode='exact', crop_variant_sizes=[]),
+        'pipeline_fused': dict(params, crop_sharpen_mode='fused', crop_variant_sizes=[]),
+        'pipeline_lod_jpg': dict(params, crop_variant_format='jpg'),
+        'pipeline_lod_webp': dict(params, crop_variant_format='webp')
+    }
+    for name, variant_params in variants.items():
+        if variant_params is None:
+            run = lambda crop: reference_enhance_eye_image(crop, params)
+        else:
+            run = CropPipeline(variant_params).process
+        reset_stage_timings()
+
+        identical = 0
+        max_pixel_diff = 0
+        encoded_bytes = {}
+        for crop, (expected_bytes, expected_pixels, _) in zip(crops, expected):
+            encoded, pixels, lod_variants = run(crop)
+            encoded_bytes.setdefault('full', []).append(len(encoded))
+            for lod in lod_variants:
+                encoded_bytes.setdefault(f"{lod['size']}px", []).append(len(lod['data']))
+            identical += encoded.tobytes() == expected_bytes.tobytes()
+            diff = cv2.absdiff(pixels, expected_pixels).max()
+            max_pixel_diff = max(max_pixel_diff, int(diff))
+
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            for crop in crops:
+                run(crop)
+        per_crop_us = (time.perf_counter() - start_time) / (repeats * len(crops)) * 1e6
+
+        # Memory from one traced pass (run after warm-up so reusable buffers exist)
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        transient_bytes = 0
+        for crop in crops:
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            run(crop)
+            transient_bytes += tracemalloc.get_traced_memory()[1] - current
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        allocations = sum(stat.count_diff for stat in after.compare_to(before, 'lineno') if stat.count_diff > 0)
+
+        results['variants'][name] = {
+            'identical_bytes': identical,
+            'max_pixel_diff': max_pixel_diff,
+            'per_crop_us': round(per_crop_us, 1),
+            'transient_kb_per_crop': round(transient_bytes / len(crops) / 1024, 1),
+            'retained_allocations': allocations,
+            'mean_bytes': {label: int(statistics.mean(sizes)) for label, sizes in encoded_bytes.items()},
+            'stage_us': {stage: timing['mean_us'] for stage, timing in get_stage_timings().items()}
+        }
+
+    return results
+
+
+def print_crop_pipeline_table(results):
+    """Print the crop pipeline equality and timing table"""
+    print(f"{results['crops']} crops")
+    print(f"{'variant':<18}{'identical':>11}{'max diff':>10}{'us/crop':>10}{'KB/crop':>10}{'retained':>10}"
+          f"  stages (us)")
+    for name, result in results['variants'].items():
+        stages = ', '.join(f"{stage}={result['stage_us'][stage]}" for stage in STAGES if stage in result['stage_us'])
+        print(f"{name:<18}{result['identical_bytes']:>11}{result['max_pixel_diff']:>10}{result['per_crop_us']:>10}"
+              f"{result['transient_kb_per_crop']:>10}{result['retained_allocations']:>10}  {stages or 'n/a'}")
+
+    print("\nmean encoded bytes per crop:")
+    for name, result in results['variants'].items():
+        sizes = ', '.join(f"{label}={size}" for label, size in result['mean_bytes'].items())
+        print(f"  {name:<18}{sizes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the staged crop post-processing with the original')
+    parser.add_argument('--images', default=str(DEFAULT_IMAGES_DIR), help='Directory of benchmark images')
+    parser.add_argument('--repeats', type=int, default=20, help='Timed passes over every crop')
+    parser.add_argument('--json', help='Optional path to write the results as JSON')
+    args = parser.parse_args()
+
+    logging.getLogger('image_processor').setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory(prefix='crop_pipeline_') as work_dir:
+        results = benchmark_crop_pipeline(list_images(args.images), work_dir, args.repeats)
+    print_crop_pipeline_table(results)
+    write_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Detection Result Cache for Experimental Theatre Digital Program
+
+This module handles:
+- Persistent on-disk cache of face/eye detection results
+- Keys built from image content hash, detection_params fingerprint and cascade version
+- Fast path lookups by file size/mtime to avoid re-hashing unchanged originals
+- Least-recently-used eviction once the cache exceeds its size limit, dropping
+  the per-file hashes of evicted results with them
+- Invalidation of entries produced with different detection parameters
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+
+
+def fingerprint_params(detection_params: Dict, cascade_version: str) -> str:
+    """Build a stable fingerprint for a detection_params dictionary and cascade version"""
+    payload = json.dumps(
+        {'params': detection_params, 'cascade_version': cascade_version},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class DetectionCache:
+    def __init__(self, cache_file, cropped_eyes_dir, max_entries: int = 5000,
+                 save_interval: float = 2.0):
+        """
+        Initialize the detection cache
+
+        Args:
+            cache_file: JSON file used to persist the cache
+            cropped_eyes_dir: Directory holding the eye crops referenced by cache entries
+            max_entries: Maximum number of cached results before LRU eviction
+            save_interval: Minimum seconds between automatic saves to disk
+        """
+        self.cache_file = Path(cache_file)
+        self.cropped_eyes_dir = Path(cropped_eyes_dir)
+        self.max_entries = max_entries
+        self.save_interval = save_interval
+
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # Serializes writers of the shared .tmp file
+        self._dirty = False
+        self._last_save = 0.0
+
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidated': 0}
+
+        data = self._load()
+        self.entries: Dict[str, Dict] = data['entries']
+        self.files: Dict[str, Dict] = data['files']
+        self._prune_files_locked()
+
+    def _load(self) -> Dict:
+        """Load the cache from its JSON file"""
+        empty = {'version': CACHE_FORMAT_VERSION, 'entries': {}, 'files': {}}
+        try:
+            if self.cache_file.exists():
+                with open(self.cache_file, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') == CACHE_FORMAT_VERSION:
+                    logger.info(f"Loaded detection cache with {len(data.get('entries', {}))} entries")
+                    data.setdefault('entries', {})
+                    data.setdefault('files', {})
+                    return data
+                logger.info("Detection cache format changed - starting with an empty cache")
+        except Exception as e:
+            logger.error(f"Error loading detection cache: {e}")
+        return empty
+
+    def save(self):
+        """Write the cache to disk atomically; concurrent callers write one after another"""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = {
+                    'version': CACHE_FORMAT_VERSION,
+                    'entries': dict(self.entries),
+                    'files': dict(self.files)
+                }
+                self._dirty = False
+                self._last_save = time.time()
+
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.cache_file.with_suffix('.tmp')
+                with open(tmp_file, 'w') as f:
+                    json.dump(data, f)
+                os.replace(tmp_file, self.cache_file)
+            except Exception as e:
+                logger.error(f"Error saving detection cache: {e}")
+
+    def _maybe_save(self):
+        """Save if enough time has passed since the last write"""
+        if time.time() - self._last_save >= self.save_interval:
+            self.save()
+
+    def content_hash(self, image_path) -> Optional[str]:
+        """
+        Get the SHA-256 content hash of an image
+
+        Unchanged files (same size, mtime, ctime and inode) reuse the previously
+        computed hash; ctime and inode catch a file copied over with its mtime kept.
+        """
+        image_path = Path(image_path)
+        try:
+            stat = image_path.stat()
+        except OSError:
+            return None
+
+        key = str(image_path.resolve())
+        with self._lock:
+            known = self.files.get(key)
+        if known and (known['size'], known['mtime_ns'], known.get('ctime_ns'), known.get('inode')) == \
+                (stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_ino):
+            return known['content_hash']
+
+        try:
+            hash_sha256 = hashlib.sha256()
+            with open(image_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    hash_sha256.update(chunk)
+            content_hash = hash_sha256.hexdigest()
+        except Exception as e:
+            logger.error(f"Error hashing {image_path}: {e}")
+            return None
+
+        with self._lock:
+            self.files[key] = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'ctime_ns': stat.st_ctime_ns,
+                'inode': stat.st_ino,
+                'content_hash': content_hash
+            }
+            self._dirty = True
+        return content_hash
+
+    @staticmethod
+    def make_key(content_hash: str, params_fingerprint: str) -> str:
+        """Combine content hash and params fingerprint into a cache key"""
+        return f"{content_hash}:{params_fingerprint}"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a cached detection result
+
+        Entries whose eye crops or crop variants no longer exist on disk are treated as misses.
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                missing = [name for name in self._referenced_files(entry['result'])
+                           if not (self.cropped_eyes_dir / name).exists()]
+                if missing:
+                    del self.entries[key]
+                    self._prune_files_locked()
+                    self._dirty = True
+                    entry = None
+
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+
+            entry['last_used'] = time.time()
+            self.stats['hits'] += 1
+            return entry['result']
+
+    @staticmethod
+    def _referenced_files(result: Dict) -> List[str]:
+        """Eye crops and crop variants (relative to cropped_eyes_dir) used by a result"""
+        files = list(result['eye_filenames'])
+        for record in result.get('eyes', []):
+            files.extend(variant['filename'] for variant in record.get('variants', []))
+        return files
+
+    def put(self, key: str, params_fingerprint: str, result: Dict):
+        """Store a detection result, evicting the least recently used entries if needed"""
+        now = time.time()
+        with self._lock:
+            self.entries[key] = {
+                'fingerprint': params_fingerprint,
+                'created': now,
+                'last_used': now,
+                'result': result
+            }
+            self._evict_locked()
+            self._dirty = True
+        self._maybe_save()
+
+    def _evict_locked(self):
+        """Drop least recently used entries beyond max_entries and their file hashes (caller holds the lock)"""
+        overflow = len(self.entries) - self.max_entries
+        if overflow > 0:
+            oldest = sorted(self.entries.items(), key=lambda item: item[1]['last_used'])[:overflow]
+            for key, _ in oldest:
+                del self.entries[key]
+            self.stats['evictions'] += overflow
+        # Hashes of evicted results go with them, as do those of images that never produced one
+        if overflow > 0 or len(self.files) > self.max_entries:
+            self._prune_files_locked()
+    
+    def _prune_files_locked(self):
+        """Drop per-file hashes that no cached result refers to any more (caller holds the lock)"""
+        live_hashes = {key.split(':', 1)[0] for key in self.entries}
+        orphaned = [path for path, known in self.files.items()
+                    if known['content_hash'] not in live_hashes]
+        for path in orphaned:
+            del self.files[path]
+
+    def invalidate_stale(self, params_fingerprint: str) -> int:
+        """Remove entries produced with a different detection_params fingerprint"""
+        with self._lock:
+            stale = [key for key, entry in self.entries.items()
+                     if entry['fingerprint'] != params_fingerprint]
+            for key in stale:
+                del self.entries[key]
+            if stale:
+                self._prune_files_locked()
+                self._dirty = True
+                self.stats['invalidated'] += len(stale)
+
+        if stale:
+            logger.info(f"Invalidated {len(stale)} detection cache entries after parameter change")
+            self.save()
+        return len(stale)
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            self.entries.clear()
+            self.files.clear()
+            self._dirty = True
+        self.save()
+
+    def get_stats(self) -> Dict:
+        """Get cache size and hit/miss counters"""
+        with self._lock:
+            return dict(self.stats, entries=len(self.entries), files=len(self.files),
+                        max_entries=self.max_entries)
@@ -0,0 +1,233 @@
+"""
+Detection Worker Pool for Experimental Theatre Digital Program
+
+This module handles:
+- A fixed pool of background threads running face/eye detection in parallel
+- Priority queueing: live arrivals before the backlog, newest captures first
+- Future-based result delivery with optional completion callbacks
+- Queue depth and per-worker utilisation reporting
+
+OpenCV releases the GIL inside imread, detectMultiScale, resize and imwrite,
+so plain threads scale across cores as long as every worker uses its own
+cascade classifiers (see ImageProcessor._get_thread_cascades).
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import os
+import time
+import queue
+import itertools
+import threading
+import logging
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Priority classes (lower runs first); within a class newer captures run first
+PRIORITY_LIVE = 0
+PRIORITY_BACKLOG = 1
+
+# Sorts after every real item, so stop() still drains the queue first
+_STOP_PRIORITY = (float('inf'),)
+
+
+def make_priority(live: bool, capture_time: float = 0.0):
+    """Sort key for an image: live before backlog, then newest capture time first"""
+    return (PRIORITY_LIVE if live else PRIORITY_BACKLOG, -capture_time)
+
+
+class DetectionWorkerPool:
+    def __init__(self, process_fn: Callable, num_workers: Optional[int] = None,
+                 max_queue_size: int = 0, name: str = 'detection'):
+        """
+        Initialize the worker pool
+
+        Args:
+            process_fn: Callable run for every queued item, e.g. ImageProcessor.detect_faces_and_eyes
+            num_workers: Number of worker threads (defaults to the CPU count)
+            max_queue_size: Maximum number of pending items (0 = unbounded)
+            name: Prefix for worker thread names
+        """
+        self.process_fn = process_fn
+        self.num_workers = max(1, num_workers or os.cpu_count() or 1)
+        self.name = name
+
+        self._queue = queue.PriorityQueue(maxsize=max_queue_size)
+        self._sequence = itertools.count()  # FIFO among equal priorities
+        self._pending_by_class: Dict = {}
+        self._workers: List[threading.Thread] = []
+        self._stats_lock = threading.Lock()
+        self._worker_stats: List[Dict] = []
+        self._started_at = None
+        self.is_running = False
+
+    def start(self):
+        """Start the worker threads"""
+        if self.is_running:
+            logger.warning("Detection worker pool already running")
+            return
+
+        self._started_at = time.time()
+        self._worker_stats = [
+            {
+                'worker_id': i,
+                'tasks_completed': 0,
+                'tasks_failed': 0,
+                'busy_seconds': 0.0,
+                'current_item': None,
+                'busy_since': None
+            }
+            for i in range(self.num_workers)
+        ]
+
+        self.is_running = True
+        self._workers = []
+        for i in range(self.num_workers):
+            worker = threading.Thread(
+                target=self._worker_loop,
+                args=(i,),
+                name=f"{self.name}-worker-{i}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+        logger.info(f"Started detection worker pool with {self.num_workers} workers")
+
+    def stop(self, wait: bool = True):
+        """Stop the worker threads after the queued items have been drained"""
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        for _ in self._workers:
+            self._queue.put((_STOP_PRIORITY, next(self._sequence), None))
+
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+        self._workers = []
+        logger.info("Stopped detection worker pool")
+
+    def submit(self, item, callback: Optional[Callable] = None, priority=(PRIORITY_LIVE,)) -> Future:
+        """
+        Queue an item for processing
+
+        Args:
+            item: Argument passed to process_fn (typically an image path)
+            callback: Optional callable invoked as callback(item, result) on success
+            priority: Sort key tuple, lowest first (see make_priority); equal keys run in
+                      submission order. The first element is the priority class.
+
+        Returns:
+            Future resolving to the return value of process_fn
+        """
+        if not self.is_running:
+            self.start()
+
+        future = Future()
+        with self._stats_lock:
+            self._pending_by_class[priority[0]] = self._pending_by_class.get(priority[0], 0) + 1
+        self._queue.put((priority, next(self._sequence), (item, callback, future)))
+        return future
+
+    def map(self, items) -> List:
+        """Process all items in parallel and return their results in input order"""
+        futures = [self.submit(item) for item in items]
+        return [future.result() for future in futures]
+
+    def _worker_loop(self, worker_id: int):
+        """Main loop for a single worker thread"""
+        while True:
+            priority, _, task = self._queue.get()
+            if task is None:
+                self._queue.task_done()
+                break
+
+            item, callback, future = task
+            with self._stats_lock:
+                self._pending_by_class[priority[0]] -= 1
+            if not future.set_running_or_notify_cancel():
+                self._queue.task_done()
+                continue
+
+            stats = self._worker_stats[worker_id]
+            start_time = time.time()
+            with self._stats_lock:
+                stats['current_item'] = str(item)
+                stats['busy_since'] = start_time
+
+            try:
+                result = self.process_fn(item)
+                future.set_result(result)
+                with self._stats_lock:
+                    stats['tasks_completed'] += 1
+            except Exception as e:
+                logger.error(f"Detection worker {worker_id} failed on {item}: {e}")
+                future.set_exception(e)
+                with self._stats_lock:
+                    stats['tasks_failed'] += 1
+            finally:
+                with self._stats_lock:
+                    stats['busy_seconds'] += time.time() - start_time
+                    stats['current_item'] = None
+                    stats['busy_since'] = None
+                self._queue.task_done()
+
+            if callback and future.exception() is None:
+                try:
+                    callback(item, future.result())
+                except Exception as e:
+                    logger.error(f"Error in detection callback for {item}: {e}")
+
+    def wait_until_idle(self):
+        """Block until every queued item has been processed"""
+        self._queue.join()
+
+    def get_queue_depth(self) -> int:
+        """Number of items waiting for a free worker"""
+        return self._queue.qsize()
+
+    def get_pending_count(self, priority_class: int) -> int:
+        """Number of queued items of one priority class (e.g. PRIORITY_LIVE)"""
+        with self._stats_lock:
+            return self._pending_by_class.get(priority_class, 0)
+
+    def get_stats(self) -> Dict:
+        """Get queue depth and per-worker utilisation"""
+        now = time.time()
+        uptime = (now - self._started_at) if self._started_at else 0.0
+
+        workers = []
+        with self._stats_lock:
+            pending = {
+                'live': self._pending_by_class.get(PRIORITY_LIVE, 0),
+                'backlog': self._pending_by_class.get(PRIORITY_BACKLOG, 0)
+            }
+            for stats in self._worker_stats:
+                busy_seconds = stats['busy_seconds']
+                if stats['busy_since'] is not None:
+                    busy_seconds += now - stats['busy_since']
+                workers.append({
+                    'worker_id': stats['worker_id'],
+                    'tasks_completed': stats['tasks_completed'],
+                    'tasks_failed': stats['tasks_failed'],
+                    'busy_seconds': round(busy_seconds, 3),
+                    'utilization': round(busy_seconds / uptime, 3) if uptime > 0 else 0.0,
+                    'current_item': stats['current_item']
+                })
+
+        return {
+            'running': self.is_running,
+            'num_workers': self.num_workers,
+            'queue_depth': self.get_queue_depth(),
+            'pending': pending,
+            'uptime_seconds': round(uptime, 3),
+            'workers': workers
+        }
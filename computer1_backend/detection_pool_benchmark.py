@@ -0,0 +1,106 @@
+"""
+Scheduling Benchmark for Experimental Theatre Digital Program
+
+This module handles:
+- Time-to-first-eye of a live image submitted behind a large backlog
+- Comparison of one FIFO priority class with the newest-first scheduling
+  of DetectionWorkerPool
+
+Usage:
+    python detection_pool_benchmark.py --backlog 2000
+    python detection_pool_benchmark.py --upscale 1 --json scheduling.json
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from benchmark_fixtures import DEFAULT_IMAGES_DIR, make_processor, prepare_images, write_json
+from detection_pool import PRIORITY_BACKLOG
+
+
+def benchmark_scheduling(image_paths, work_dir, backlog_size=2000, fifo_backlog_size=20):
+    """
+    Time-to-first-eye of a live image submitted behind a backlog
+
+    'fifo' queues everything in one priority class (the previous behaviour),
+    so it runs on a smaller backlog to keep the run short; 'newest_first'
+    uses the scheduler. Backlog images still queued once the live result
+    arrives are cancelled.
+    """
+    work_dir = Path(work_dir)
+    live_path = image_paths[0]
+    results = {}
+
+    for mode, size in (('fifo', fifo_backlog_size), ('newest_first', backlog_size)):
+        processor = make_processor(work_dir, mode)
+
+        start_time = time.perf_counter()
+        backlog = []
+        for i in range(size):
+            image_path = image_paths[i % len(image_paths)]
+            if mode == 'fifo':
+                backlog.append(processor.worker_pool.submit(image_path, priority=(PRIORITY_BACKLOG,)))
+            else:
+                backlog.append(processor.submit_image(image_path, live=False))
+        enqueue_seconds = time.perf_counter() - start_time
+
+        time.sleep(0.5)  # Let the workers get busy with the backlog
+        start_time = time.perf_counter()
+        if mode == 'fifo':
+            live = processor.worker_pool.submit(live_path, priority=(PRIORITY_BACKLOG,))
+        else:
+            live = processor.submit_image(live_path, live=True)
+        result = live.result()
+        time_to_eye = time.perf_counter() - start_time
+
+        backlog_done = sum(1 for future in backlog if future.done() and not future.cancelled())
+        for future in backlog:
+            future.cancel()
+        processor.stop_monitoring()
+
+        results[mode] = {
+            'backlog': size,
+            'enqueue_ms': round(enqueue_seconds * 1000, 1),
+            'time_to_first_eye_ms': round(time_to_eye * 1000, 1),
+            'eyes': len(result['eyes']) if result else 0,
+            'backlog_done_before_live': backlog_done
+        }
+
+    return results
+
+
+def print_scheduling_table(results):
+    """Print the scheduling comparison"""
+    print(f"{'mode':<16}{'backlog':>9}{'enqueue ms':>12}{'first eye ms':>14}{'eyes':>6}{'done before':>13}")
+    for name, result in results.items():
+        print(f"{name:<16}{result['backlog']:>9}{result['enqueue_ms']:>12}{result['time_to_first_eye_ms']:>14}"
+              f"{result['eyes']:>6}{result['backlog_done_before_live']:>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure time-to-first-eye of a live image behind a backlog')
+    parser.add_argument('--images', default=str(DEFAULT_IMAGES_DIR), help='Directory of benchmark images')
+    parser.add_argument('--upscale', type=float, default=4.0,
+                        help='Upscale factor to simulate full camera frames (4 ~ 13-15 MP)')
+    parser.add_argument('--backlog', type=int, default=2000, help='Backlog size for newest-first scheduling')
+    parser.add_argument('--json', help='Optional path to write the results as JSON')
+    args = parser.parse_args()
+
+    logging.getLogger('image_processor').setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory(prefix='eye_benchmark_') as work_dir:
+        work_dir = Path(work_dir)
+        image_paths = prepare_images(args.images, work_dir / 'images', args.upscale)
+        results = benchmark_scheduling(image_paths, work_dir / 'output', args.backlog)
+    print_scheduling_table(results)
+    write_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
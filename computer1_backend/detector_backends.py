@@ -0,0 +1,205 @@
+"""
+Face Detector Backends for Experimental Theatre Digital Program
+
+This module handles:
+- A common interface for face detectors used by ImageProcessor
+- Haar cascade backend (OpenCV built-in frontal face cascade)
+- YuNet CNN backend (cv2.FaceDetectorYN, loaded from a local ONNX model)
+- Measured cost per megapixel for every backend, shared across threads
+
+Backends only find faces. Eye detection, cropping and saving stay in
+ImageProcessor and are shared by every backend. Backend instances are not
+thread-safe; ImageProcessor keeps one instance per worker thread.
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import abc
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_YUNET_MODEL = BASE_DIR / 'models' / 'face_detection_yunet_2023mar.onnx'
+
+# Cost statistics per backend name, shared by all instances and threads
+_cost_lock = threading.Lock()
+_cost_stats: Dict[str, Dict] = {}
+
+
+class FaceDetectorBackend(abc.ABC):
+    """Base class for face detector backends"""
+
+    name = 'base'
+    uses_cascade_pyramid = False  # Whether SearchWindowPolicy.count_scales applies
+    input_colour = False  # Whether detect_faces wants the BGR proxy instead of the equalized gray one
+
+    def __init__(self, detection_params: Dict):
+        self.detection_params = detection_params
+
+    @property
+    def version(self) -> str:
+        """Identifier of the model in use (part of the detection cache key)"""
+        return self.name
+
+    @abc.abstractmethod
+    def detect_faces(self, image, min_size, max_size=None, params=None) -> List[Tuple[int, int, int, int]]:
+        """
+        Detect faces in the detection image
+
+        Args:
+            image: Equalized grayscale detection image, or the BGR (not equalized)
+                   detection image for backends with input_colour
+            min_size: Minimum face (width, height) in image pixels
+            max_size: Maximum face (width, height) in image pixels, or None
+            params: Optional detection_params overrides for this call (e.g. a detection tier)
+
+        Returns:
+            List of (x, y, w, h) face boxes
+        """
+
+    def detect(self, image, min_size, max_size=None, params=None) -> List[Tuple[int, int, int, int]]:
+        """Detect faces and record the cost of the call"""
+        start_time = time.perf_counter()
+        faces = self.detect_faces(image, min_size, max_size, params)
+        record_cost(self.name, time.perf_counter() - start_time, image.shape[0] * image.shape[1] / 1e6)
+        return faces
+
+
+class HaarFaceDetector(FaceDetectorBackend):
+    """OpenCV Haar cascade frontal face detector"""
+
+    name = 'haar'
+    uses_cascade_pyramid = True
+
+    def __init__(self, detection_params: Dict, cascade_file='haarcascade_frontalface_default.xml',
+                 cascade=None):
+        super().__init__(detection_params)
+        self.cascade_file = cascade_file
+        self.cascade = cascade if cascade is not None else cv2.CascadeClassifier(
+            cv2.data.haarcascades + cascade_file
+        )
+        if self.cascade.empty():
+            raise Exception(f"Failed to load face cascade: {cascade_file}")
+
+    @property
+    def version(self) -> str:
+        return f"haar:{self.cascade_file}"
+
+    def detect_faces(self, gray, min_size, max_size=None, params=None):
+        params = params or self.detection_params
+        faces = self.cascade.detectMultiScale(
+            gray,
+            scaleFactor=params['face_scale_factor'],
+            minNeighbors=params['face_min_neighbors'],
+            minSize=min_size,
+            maxSize=max_size or (0, 0)
+        )
+        return [tuple(int(v) for v in face) for face in faces]
+
+
+class YuNetFaceDetector(FaceDetectorBackend):
+    """OpenCV DNN YuNet face detector running on the CPU"""
+
+    name = 'yunet'
+    input_colour = True  # Trained on colour images; equalized gray costs recall
+
+    def __init__(self, detection_params: Dict, model_path=None):
+        super().__init__(detection_params)
+        if not hasattr(cv2, 'FaceDetectorYN'):
+            raise Exception("This OpenCV build has no FaceDetectorYN (requires OpenCV >= 4.5.4)")
+
+        self.model_path = Path(model_path or detection_params.get('yunet_model_path') or DEFAULT_YUNET_MODEL)
+        if not self.model_path.exists():
+            raise Exception(f"YuNet model not found: {self.model_path}")
+
+        self.detector = cv2.FaceDetectorYN.create(
+            str(self.model_path), "", (320, 320),
+            detection_params.get('yunet_score_threshold', 0.8),
+            detection_params.get('yunet_nms_threshold', 0.3)
+        )
+
+    @property
+    def version(self) -> str:
+        return f"yunet:{self.model_path.name}"
+
+    def detect_faces(self, image, min_size, max_size=None, params=None):
+        # YuNet expects a 3-channel image; gray input only happens if no colour proxy could be built
+        bgr = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR) if image.ndim == 2 else image
+        height, width = image.shape[:2]
+        self.detector.setInputSize((width, height))
+        _, detections = self.detector.detect(bgr)
+        if detections is None:
+            return []
+
+        faces = []
+        for x, y, w, h in np.round(detections[:, :4]).astype(int):
+            x, y = max(0, x), max(0, y)
+            w, h = min(w, width - x), min(h, height - y)
+            if w < min_size[0] or h < min_size[1]:
+                continue
+            if max_size and (w > max_size[0] or h > max_size[1]):
+                continue
+            faces.append((int(x), int(y), int(w), int(h)))
+        return faces
+
+
+FACE_DETECTOR_BACKENDS = {
+    HaarFaceDetector.name: HaarFaceDetector,
+    YuNetFaceDetector.name: YuNetFaceDetector
+}
+
+
+def create_face_detector(name: str, detection_params: Dict, **options) -> FaceDetectorBackend:
+    """
+    Create a face detector backend by name
+
+    Args:
+        name: Backend name ('haar' or 'yunet')
+        detection_params: ImageProcessor.detection_params
+        **options: Backend-specific options (e.g. cascade_file for Haar, model_path for YuNet)
+    """
+    backend_class = FACE_DETECTOR_BACKENDS.get(name)
+    if backend_class is None:
+        raise Exception(f"Unknown face detector backend: {name}")
+    return backend_class(detection_params, **options)
+
+
+def record_cost(name: str, seconds: float, megapixels: float):
+    """Accumulate detection time and pixels for a backend"""
+    with _cost_lock:
+        stats = _cost_stats.setdefault(name, {'calls': 0, 'seconds': 0.0, 'megapixels': 0.0})
+        stats['calls'] += 1
+        stats['seconds'] += seconds
+        stats['megapixels'] += megapixels
+
+
+def get_backend_costs() -> Dict[str, Dict]:
+    """Get the measured cost per megapixel of every backend used so far"""
+    with _cost_lock:
+        return {
+            name: {
+                'calls': stats['calls'],
+                'seconds': round(stats['seconds'], 4),
+                'megapixels': round(stats['megapixels'], 3),
+                'ms_per_megapixel': round(stats['seconds'] * 1000 / stats['megapixels'], 2)
+                if stats['megapixels'] else None
+            }
+            for name, stats in _cost_stats.items()
+        }
+
+
+def reset_backend_costs():
+    """Clear the accumulated backend cost statistics"""
+    with _cost_lock:
+        _cost_stats.clear()
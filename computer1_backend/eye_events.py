@@ -0,0 +1,182 @@
+"""
+Eye Image Event Batching for Experimental Theatre Digital Program
+
+This module handles:
+- Batched 'new_eye_images' Socket.IO events grouped by source image and face
+- Flushing once per source image, or at most once per flush interval during bursts
+- The per-crop 'new_eye_image_available' event as a compatibility mode
+- Message and delivery latency statistics
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EVENT_MODES = ('batched', 'per_eye', 'both')
+BATCH_EVENT = 'new_eye_images'
+PER_EYE_EVENT = 'new_eye_image_available'
+
+
+def group_by_face(eye_payloads: List[Dict]) -> List[Dict]:
+    """Group eye payloads by their face index, keeping face and eye order"""
+    faces = {}
+    for payload in eye_payloads:
+        faces.setdefault(payload.get('face_index', 0), []).append(payload)
+    return [{'face_index': face_index, 'eyes': eyes} for face_index, eyes in faces.items()]
+
+
+class EyeEventBatcher:
+    def __init__(self, emit_fn: Callable, mode: str = 'batched', flush_interval: float = 0.0,
+                 max_batch_eyes: int = 200):
+        """
+        Initialize the event batcher
+
+        Args:
+            emit_fn: Callable(event, payload), e.g. socketio.emit
+            mode: 'batched', 'per_eye' (compatibility) or 'both'
+            flush_interval: Minimum seconds between batches (0 = one batch per image). An
+                            image arriving after a quiet period is sent at once; images
+                            arriving within the interval of the last batch are merged
+            max_batch_eyes: Flush early once a pending batch holds this many eyes
+        """
+        if mode not in EVENT_MODES:
+            raise Exception(f"Unknown eye event mode: {mode}")
+
+        self.emit_fn = emit_fn
+        self.mode = mode
+        self.flush_interval = flush_interval
+        self.max_batch_eyes = max_batch_eyes
+
+        self._lock = threading.Lock()
+        self._pending = {True: [], False: []}  # live flag -> [(image group, queued_at)]
+        self._pending_eyes = {True: 0, False: 0}
+        self._timer: Optional[threading.Timer] = None
+        self._last_batch = {True: 0.0, False: 0.0}
+
+        self.stats = {'messages': 0, 'eyes': 0, 'latency_seconds': 0.0, 'max_latency_seconds': 0.0}
+
+    def publish(self, source: str, eye_payloads: List[Dict], live: bool = True):
+        """
+        Announce the eyes of one source image
+
+        Args:
+            source: Source image filename
+            eye_payloads: Per-eye payloads (filename, url, variants, face_index, ...)
+            live: Whether the image is a new arrival (False for the startup backlog)
+        """
+        if not eye_payloads:
+            return
+
+        queued_at = time.perf_counter()
+
+        if self.mode in ('per_eye', 'both'):
+            for payload in eye_payloads:
+                self._emit(PER_EYE_EVENT, payload, [queued_at])
+
+        if self.mode == 'per_eye':
+            return
+
+        group = {
+            'source': source,
+            'faces': group_by_face(eye_payloads),
+            'eye_count': len(eye_payloads)
+        }
+
+        if self.flush_interval <= 0:
+            self._emit_batch([(group, queued_at)], live)
+            return
+
+        with self._lock:
+            self._pending[live].append((group, queued_at))
+            self._pending_eyes[live] += len(eye_payloads)
+            wait = self._last_batch[live] + self.flush_interval - queued_at
+            flush_now = wait <= 0 or self._pending_eyes[live] >= self.max_batch_eyes
+            if not flush_now and self._timer is None:
+                self._timer = threading.Timer(wait, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if flush_now:
+            self.flush(live)
+
+    def _on_timer(self):
+        """Flush timer callback"""
+        with self._lock:
+            self._timer = None
+        self.flush()
+
+    def flush(self, live: Optional[bool] = None):
+        """Emit the pending batches (both live and backlog unless live is given)"""
+        with self._lock:
+            flags = (True, False) if live is None else (live,)
+            batches = {}
+            for flag in flags:
+                if self._pending[flag]:
+                    batches[flag] = self._pending[flag]
+                    self._pending[flag] = []
+                    self._pending_eyes[flag] = 0
+                    self._last_batch[flag] = time.perf_counter()
+            if not any(self._pending.values()) and self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        for flag, groups in batches.items():
+            self._emit_batch(groups, flag)
+
+    def _emit_batch(self, groups, live: bool):
+        """Emit one 'new_eye_images' message for a list of (image group, queued_at)"""
+        payload = {
+            'images': [group for group, _ in groups],
+            'count': sum(group['eye_count'] for group, _ in groups),
+            'existing': not live
+        }
+        if live:
+            payload['timestamp'] = datetime.now().isoformat()
+
+        queued_times = []
+        for group, queued_at in groups:
+            queued_times.extend([queued_at] * group['eye_count'])
+        self._emit(BATCH_EVENT, payload, queued_times)
+
+    def _emit(self, event: str, payload: Dict, queued_times: List[float]):
+        """Emit one message and record how long its eyes waited"""
+        try:
+            self.emit_fn(event, payload)
+        except Exception as e:
+            logger.error(f"Error emitting {event}: {e}")
+            return
+
+        now = time.perf_counter()
+        latencies = [now - queued_at for queued_at in queued_times]
+        with self._lock:
+            self.stats['messages'] += 1
+            self.stats['eyes'] += len(latencies)
+            self.stats['latency_seconds'] += sum(latencies)
+            self.stats['max_latency_seconds'] = max([self.stats['max_latency_seconds']] + latencies)
+
+    def stop(self):
+        """Flush pending batches and cancel the flush timer"""
+        self.flush()
+
+    def get_stats(self) -> Dict:
+        """Get message counts and eye delivery latency"""
+        with self._lock:
+            eyes = self.stats['eyes']
+            return {
+                'mode': self.mode,
+                'flush_interval': self.flush_interval,
+                'messages': self.stats['messages'],
+                'eyes': eyes,
+                'eyes_per_message': round(eyes / self.stats['messages'], 2) if self.stats['messages'] else None,
+                'mean_latency_ms': round(self.stats['latency_seconds'] * 1000 / eyes, 2) if eyes else None,
+                'max_latency_ms': round(self.stats['max_latency_seconds'] * 1000, 2)
+            }
@@ -0,0 +1,105 @@
+"""
+Eye Event Benchmark for Experimental Theatre Digital Program
+
+This module handles:
+- Synthetic per-eye notification payloads resembling processed images
+- Message count, bytes and latency of per-eye and batched eye notifications
+  (EyeEventBatcher) under a burst of finished images
+
+Usage:
+    python eye_events_benchmark.py
+    python eye_events_benchmark.py --images 500 --arrival-interval 0.001
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import argparse
+import json
+import time
+
+from benchmark_fixtures import write_json
+from eye_events import EyeEventBatcher
+
+
+def synthetic_eye_payloads(image_index, eyes_per_image):
+    """Per-eye notification payloads resembling those of one processed image"""
+    payloads = []
+    for eye_index in range(eyes_per_image):
+        digest = f"{image_index:08x}{eye_index:08x}"
+        payloads.append({
+            'filename': f"{digest}.jpg",
+            'url': f"/eyes/{digest}.jpg",
+            'face_index': eye_index // 2,
+            'eye_index': eye_index % 2,
+            'variants': [
+                {'filename': f"lod/{digest}_{size}_0000abcd.jpg", 'url': f"/eyes/lod/{digest}_{size}_0000abcd.jpg",
+                 'size': size, 'format': 'jpg', 'width': size, 'height': size // 2, 'bytes': 1000}
+                for size in (32, 64)
+            ],
+            'atlas': {'sheet': 0, 'slot': image_index, 'uv': [0.1, 0.2, 0.3, 0.4], 'url': '/atlas/0.jpg?v=1'}
+        })
+    return payloads
+
+
+def benchmark_event_burst(num_images=150, eyes_per_image=2, arrival_interval=0.002):
+    """
+    Compare eye notification modes under a burst (e.g. a startup backlog)
+
+    Images finish every arrival_interval seconds. Messages are serialized to
+    JSON like Socket.IO does, so the per-message cost is included in the
+    measured latency.
+    """
+    modes = {
+        'per_eye': {'mode': 'per_eye'},
+        'batched_per_image': {'mode': 'batched', 'flush_interval': 0.0},
+        'batched_100ms': {'mode': 'batched', 'flush_interval': 0.1},
+        'batched_250ms': {'mode': 'batched', 'flush_interval': 0.25}
+    }
+    images = [synthetic_eye_payloads(i, eyes_per_image) for i in range(num_images)]
+
+    results = {}
+    for name, options in modes.items():
+        sent_bytes = [0]
+
+        def emit(event, payload):
+            sent_bytes[0] += len(json.dumps({'event': event, 'data': payload}))
+
+        batcher = EyeEventBatcher(emit, **options)
+        start_time = time.perf_counter()
+        for image_index, payloads in enumerate(images):
+            batcher.publish(f"IMG_{image_index:04d}.jpg", payloads, live=True)
+            time.sleep(arrival_interval)
+        batcher.stop()
+        duration = time.perf_counter() - start_time
+
+        stats = batcher.get_stats()
+        results[name] = dict(stats, bytes=sent_bytes[0], duration_s=round(duration, 3))
+
+    return {'images': num_images, 'eyes': num_images * eyes_per_image, 'modes': results}
+
+
+def print_event_burst_table(results):
+    """Print the notification burst comparison"""
+    print(f"{results['eyes']} eyes from {results['images']} images")
+    print(f"{'mode':<20}{'messages':>10}{'eyes/msg':>10}{'KB':>9}{'mean ms':>10}{'max ms':>9}")
+    for name, result in results['modes'].items():
+        print(f"{name:<20}{result['messages']:>10}{str(result['eyes_per_message']):>10}"
+              f"{result['bytes'] / 1024:>9.1f}{str(result['mean_latency_ms']):>10}{result['max_latency_ms']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-eye and batched eye notifications under a burst')
+    parser.add_argument('--images', type=int, default=150, help='Images finishing during the burst')
+    parser.add_argument('--eyes-per-image', type=int, default=2, help='Eyes notified per image')
+    parser.add_argument('--arrival-interval', type=float, default=0.002, help='Seconds between finished images')
+    parser.add_argument('--json', help='Optional path to write the results as JSON')
+    args = parser.parse_args()
+
+    results = benchmark_event_burst(args.images, args.eyes_per_image, args.arrival_interval)
+    print_event_burst_table(results)
+    write_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
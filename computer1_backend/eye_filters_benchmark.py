@@ -0,0 +1,266 @@
+"""
+Eye Filter Benchmark for Experimental Theatre Digital Program
+
+This module handles:
+- The original pure-Python eye filters, kept as the reference implementation
+- Raw eye cascade candidates from the test images and synthetic crowd-like sets
+- Equivalence check of the scalar and vectorized filters in eye_filters.py
+  against the reference, and per-call timings of each implementation
+
+Usage:
+    python eye_filters_benchmark.py
+    python eye_filters_benchmark.py --repeats 50 --json eye_filters.json
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from benchmark_fixtures import DEFAULT_IMAGES_DIR, list_images, make_processor, write_json
+from eye_filters import filter_eye_boxes, filter_eye_boxes_scalar, filter_eye_boxes_vectorized
+
+
+# Reference pure-Python eye filters (the original ImageProcessor implementation),
+# kept to verify that eye_filters.filter_eye_boxes produces identical output
+
+def reference_filter_eye_detections(eyes, detection_params):
+    """Filter eye detections to remove poor quality, overlapping, and anatomically incorrect detections"""
+    if len(eyes) == 0:
+        return []
+
+    # Filter by minimum area first
+    min_area = detection_params['quality_threshold']
+    quality_eyes = []
+
+    for (ex, ey, ew, eh) in eyes:
+        area = ew * eh
+        if area >= min_area:
+            quality_eyes.append((ex, ey, ew, eh, area))
+
+    if len(quality_eyes) == 0:
+        return []
+
+    # Apply anatomical filtering if enabled
+    if detection_params.get('eye_position_filter', False):
+        quality_eyes = reference_anatomical_filtering(quality_eyes, detection_params)
+
+    # Remove overlapping detections (keep larger ones)
+    filtered_eyes = []
+    quality_eyes.sort(key=lambda x: x[4], reverse=True)  # Sort by area, largest first
+
+    for (ex, ey, ew, eh, area) in quality_eyes:
+        overlap = False
+        for (fx, fy, fw, fh) in filtered_eyes:
+            # Check for significant overlap
+            if reference_rectangles_overlap(ex, ey, ew, eh, fx, fy, fw, fh):
+                overlap = True
+                break
+
+        if not overlap:
+            filtered_eyes.append((ex, ey, ew, eh))
+
+    # Limit to reasonable number of eyes per face
+    max_eyes = detection_params.get('max_eyes_per_face', 4)
+    filtered_eyes = filtered_eyes[:max_eyes]
+
+    return filtered_eyes
+
+def reference_anatomical_filtering(quality_eyes, detection_params):
+    """Apply anatomical constraints to filter out false positives"""
+    if not quality_eyes:
+        return []
+
+    # Get face dimensions (assuming we're working within a face ROI)
+    # Eyes should typically be in the upper portion of the face
+    upper_face_ratio = detection_params.get('upper_face_ratio', 0.7)
+
+    # Find the overall bounds of detections to estimate face region
+    all_y_positions = [eye[1] for eye in quality_eyes]  # y coordinates
+    min_y = min(all_y_positions)
+    max_y = max(all_y_positions)
+    face_height_estimate = max_y - min_y + max([eye[3] for eye in quality_eyes])
+
+    # Calculate the upper face threshold
+    upper_face_threshold = min_y + (face_height_estimate * upper_face_ratio)
+
+    # Filter eyes that are too low (likely nose holes or mouth)
+    anatomically_valid_eyes = []
+    for (ex, ey, ew, eh, area) in quality_eyes:
+        eye_center_y = ey + eh // 2
+
+        # Check if eye is in upper portion of face
+        if eye_center_y <= upper_face_threshold:
+            anatomically_valid_eyes.append((ex, ey, ew, eh, area))
+
+    # Additional filtering: remove detections that are too close vertically (likely same feature)
+    if len(anatomically_valid_eyes) > 2:
+        final_eyes = []
+        for i, (ex1, ey1, ew1, eh1, area1) in enumerate(anatomically_valid_eyes):
+            is_unique = True
+            for j, (ex2, ey2, ew2, eh2, area2) in enumerate(anatomically_valid_eyes):
+                if i != j:
+                    # Check vertical distance between detections
+                    vertical_distance = abs(ey1 - ey2)
+                    min_separation = max(eh1, eh2) * 0.5  # Minimum separation
+
+                    if vertical_distance < min_separation and area1 < area2:
+                        is_unique = False  # Keep the larger detection
+                        break
+
+            if is_unique:
+                final_eyes.append((ex1, ey1, ew1, eh1, area1))
+
+        anatomically_valid_eyes = final_eyes
+
+    return anatomically_valid_eyes
+
+def reference_rectangles_overlap(x1, y1, w1, h1, x2, y2, w2, h2, threshold=0.5):
+    """Check if two rectangles overlap significantly"""
+    # Calculate intersection
+    x_left = max(x1, x2)
+    y_top = max(y1, y2)
+    x_right = min(x1 + w1, x2 + w2)
+    y_bottom = min(y1 + h1, y2 + h2)
+
+    if x_right <= x_left or y_bottom <= y_top:
+        return False
+
+    intersection_area = (x_right - x_left) * (y_bottom - y_top)
+    area1 = w1 * h1
+    area2 = w2 * h2
+
+    # Check if intersection is significant relative to smaller rectangle
+    min_area = min(area1, area2)
+    overlap_ratio = intersection_area / min_area
+
+    return overlap_ratio > threshold
+
+
+def collect_eye_candidates(processor, image_paths, eye_min_neighbors=1):
+    """
+    Collect raw eye cascade candidates per face from real images
+
+    A loose eye_min_neighbors produces the large candidate sets seen while tuning.
+    """
+    face_cascade, eye_cascade = processor._get_thread_cascades()
+    candidate_sets = []
+
+    for image_path in image_paths:
+        gray = cv2.imread(str(image_path), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            continue
+        gray = cv2.equalizeHist(gray)
+        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=4, minSize=(100, 100))
+        for (x, y, w, h) in faces:
+            eyes = eye_cascade.detectMultiScale(gray[y:y + h, x:x + w], scaleFactor=1.05,
+                                                minNeighbors=eye_min_neighbors, minSize=(15, 15))
+            candidate_sets.append(eyes)
+
+    return candidate_sets
+
+
+def synthetic_eye_candidates(count, num_sets, seed=1234):
+    """Random clustered eye candidates resembling loose detections in crowd photos"""
+    rng = np.random.default_rng(seed)
+    candidate_sets = []
+    for _ in range(num_sets):
+        centers = rng.integers(50, 450, size=(4, 2))
+        picks = centers[rng.integers(0, len(centers), size=count)]
+        sizes = rng.integers(8, 60, size=count)
+        jitter = rng.integers(-15, 16, size=(count, 2))
+        boxes = np.column_stack([picks[:, 0] + jitter[:, 0], picks[:, 1] + jitter[:, 1], sizes, sizes])
+        candidate_sets.append(boxes.astype(np.int32))
+    return candidate_sets
+
+
+def benchmark_eye_filters(image_paths, work_dir, repeats=20):
+    """
+    Verify the scalar and vectorized eye filters against the reference loops and time them
+
+    'dispatch' is filter_eye_boxes as used by the pipeline, which picks the
+    scalar or vectorized implementation by candidate count.
+
+    Returns:
+        Dictionary with mismatch counts and per-call timings for each candidate source
+    """
+    processor = make_processor(work_dir, 'eye_filters')
+    params = processor.detection_params
+    sources = {
+        'test_images': collect_eye_candidates(processor, image_paths),
+        'synthetic_9': synthetic_eye_candidates(9, 100),
+        'synthetic_50': synthetic_eye_candidates(50, 20),
+        'synthetic_300': synthetic_eye_candidates(300, 10)
+    }
+    processor.stop_monitoring()
+
+    results = {}
+    for source, candidate_sets in sources.items():
+        for position_filter in (True, False):
+            case_params = dict(params, eye_position_filter=position_filter)
+            mismatches = 0
+            for eyes in candidate_sets:
+                expected = [tuple(int(v) for v in box)
+                            for box in reference_filter_eye_detections(eyes, case_params)]
+                if (filter_eye_boxes_scalar(eyes, case_params) != expected
+                        or filter_eye_boxes_vectorized(eyes, case_params) != expected):
+                    mismatches += 1
+
+            timings = {}
+            for label, fn in (('reference', reference_filter_eye_detections), ('scalar', filter_eye_boxes_scalar),
+                              ('vectorized', filter_eye_boxes_vectorized), ('dispatch', filter_eye_boxes)):
+                start_time = time.perf_counter()
+                for _ in range(repeats):
+                    for eyes in candidate_sets:
+                        fn(eyes, case_params)
+                calls = max(1, repeats * len(candidate_sets))
+                timings[label] = (time.perf_counter() - start_time) / calls * 1e6
+
+            key = f"{source}{'' if position_filter else '_no_position_filter'}"
+            results[key] = {
+                'sets': len(candidate_sets),
+                'mean_candidates': round(float(np.mean([len(e) for e in candidate_sets])), 1) if candidate_sets else 0,
+                'mismatches': mismatches,
+                'reference_us': round(timings['reference'], 1),
+                'scalar_us': round(timings['scalar'], 1),
+                'vectorized_us': round(timings['vectorized'], 1),
+                'dispatch_us': round(timings['dispatch'], 1),
+                'speedup': round(timings['reference'] / timings['dispatch'], 2) if timings['dispatch'] else None
+            }
+
+    return results
+
+
+def print_eye_filter_table(results):
+    """Print the eye filter equivalence and timing table"""
+    print(f"{'candidates':<36}{'sets':>6}{'mean n':>8}{'mismatch':>10}{'ref us':>10}{'scalar us':>11}"
+          f"{'vec us':>10}{'used us':>10}{'speedup':>9}")
+    for key, result in results.items():
+        print(f"{key:<36}{result['sets']:>6}{result['mean_candidates']:>8}{result['mismatches']:>10}"
+              f"{result['reference_us']:>10}{result['scalar_us']:>11}{result['vectorized_us']:>10}"
+              f"{result['dispatch_us']:>10}{str(result['speedup']):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check and time the scalar and vectorized eye filters')
+    parser.add_argument('--images', default=str(DEFAULT_IMAGES_DIR), help='Directory of benchmark images')
+    parser.add_argument('--repeats', type=int, default=20, help='Timed passes over every candidate set')
+    parser.add_argument('--json', help='Optional path to write the results as JSON')
+    args = parser.parse_args()
+
+    logging.getLogger('image_processor').setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory(prefix='eye_filters_') as work_dir:
+        results = benchmark_eye_filters(list_images(args.images), work_dir, args.repeats)
+    print_eye_filter_table(results)
+    write_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,29 @@ This module handles:
 - Eye detection and cropping with aspect ratio preservation
 - Intelligent padding and sizing for better quality crops
 - File monitoring for automatic processing
+- Parallel detection on a pool of worker threads with per-thread cascades
+- Face detection on a bounded-size proxy image, eye cropping at full resolution
+- Persistent detection result cache so unchanged originals are skipped on restart
+- Two-phase loading: reduced grayscale JPEG decode for detection, colour only when faces exist
+- Resolution-adaptive cascade search windows (minSize/maxSize) to bound scale counts
+- Eye search restricted to the anatomical eye band of each face
+- Vectorized (NumPy) eye candidate filtering and non-maximum suppression
+- Optional tiled face detection for large group photos, tiles detected concurrently
+- Concurrent per-face eye extraction with deterministic face/eye ordering
+- Pluggable face detector backends (Haar cascade, YuNet DNN) with shared eye extraction
+- Tiered detection chain (cheap first, escalate on misses) with a per-image time budget
+- Staged crop post-processing (resize, sharpen, colour, encode) with reusable buffers per worker
+- Level-of-detail crop variants (e.g. 32/64 px, JPEG or WebP) listed in eye notifications
+- Content-addressed crop filenames (hash of the encoded bytes), identical crops stored once
+- Batched per-image 'new_eye_images' events grouped by face (per-eye events as compatibility mode)
+- Bounded ingest queue: file events deduplicated and dispatched once files are completely written
+- Newest-first scheduling: live arrivals ahead of the backlog, optional latest-N backlog
+- Adaptive quality of service: cheaper detection profiles while live latency exceeds its target
+- Background, checkpointed processing of existing originals (resumes after a restart)
+- Per-stage latency histograms (decode, cascades, filtering, crop stages, writes)
+- Perceptual-hash (dHash) detection of burst/near-duplicate frames: reuse earlier boxes or skip
+- Offline batch mode: parallel, resumable processing of a directory with JSONL results
+- Incremental packing of eye crops into texture atlases with a UV manifest
 - Socket.IO integration for real-time notifications
 
 Author: AI Assistant
@@ -15,22 +38,64 @@ Date: January 2025
 import cv2
 import numpy as np
 import os
+import json
+import argparse
 import time
 import threading
 import logging
+from concurrent.futures import CancelledError, ThreadPoolExecutor, TimeoutError
 from datetime import datetime
 from pathlib import Path
+from types import MappingProxyType
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from PIL import Image
 
+from detection_pool import DetectionWorkerPool, PRIORITY_LIVE, make_priority
+from detection_cache import DetectionCache, fingerprint_params
+from eye_filters import best_eye_pair, filter_eye_boxes, overlap_nms
+from detector_backends import HaarFaceDetector, create_face_detector, get_backend_costs
+from crop_pipeline import CropPipeline, content_digest, get_stage_timings
+from atlas_builder import EyeAtlasBuilder
+from eye_events import EyeEventBatcher
+from ingest_queue import IngestQueue
+from qos_controller import QoSController
+from backlog_checkpoint import BacklogCheckpoint, file_signature
+from near_duplicates import NearDuplicateIndex, dhash
+from pipeline_metrics import stage_timer, set_metrics_enabled, get_pipeline_metrics
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# EXIF tags used to order images by capture time
+EXIF_IFD_TAG = 0x8769
+EXIF_DATETIME = 306
+EXIF_DATETIME_ORIGINAL = 36867
+
+# Formats that support DCT-domain reduced decoding (IMREAD_REDUCED_*)
+JPEG_EXTENSIONS = {'.jpg', '.jpeg'}
+REDUCED_GRAYSCALE_FLAGS = {
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2
+}
+REDUCED_COLOR_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2
+}
+
+# Subdirectory of cropped_eyes_dir holding level-of-detail crop variants
+CROP_VARIANTS_SUBDIR = 'lod'
+
+# Cascade files used for detection (part of the detection cache key)
+FACE_CASCADE_FILE = 'haarcascade_frontalface_default.xml'
+EYE_CASCADE_FILE = 'haarcascade_eye.xml'
+
 class ImageProcessor:
     def __init__(self, socketio=None, originals_dir='data/originals', 
-                 cropped_eyes_dir='data/cropped_eyes'):
+                 cropped_eyes_dir='data/cropped_eyes', num_workers=None):
         """
         Initialize the Image Processor
         
@@ -38,6 +103,7 @@ class ImageProcessor:
             socketio: Flask-SocketIO instance for real-time notifications
             originals_dir: Directory containing original images
             cropped_eyes_dir: Directory to save cropped eye images
+            num_workers: Number of parallel detection workers (defaults to CPU count)
         """
         self.socketio = socketio
         self.originals_dir = Path(originals_dir)
@@ -46,16 +112,136 @@ class ImageProcessor:
         # Create directories if they don't exist
         self.originals_dir.mkdir(parents=True, exist_ok=True)
         self.cropped_eyes_dir.mkdir(parents=True, exist_ok=True)
+        self.crop_variants_dir = self.cropped_eyes_dir / CROP_VARIANTS_SUBDIR
+        self.crop_variants_dir.mkdir(parents=True, exist_ok=True)
         
         # Load OpenCV cascade classifiers
         self.face_cascade = None
         self.eye_cascade = None
+        self._thread_local = threading.local()
+        self._failed_detectors = set()
         self._load_cascades()
         
         # File monitoring
         self.observer = None
         self.is_monitoring = False
         
+        # Pipeline configuration (non-detection settings)
+        self.processing_config = {
+            'num_workers': num_workers or os.cpu_count() or 1,  # Parallel detection workers
+            'max_queue_size': 0,                                 # Pending images (0 = unbounded)
+            'backlog_latest_only': 0,                            # Only the N newest existing images (0 = all)
+            'backlog_checkpoint_enabled': True,                  # Resume the startup backlog after restarts
+            'backlog_progress_interval': 1.0,                    # Min seconds between progress reports
+            'pipeline_metrics_enabled': True,                    # Per-stage latency histograms
+            'pipeline_metrics_push_interval': 0.0,               # Seconds between 'pipeline_metrics' events (0 = off)
+            'single_threaded_opencv': True,                      # One OpenCV thread per worker
+            'cache_enabled': True,                               # Reuse results for unchanged originals
+            'cache_max_entries': 5000,                           # LRU eviction beyond this many results
+            'region_workers': os.cpu_count() or 1,               # Threads for per-image tiles/face ROIs
+            'parallel_faces': True,                              # Run per-face eye stages concurrently
+            'atlas_enabled': True,                               # Pack crops into atlases (reconnecting clients load those)
+            'atlas_size': 2048,                                  # Atlas sheet width/height in pixels
+            'atlas_slot_size': (128, 64),                        # Atlas slot (width, height) per eye
+            'eye_event_mode': 'batched',                         # 'batched', 'per_eye' (legacy) or 'both'
+            'eye_event_flush_interval': 0.1,                     # Min seconds between events in a burst
+            'eye_event_max_batch': 200,                          # Flush early at this many pending eyes
+            'ingest_max_pending': 1000,                          # New files waiting to finish writing
+            'ingest_settle_time': 0.3,                           # Seconds of unchanged size/mtime = written
+            'ingest_poll_interval': 0.05,                        # Seconds between readiness checks
+            'ingest_timeout': 30.0,                              # Process files that never settle after this
+            'qos_enabled': True,                                 # Switch detection profiles under load
+            'qos_target_latency': 1.0,                           # Seconds from arrival to saved eyes
+            'qos_min_dwell': 3.0,                                # Minimum seconds between profile changes
+            'near_duplicate_mode': 'off',                        # Burst frames: 'reuse' face boxes, 'skip' or 'off'
+            'near_duplicate_max_distance': 10,                   # Max dHash Hamming distance (of 256 bits)
+            'near_duplicate_history': 64                         # Recently detected frames compared against
+        }
+        
+        set_metrics_enabled(self.processing_config['pipeline_metrics_enabled'])
+        self._last_metrics_push = 0.0
+        
+        # OpenCV parallelises detectMultiScale internally; with several workers
+        # that oversubscribes the cores, so give each worker a single thread
+        if self.processing_config['num_workers'] > 1 and self.processing_config['single_threaded_opencv']:
+            cv2.setNumThreads(1)
+        
+        # Persistent detection result cache (stored next to the data directories)
+        self.detection_cache = None
+        if self.processing_config['cache_enabled']:
+            self.detection_cache = DetectionCache(
+                self.cropped_eyes_dir.parent / 'detection_cache.json',
+                self.cropped_eyes_dir,
+                max_entries=self.processing_config['cache_max_entries']
+            )
+        
+        # Texture atlases of all eye crops (stored next to the data directories)
+        self.atlas_builder = None
+        if self.processing_config['atlas_enabled']:
+            self.atlas_builder = EyeAtlasBuilder(
+                self.cropped_eyes_dir.parent / 'atlases',
+                atlas_size=self.processing_config['atlas_size'],
+                slot_size=self.processing_config['atlas_slot_size']
+            )
+        
+        # Hashes of recently detected frames, so burst shots skip the cascades
+        self.near_duplicates = None
+        if self.processing_config['near_duplicate_mode'] != 'off':
+            self.near_duplicates = NearDuplicateIndex(
+                max_entries=self.processing_config['near_duplicate_history'],
+                max_distance=self.processing_config['near_duplicate_max_distance']
+            )
+        
+        # Originals already processed, so a restarted backlog resumes where it stopped
+        self.backlog_checkpoint = None
+        if self.processing_config['backlog_checkpoint_enabled']:
+            self.backlog_checkpoint = BacklogCheckpoint(
+                self.cropped_eyes_dir.parent / 'backlog_checkpoint.json',
+                self.cropped_eyes_dir
+            )
+        
+        # Background processing of existing originals (see start_backlog_processing)
+        self._backlog_thread = None
+        self._backlog_stop = threading.Event()
+        self._backlog_futures = []
+        self.backlog_progress = {'state': 'idle'}
+        self._backlog_lock = threading.Lock()
+        
+        # Queued or running originals by path: {'signature', 'live', 'future'} (one job per
+        # file version); released on completion, finished versions are skipped by the checkpoint
+        self._claims = {}
+        self._claims_lock = threading.RLock()  # cancel() runs on_failed (which releases) synchronously
+        
+        # Client notifications for saved eyes (one event per image/flush, or per eye)
+        self.eye_events = None
+        if self.socketio:
+            self.eye_events = EyeEventBatcher(
+                self.socketio.emit,
+                mode=self.processing_config['eye_event_mode'],
+                flush_interval=self.processing_config['eye_event_flush_interval'],
+                max_batch_eyes=self.processing_config['eye_event_max_batch']
+            )
+        
+        # New files from the directory observer wait here until completely written
+        self.ingest_queue = IngestQueue(
+            lambda path: self.submit_image(path, live=True),
+            max_pending=self.processing_config['ingest_max_pending'],
+            settle_time=self.processing_config['ingest_settle_time'],
+            poll_interval=self.processing_config['ingest_poll_interval'],
+            timeout=self.processing_config['ingest_timeout']
+        )
+        
+        # Executor for concurrent work inside one image (created lazily)
+        self._region_executor = None
+        self._region_executor_lock = threading.Lock()
+        
+        # Detection worker pool (started lazily on first submission)
+        self.worker_pool = DetectionWorkerPool(
+            self.process_image,
+            num_workers=self.processing_config['num_workers'],
+            max_queue_size=self.processing_config['max_queue_size']
+        )
+        
         # Enhanced detection parameters - Tuned to reduce false positives
         self.detection_params = {
             'face_scale_factor': 1.1,       # Less sensitive face detection (was 1.05)
@@ -67,29 +253,88 @@ class ImageProcessor:
             'padding_factor': 0.2,          # 20% padding around detected eyes
             'max_dimension': 120,           # Maximum dimension while preserving aspect ratio
             'min_dimension': 15,            # Larger minimum dimension (was 12)
+            'crop_sharpen_amount': 0.2,     # Weight of the sharpened crop in the final blend
+            'crop_sharpen_mode': 'exact',   # 'exact' (filter + blend) or 'fused' (single kernel)
+            'crop_colour_gain': 1.0,        # Crop colour gain (1.0 = unchanged)
+            'crop_colour_gamma': 1.0,       # Crop colour gamma (1.0 = unchanged)
+            'crop_jpeg_quality': 95,        # JPEG quality of saved crops
+            'crop_variant_sizes': [32, 64], # Level-of-detail variants (longest side, px); [] = none
+            'crop_variant_format': 'jpg',   # 'jpg' or 'webp' for the variants
+            'crop_variant_quality': 85,     # Encoder quality of the variants
             'quality_threshold': 55,        # Higher area threshold (was 40)
             # Additional filtering for anatomical constraints
             'max_eyes_per_face': 3,         # Maximum reasonable eyes per face
-            'eye_position_filter': True,    # Enable position-based filtering
-            'upper_face_ratio': 0.7         # Eyes should be in upper 70% of face
+            'eye_position_filter': True,    # Post-detection position filter (safety net behind eye_band)
+            'upper_face_ratio': 0.7,        # Eyes should be in upper 70% of face
+            # Detection resolution
+            'detection_max_dimension': 1280,# Long edge of face detection proxy (None = full frame)
+            # Cascade search windows
+            'search_window_policy': 'adaptive', # 'adaptive' (derived from image size) or 'fixed'
+            'face_size_range': (0.1, 1.0),  # Expected face side as fraction of the image short edge
+            'eye_size_range': (0.08, 0.5),  # Expected eye side as fraction of the face ROI width
+            # Eye search band
+            'eye_band_enabled': True,       # Only search eyes inside the horizontal eye band
+            'eye_band': (0.1, 0.65),        # Band as fractions of the padded face ROI height
+            # Tiled face detection (group photos; pair with a small face_size_range upper bound)
+            'tiled_face_detection': False,  # Split large frames into overlapping tiles
+            'tile_size_factor': 4,          # Tile side as a multiple of the largest expected face
+            # Face detector backend
+            'face_detector': 'haar',        # 'haar' or 'yunet' (see detector_backends.py)
+            'yunet_model_path': None,       # Local ONNX model (None = models/face_detection_yunet_2023mar.onnx)
+            'yunet_score_threshold': 0.8,   # Minimum YuNet face confidence
+            # Tiered detection: later tiers only run when earlier ones found no eyes
+            'tiered_detection': False,      # True = escalate through the tiers below (up to ~10x per faceless frame)
+            'detection_time_budget': 1.5,   # Seconds per image before further tiers are skipped
+            'detection_tiers': [
+                {'name': 'frontal_default'},
+                {'name': 'frontal_alt2', 'face_detector': 'haar',
+                 'cascade_file': 'haarcascade_frontalface_alt2.xml'},
+                {'name': 'frontal_loose', 'params': {'face_scale_factor': 1.05, 'face_min_neighbors': 3}},
+                {'name': 'profile', 'face_detector': 'haar',
+                 'cascade_file': 'haarcascade_profileface.xml'},
+                {'name': 'eye_only', 'mode': 'eye_only',
+                 'params': {'eye_min_neighbors': 8, 'max_eyes_per_face': 2, 'eye_position_filter': False}}
+            ]
         }
         
+        # Hit rate and cost per detection tier
+        self._tier_stats = {}
+        self._tier_stats_lock = threading.Lock()
+        self.search_window_policy = SearchWindowPolicy(self.detection_params)
+        
+        # Adaptive quality of service (steps detection_params through cheaper profiles)
+        self.qos = None
+        if self.processing_config['qos_enabled']:
+            self.qos = QoSController(
+                lambda: self.worker_pool.get_pending_count(PRIORITY_LIVE),
+                num_workers=self.processing_config['num_workers'],
+                target_latency=self.processing_config['qos_target_latency'],
+                min_dwell=self.processing_config['qos_min_dwell'],
+                emit_fn=self.socketio.emit if self.socketio else None
+            )
+        
+    def _create_cascades(self):
+        """Create a fresh face/eye cascade classifier pair"""
+        # Try to load face cascade (built-in with OpenCV)
+        face_cascade = cv2.CascadeClassifier(
+            cv2.data.haarcascades + FACE_CASCADE_FILE
+        )
+        
+        # Try to load eye cascade (built-in with OpenCV)
+        eye_cascade = cv2.CascadeClassifier(
+            cv2.data.haarcascades + EYE_CASCADE_FILE
+        )
+        
+        if face_cascade.empty() or eye_cascade.empty():
+            raise Exception("Failed to load cascade classifiers")
+        
+        return face_cascade, eye_cascade
+    
     def _load_cascades(self):
         """Load OpenCV Haar cascade classifiers for face and eye detection"""
         try:
-            # Try to load face cascade (built-in with OpenCV)
-            self.face_cascade = cv2.CascadeClassifier(
-                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-            )
-            
-            # Try to load eye cascade (built-in with OpenCV)
-            self.eye_cascade = cv2.CascadeClassifier(
-                cv2.data.haarcascades + 'haarcascade_eye.xml'
-            )
-            
-            if self.face_cascade.empty() or self.eye_cascade.empty():
-                raise Exception("Failed to load cascade classifiers")
-                
+            self.face_cascade, self.eye_cascade = self._create_cascades()
+            self._thread_local.cascades = (self.face_cascade, self.eye_cascade)
             logger.info("Successfully loaded OpenCV cascade classifiers")
             
         except Exception as e:
@@ -98,6 +343,80 @@ class ImageProcessor:
             self.face_cascade = None
             self.eye_cascade = None
     
+    def _get_thread_cascades(self):
+        """
+        Get the cascade pair owned by the calling thread
+        
+        CascadeClassifier instances are not safe to share between threads,
+        so every detection worker lazily loads its own copy.
+        """
+        cascades = getattr(self._thread_local, 'cascades', None)
+        if cascades is None:
+            cascades = self._create_cascades()
+            self._thread_local.cascades = cascades
+        return cascades
+    
+    def _get_thread_face_detector(self, tier=None):
+        """
+        Get the calling thread's instance of a face detector backend
+        
+        Args:
+            tier: Optional detection tier; its 'face_detector' and 'cascade_file'
+                  select the backend instead of detection_params['face_detector']
+        
+        Falls back to the default Haar cascade if the requested backend cannot
+        be created (e.g. a missing YuNet model file).
+        """
+        tier = tier or {}
+        name = tier.get('face_detector') or self.detection_params.get('face_detector', 'haar')
+        cascade_file = tier.get('cascade_file') if name == HaarFaceDetector.name else None
+        key = f"{name}:{cascade_file or ''}"
+        
+        detectors = getattr(self._thread_local, 'face_detectors', None)
+        if detectors is None:
+            detectors = {}
+            self._thread_local.face_detectors = detectors
+        
+        detector = detectors.get(key)
+        if detector is None:
+            if name != HaarFaceDetector.name or (cascade_file and cascade_file != FACE_CASCADE_FILE):
+                try:
+                    options = {'cascade_file': cascade_file} if cascade_file else {}
+                    detector = create_face_detector(name, self.detection_params, **options)
+                except Exception as e:
+                    if key not in self._failed_detectors:
+                        self._failed_detectors.add(key)
+                        logger.error(f"Could not create face detector '{key}', using Haar cascade: {e}")
+            if detector is None:
+                face_cascade, _ = self._get_thread_cascades()
+                detector = HaarFaceDetector(self.detection_params, FACE_CASCADE_FILE, cascade=face_cascade)
+            detectors[key] = detector
+        return detector
+    
+    def get_detector_costs(self):
+        """Get the measured face detection cost per megapixel of each backend"""
+        return get_backend_costs()
+    
+    def get_cascade_version(self):
+        """Identify the detector models in use (part of the detection cache key)"""
+        return f"opencv-{cv2.__version__}:{self._get_thread_face_detector().version}:{EYE_CASCADE_FILE}"
+    
+    def get_detection_params(self):
+        """
+        Immutable snapshot of the detection parameters for one image
+        
+        The active QoS profile's overrides are applied on top of
+        detection_params. process_image takes one snapshot per image and
+        passes it to every stage, so a profile change mid-image has no effect
+        on that image and its cache fingerprint.
+        """
+        overrides = self.qos.profile_params if self.qos is not None else {}
+        return MappingProxyType(dict(self.detection_params, **overrides))
+    
+    def get_params_fingerprint(self, params=None):
+        """Fingerprint of detection parameters (default: the base detection_params) and cascade version"""
+        return fingerprint_params(dict(params or self.detection_params), self.get_cascade_version())
+    
     def detect_faces_and_eyes(self, image_path):
         """
         Detect faces and eyes in an image, then crop and save eye regions with preserved aspect ratios
@@ -108,214 +427,785 @@ class ImageProcessor:
         Returns:
             List of saved eye image filenames
         """
+        result = self.process_image(image_path)
+        return list(result['eye_filenames']) if result else []
+    
+    def process_image(self, image_path):
+        """
+        Detect faces and eyes in an image and return the full result record
+        
+        Unchanged images processed before with the same detection_params are
+        served from the detection cache without re-running detection.
+        
+        Args:
+            image_path: Path to the input image
+            
+        Returns:
+            Dictionary with 'faces', 'eyes', 'eye_filenames' and 'detection_seconds',
+            or None on failure
+        """
+        params = self.get_detection_params()
+        fingerprint = None
+        cache_key = None
+        if self.detection_cache is not None:
+            with stage_timer('cache_lookup'):
+                content_hash = self.detection_cache.content_hash(image_path)
+                if content_hash:
+                    fingerprint = self.get_params_fingerprint(params)
+                    cache_key = self.detection_cache.make_key(content_hash, fingerprint)
+                    cached = self.detection_cache.get(cache_key)
+            if cache_key is not None and cached is not None:
+                logger.info(f"Detection cache hit for {Path(image_path).name} "
+                            f"({len(cached['eye_filenames'])} eyes)")
+                return dict(cached, cached=True)
+        
+        start_time = time.perf_counter()
+        with stage_timer('image_total'):
+            result = self._run_detection(image_path, params, fingerprint)
+        if result is None:
+            return None
+        result['detection_seconds'] = round(time.perf_counter() - start_time, 4)
+        
+        # Near-duplicate results depend on which burst frame finished first, so they are never cached
+        if cache_key is not None and 'near_duplicate_of' not in result:
+            self.detection_cache.put(cache_key, fingerprint, result)
+        
+        return result
+    
+    def _run_detection(self, image_path, params=None, fingerprint=None):
+        """
+        Run face and eye detection on an image and save the eye crops
+        
+        Args:
+            image_path: Path to the input image
+            params: Detection parameter snapshot for this image (see get_detection_params)
+            fingerprint: Fingerprint of params, if already computed
+        
+        Returns:
+            Result dictionary with full-resolution face boxes, eye records and
+            saved filenames, or None if the image could not be processed
+        """
+        params = params or self.get_detection_params()
         try:
-            # Read the image
-            img = cv2.imread(str(image_path))
-            if img is None:
+            # Phase 1: grayscale detection input (reduced-resolution decode for JPEG)
+            with stage_timer('decode_gray'):
+                img, gray, decode_scale, full_shape = self._load_detection_image(image_path, params)
+            if gray is None:
                 logger.error(f"Could not read image: {image_path}")
-                return []
+                return None
             
-            # Convert to grayscale for detection
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            # If cascades aren't loaded, return no result (no dummy generation)
+            if self.face_cascade is None or self.eye_cascade is None:
+                logger.error("Cascade classifiers not loaded - cannot process images")
+                return None
+            
+            # Burst frames: reuse the result of a near-identical frame detected recently
+            near_key = None
+            if self.near_duplicates is not None:
+                with stage_timer('perceptual_hash'):
+                    frame_hash = dhash(gray)
+                    near_key = (tuple(full_shape), fingerprint or self.get_params_fingerprint(params))
+                    near_duplicate = self.near_duplicates.find(frame_hash, near_key, Path(image_path).name)
+                if near_duplicate is not None:
+                    result = self._process_near_duplicate(image_path, img, params, *near_duplicate)
+                    if result is not None:
+                        return result
+                    self.near_duplicates.record_fallback()
+            
+            # Build the (possibly downscaled) face detection proxy
+            with stage_timer('detection_proxy'):
+                detection_gray, proxy_scale = self._build_detection_proxy(gray, params)
+            detection_scale = decode_scale * proxy_scale
             
             # Apply histogram equalization for better detection
-            gray = cv2.equalizeHist(gray)
+            with stage_timer('equalize_hist'):
+                detection_gray = cv2.equalizeHist(detection_gray)
+            if detection_scale == 1.0:
+                gray = detection_gray
             
-            # If cascades aren't loaded, return empty list (no dummy generation)
-            if self.face_cascade is None or self.eye_cascade is None:
-                logger.error("Cascade classifiers not loaded - cannot process images")
-                return []
-            
-            # Detect faces with improved parameters
-            faces = self.face_cascade.detectMultiScale(
-                gray, 
-                scaleFactor=self.detection_params['face_scale_factor'], 
-                minNeighbors=self.detection_params['face_min_neighbors'],
-                minSize=self.detection_params['face_min_size']
-            )
+            cascade_scales = {'face': 0, 'eye': 0}
             
-            eye_filenames = []
+            # Run the detection tiers, cheapest first, until one of them finds eyes
+            tiers = self._get_detection_tiers(params)
+            budget = params.get('detection_time_budget')
+            start_time = time.perf_counter()
+            faces, eye_records = [], []
+            detection_colour = None
+            tiers_tried = []
+            budget_exhausted = False
             
-            for i, (x, y, w, h) in enumerate(faces):
-                # Extract face region with some padding for better eye detection
-                face_padding = int(max(w, h) * 0.1)
-                face_x1 = max(0, x - face_padding)
-                face_y1 = max(0, y - face_padding)
-                face_x2 = min(img.shape[1], x + w + face_padding)
-                face_y2 = min(img.shape[0], y + h + face_padding)
+            for tier_index, tier in enumerate(tiers):
+                elapsed = time.perf_counter() - start_time
+                if tier_index > 0 and budget and elapsed + self._expected_tier_cost(tier['name']) > budget:
+                    budget_exhausted = True
+                    self._record_tier_skip(tier['name'])
+                    logger.warning(f"Detection budget of {budget}s exhausted after {elapsed:.2f}s "
+                                   f"for {Path(image_path).name}; skipping tier '{tier['name']}' and later")
+                    break
                 
-                face_roi_gray = gray[face_y1:face_y2, face_x1:face_x2]
-                face_roi_color = img[face_y1:face_y2, face_x1:face_x2]
+                tier_start = time.perf_counter()
+                tier_params = dict(params, **tier.get('params', {}))
                 
-                # Detect eyes in the face region with improved parameters
-                eyes = self.eye_cascade.detectMultiScale(
-                    face_roi_gray,
-                    scaleFactor=self.detection_params['eye_scale_factor'],
-                    minNeighbors=self.detection_params['eye_min_neighbors'],
-                    minSize=self.detection_params['eye_min_size']
-                )
+                if tier.get('mode') == 'eye_only':
+                    faces = []
+                    eyes = self._detect_eyes_full_frame(detection_gray, detection_scale, full_shape,
+                                                        tier_params, cascade_scales)
+                    # Without a face, only a plausible left/right pair counts as eyes
+                    with stage_timer('eye_filter'):
+                        eyes = best_eye_pair(self._filter_eye_detections(eyes, tier_params))
+                    if len(eyes) > 0 and img is None:
+                        with stage_timer('decode_colour'):
+                            img = cv2.imread(str(image_path))
+                    if len(eyes) > 0 and img is not None:
+                        eye_records = self._filter_and_process_eyes(
+                            eyes, img, 0, image_path, filter_params=tier_params
+                        )
+                else:
+                    # Colour-trained backends (YuNet) get a BGR proxy instead of the equalized gray one
+                    detection_image = detection_gray
+                    if self._get_thread_face_detector(tier).input_colour:
+                        if detection_colour is None:
+                            with stage_timer('colour_proxy'):
+                                detection_colour = self._build_colour_proxy(image_path, img, detection_gray.shape)
+                        if detection_colour is not None:
+                            detection_image = detection_colour
+                    
+                    with stage_timer('face_cascade'):
+                        faces = self._detect_faces_for_tier(detection_image, detection_scale, full_shape,
+                                                            tier, tier_params, cascade_scales)
+                    
+                    # Phase 2: decode full-resolution colour only if there are faces to crop from
+                    if len(faces) > 0 and img is None:
+                        with stage_timer('decode_colour'):
+                            img = cv2.imread(str(image_path))
+                        if img is None:
+                            logger.error(f"Could not decode colour image: {image_path}")
+                            return None
+                    
+                    face_rois = self._extract_face_rois(img, gray if detection_scale == 1.0 else None, faces)
+                    
+                    # Eye stage: fan face ROIs out to the region executor, gather in face order
+                    eye_records = []
+                    for face_eye_records, face_eye_scales in self._process_face_rois(face_rois, image_path,
+                                                                                     tier_params):
+                        eye_records.extend(face_eye_records)
+                        cascade_scales['eye'] += face_eye_scales
                 
-                # Filter and process detected eyes
-                processed_eyes = self._filter_and_process_eyes(eyes, face_roi_color, i, image_path)
-                eye_filenames.extend(processed_eyes)
+                tiers_tried.append(tier['name'])
+                self._record_tier_result(tier['name'], time.perf_counter() - tier_start, bool(eye_records))
+                
+                if eye_records:
+                    break
+                if tier_index + 1 < len(tiers):
+                    logger.info(f"Tier '{tier['name']}' found no eyes in {Path(image_path).name}, escalating")
             
+            eye_filenames = [record['filename'] for record in eye_records]
             if eye_filenames:
                 logger.info(f"Processed {len(eye_filenames)} eyes from {image_path}")
             else:
                 logger.warning(f"No eyes detected in {image_path}")
-                
-            return eye_filenames
+            
+            result = {
+                'faces': [[int(v) for v in face] for face in faces],
+                'eyes': eye_records,
+                'eye_filenames': eye_filenames,
+                'cascade_scales': cascade_scales,
+                'tier': tiers_tried[-1] if eye_records else None,
+                'tiers_tried': tiers_tried,
+                'budget_exhausted': budget_exhausted
+            }
+            
+            # Only fully detected frames are indexed, so reused boxes never drift along a burst
+            if near_key is not None:
+                self.near_duplicates.add(frame_hash, near_key, Path(image_path).name, {
+                    'faces': result['faces'],
+                    'eyes': [{key: record[key] for key in ('face_index', 'eye_index', 'box')}
+                             for record in eye_records],
+                    'tier': result['tier']
+                })
+            return result
             
         except Exception as e:
             logger.error(f"Error processing image {image_path}: {e}")
-            return []
+            return None
     
-    def _filter_and_process_eyes(self, eyes, face_roi_color, face_index, image_path):
-        """Filter detected eyes and process them with aspect ratio preservation"""
-        eye_filenames = []
+    def _process_near_duplicate(self, image_path, img, params, reference, source, distance):
+        """
+        Build the result of a near-duplicate frame without running the face cascade
         
-        # Filter eyes by quality and remove duplicates
-        filtered_eyes = self._filter_eye_detections(eyes)
+        In 'reuse' mode the eye cascade is re-run inside the reference frame's face
+        ROIs on this frame, so crops follow the eyes even if the subject moved a
+        little; in 'skip' mode no crops are saved.
         
-        for j, (ex, ey, ew, eh) in enumerate(filtered_eyes):
-            try:
-                # Extract eye region with natural eye proportions and padding
-                padded_eye_img = self._extract_eye_with_padding(face_roi_color, ex, ey, ew, eh)
-                
-                if padded_eye_img is not None:
-                    # Generate filename with timestamp
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
-                    base_name = Path(image_path).stem
-                    eye_filename = f"{base_name}_face{face_index}_eye{j}_{timestamp}.jpg"
-                    eye_path = self.cropped_eyes_dir / eye_filename
-                    
-                    # Save the eye image with preserved aspect ratio
-                    if self._save_eye_image_enhanced(padded_eye_img, eye_path):
-                        eye_filenames.append(eye_filename)
-                        logger.info(f"Saved enhanced eye image: {eye_filename} (size: {padded_eye_img.shape[1]}x{padded_eye_img.shape[0]})")
-                        
-            except Exception as e:
-                logger.error(f"Error processing eye {j} from face {face_index}: {e}")
-                continue
+        Args:
+            image_path: Path to the near-duplicate image
+            img: Full-resolution colour image if already decoded, else None
+            params: Detection parameter snapshot for this image
+            reference: Faces, eye boxes and tier of the reference frame
+            source: Name of the reference image
+            distance: Hamming distance between the two frame hashes
+            
+        Returns:
+            Result dictionary (see _run_detection) with 'near_duplicate_of' and
+            'hash_distance', or None if the frame needs full detection (eyes of
+            the reference not found again, eye-only reference, decode failure)
+        """
+        eye_records = []
+        eye_scales = 0
+        reuse = self.processing_config['near_duplicate_mode'] == 'reuse'
+        
+        if reuse and reference['eyes']:
+            # Eye-only results have no face ROI to verify in
+            if not reference['faces']:
+                return None
+            
+            if img is None:
+                with stage_timer('decode_colour'):
+                    img = cv2.imread(str(image_path))
+                if img is None:
+                    return None
+            
+            # Search with the parameters of the tier that found the reference eyes
+            tier = next((tier for tier in self._get_detection_tiers(params)
+                         if tier['name'] == reference['tier']), {})
+            tier_params = dict(params, **tier.get('params', {}))
+            
+            face_rois = self._extract_face_rois(img, None, reference['faces'])
+            for face_eye_records, face_eye_scales in self._process_face_rois(face_rois, image_path,
+                                                                             tier_params):
+                eye_records.extend(face_eye_records)
+                eye_scales += face_eye_scales
+            
+            if len(eye_records) < len(reference['eyes']):
+                logger.info(f"{Path(image_path).name} matched {source} (distance {distance}) but only "
+                            f"{len(eye_records)} of {len(reference['eyes'])} eyes were found again; "
+                            f"running full detection")
+                return None
+        
+        action = f"re-detected {len(eye_records)} eyes in reused face boxes" if reuse else "skipped"
+        logger.info(f"{Path(image_path).name} is a near duplicate of {source} (distance {distance}); {action}")
         
-        return eye_filenames
+        return {
+            'faces': reference['faces'] if reuse else [],
+            'eyes': eye_records,
+            'eye_filenames': [record['filename'] for record in eye_records],
+            'cascade_scales': {'face': 0, 'eye': eye_scales},
+            'tier': reference['tier'] if eye_records else None,
+            'tiers_tried': [],
+            'budget_exhausted': False,
+            'near_duplicate_of': source,
+            'hash_distance': distance
+        }
     
-    def _filter_eye_detections(self, eyes):
-        """Filter eye detections to remove poor quality, overlapping, and anatomically incorrect detections"""
-        if len(eyes) == 0:
-            return []
+    def _get_detection_tiers(self, params=None):
+        """Get the configured detection tiers (only the first one when tiering is disabled)"""
+        params = params or self.detection_params
+        tiers = params.get('detection_tiers') or [{'name': 'default'}]
+        if not params.get('tiered_detection', False):
+            return tiers[:1]
+        return tiers
+    
+    def _detect_faces_for_tier(self, detection_image, detection_scale, full_shape, tier, tier_params,
+                               cascade_scales):
+        """
+        Detect faces with one tier's backend and parameters
         
-        # Filter by minimum area first
-        min_area = self.detection_params['quality_threshold']
-        quality_eyes = []
+        Args:
+            detection_image: Equalized gray detection proxy, or its BGR version for
+                             backends with input_colour
         
-        for (ex, ey, ew, eh) in eyes:
-            area = ew * eh
-            if area >= min_area:
-                quality_eyes.append((ex, ey, ew, eh, area))
+        Returns:
+            Face boxes in full-resolution coordinates
+        """
+        face_detector = self._get_thread_face_detector(tier)
         
-        if len(quality_eyes) == 0:
-            return []
+        # Derive the face search window for this image
+        face_min_size, face_max_size = self.search_window_policy.face_window(
+            detection_image.shape, detection_scale, tier_params
+        )
         
-        # Apply anatomical filtering if enabled
-        if self.detection_params.get('eye_position_filter', False):
-            quality_eyes = self._apply_anatomical_filtering(quality_eyes)
+        # Detect faces with improved parameters (whole frame or overlapping tiles)
+        tiles = self._compute_face_tiles(detection_image.shape, face_max_size, tier_params)
+        if len(tiles) > 1:
+            faces = self._detect_faces_tiled(
+                detection_image, tiles, face_min_size, face_max_size, cascade_scales, tier, tier_params
+            )
+        else:
+            if face_detector.uses_cascade_pyramid:
+                cascade_scales['face'] += SearchWindowPolicy.count_scales(
+                    detection_image.shape, SearchWindowPolicy.FACE_WINDOW,
+                    tier_params['face_scale_factor'], face_min_size, face_max_size
+                )
+            faces = face_detector.detect(detection_image, face_min_size, face_max_size, tier_params)
         
-        # Remove overlapping detections (keep larger ones)
-        filtered_eyes = []
-        quality_eyes.sort(key=lambda x: x[4], reverse=True)  # Sort by area, largest first
+        # Map proxy boxes back to full-resolution coordinates
+        return self._map_boxes_to_full_resolution(faces, detection_scale, full_shape)
+    
+    def _extract_face_rois(self, img, gray, faces):
+        """
+        Cut the padded face ROIs out of the full frame
         
-        for (ex, ey, ew, eh, area) in quality_eyes:
-            overlap = False
-            for (fx, fy, fw, fh) in filtered_eyes:
-                # Check for significant overlap
-                if self._rectangles_overlap(ex, ey, ew, eh, fx, fy, fw, fh):
-                    overlap = True
-                    break
+        Args:
+            img: Full-resolution colour image
+            gray: Equalized full-resolution gray image, or None to convert each ROI
+            faces: Face boxes in full-resolution coordinates
+        
+        Returns:
+            List of (face index, ROI x offset, ROI y offset, gray ROI, colour ROI)
+        """
+        face_rois = []
+        for i, face in enumerate(faces):
+            face_x1, face_y1, face_x2, face_y2 = self._face_roi_bounds(face, img.shape)
+            
+            if gray is not None:
+                face_roi_gray = gray[face_y1:face_y2, face_x1:face_x2]
+                face_roi_color = img[face_y1:face_y2, face_x1:face_x2]
+            else:
+                # Without a full-resolution gray frame (proxy mode), convert and
+                # equalize just this ROI
+                face_roi_color = img[face_y1:face_y2, face_x1:face_x2]
+                face_roi_gray = cv2.equalizeHist(cv2.cvtColor(face_roi_color, cv2.COLOR_BGR2GRAY))
             
-            if not overlap:
-                filtered_eyes.append((ex, ey, ew, eh))
+            face_rois.append((i, face_x1, face_y1, face_roi_gray, face_roi_color))
+        return face_rois
+    
+    def _face_roi_bounds(self, face, image_shape):
+        """(x1, y1, x2, y2) of a full-resolution face box padded by 10% for eye detection"""
+        x, y, w, h = face
+        face_padding = int(max(w, h) * 0.1)
+        return (max(0, x - face_padding), max(0, y - face_padding),
+                min(image_shape[1], x + w + face_padding), min(image_shape[0], y + h + face_padding))
+    
+    def _detect_eyes_full_frame(self, detection_gray, detection_scale, full_shape, tier_params,
+                                cascade_scales):
+        """
+        Last-resort eye-only search over the whole detection image
         
-        # Limit to reasonable number of eyes per face
-        max_eyes = self.detection_params.get('max_eyes_per_face', 4)
-        filtered_eyes = filtered_eyes[:max_eyes]
+        Used by the 'eye_only' tier when no face detector found usable faces.
         
-        return filtered_eyes
+        Returns:
+            Eye boxes in full-resolution coordinates
+        """
+        _, eye_cascade = self._get_thread_cascades()
+        
+        eye_min = tier_params['eye_min_size']
+        min_side = max(SearchWindowPolicy.EYE_WINDOW[0], int(round(eye_min[0] * detection_scale)))
+        max_side = max(min_side, int(min(detection_gray.shape[:2]) * 0.25))
+        min_size, max_size = (min_side, min_side), (max_side, max_side)
+        
+        cascade_scales['eye'] += SearchWindowPolicy.count_scales(
+            detection_gray.shape, SearchWindowPolicy.EYE_WINDOW,
+            tier_params['eye_scale_factor'], min_size, max_size
+        )
+        with stage_timer('eye_cascade'):
+            eyes = eye_cascade.detectMultiScale(
+                detection_gray,
+                scaleFactor=tier_params['eye_scale_factor'],
+                minNeighbors=tier_params['eye_min_neighbors'],
+                minSize=min_size,
+                maxSize=max_size
+            )
+        return self._map_boxes_to_full_resolution(eyes, detection_scale, full_shape)
     
-    def _apply_anatomical_filtering(self, quality_eyes):
-        """Apply anatomical constraints to filter out false positives"""
-        if not quality_eyes:
-            return []
+    def _expected_tier_cost(self, tier_name):
+        """Mean measured seconds per attempt of a tier (0 until it has run)"""
+        with self._tier_stats_lock:
+            stats = self._tier_stats.get(tier_name)
+            if not stats or not stats['attempts']:
+                return 0.0
+            return stats['seconds'] / stats['attempts']
+    
+    def _tier_stats_entry(self, tier_name):
+        """Get (creating if needed) the statistics entry of a tier (caller holds the lock)"""
+        return self._tier_stats.setdefault(
+            tier_name, {'attempts': 0, 'hits': 0, 'seconds': 0.0, 'skipped_for_budget': 0}
+        )
+    
+    def _record_tier_result(self, tier_name, seconds, hit):
+        """Record the cost and outcome of one tier attempt"""
+        with self._tier_stats_lock:
+            stats = self._tier_stats_entry(tier_name)
+            stats['attempts'] += 1
+            stats['seconds'] += seconds
+            if hit:
+                stats['hits'] += 1
+    
+    def _record_tier_skip(self, tier_name):
+        """Record that a tier was skipped because the time budget ran out"""
+        with self._tier_stats_lock:
+            self._tier_stats_entry(tier_name)['skipped_for_budget'] += 1
+    
+    def get_tier_stats(self):
+        """Get hit rate and mean cost of every detection tier, in chain order"""
+        with self._tier_stats_lock:
+            stats_by_name = {name: dict(stats) for name, stats in self._tier_stats.items()}
+        
+        tier_stats = []
+        for tier in self._get_detection_tiers():
+            stats = stats_by_name.get(tier['name'], {'attempts': 0, 'hits': 0, 'seconds': 0.0,
+                                                     'skipped_for_budget': 0})
+            attempts = stats['attempts']
+            tier_stats.append({
+                'name': tier['name'],
+                'attempts': attempts,
+                'hits': stats['hits'],
+                'hit_rate': round(stats['hits'] / attempts, 3) if attempts else None,
+                'mean_ms': round(stats['seconds'] * 1000 / attempts, 1) if attempts else None,
+                'skipped_for_budget': stats['skipped_for_budget']
+            })
+        return tier_stats
+    
+    def _process_face_rois(self, face_rois, image_path, params=None):
+        """
+        Run the eye stage for every face ROI, concurrently when there are several faces
         
-        # Get face dimensions (assuming we're working within a face ROI)
-        # Eyes should typically be in the upper portion of the face
-        upper_face_ratio = self.detection_params.get('upper_face_ratio', 0.7)
+        Results are returned in face order regardless of completion order, so
+        face/eye indices in filenames and notifications stay deterministic.
         
-        # Find the overall bounds of detections to estimate face region
-        all_y_positions = [eye[1] for eye in quality_eyes]  # y coordinates
-        min_y = min(all_y_positions)
-        max_y = max(all_y_positions)
-        face_height_estimate = max_y - min_y + max([eye[3] for eye in quality_eyes])
+        Args:
+            params: Optional detection_params overrides for the eye stage (e.g. a detection tier)
         
-        # Calculate the upper face threshold
-        upper_face_threshold = min_y + (face_height_estimate * upper_face_ratio)
+        Returns:
+            List of (eye records, eye cascade scale count) per face
+        """
+        if len(face_rois) > 1 and self.processing_config.get('parallel_faces', False):
+            executor = self._get_region_executor()
+            futures = [executor.submit(self._process_face_roi, face_roi, image_path, params)
+                       for face_roi in face_rois]
+            return [future.result() for future in futures]
         
-        # Filter eyes that are too low (likely nose holes or mouth)
-        anatomically_valid_eyes = []
-        for (ex, ey, ew, eh, area) in quality_eyes:
-            eye_center_y = ey + eh // 2
-            
-            # Check if eye is in upper portion of face
-            if eye_center_y <= upper_face_threshold:
-                anatomically_valid_eyes.append((ex, ey, ew, eh, area))
-            else:
-                logger.debug(f"Filtered out low eye detection at y={eye_center_y} (threshold={upper_face_threshold:.1f})")
-        
-        # Additional filtering: remove detections that are too close vertically (likely same feature)
-        if len(anatomically_valid_eyes) > 2:
-            final_eyes = []
-            for i, (ex1, ey1, ew1, eh1, area1) in enumerate(anatomically_valid_eyes):
-                is_unique = True
-                for j, (ex2, ey2, ew2, eh2, area2) in enumerate(anatomically_valid_eyes):
-                    if i != j:
-                        # Check vertical distance between detections
-                        vertical_distance = abs(ey1 - ey2)
-                        min_separation = max(eh1, eh2) * 0.5  # Minimum separation
-                        
-                        if vertical_distance < min_separation and area1 < area2:
-                            is_unique = False  # Keep the larger detection
-                            break
-                
-                if is_unique:
-                    final_eyes.append((ex1, ey1, ew1, eh1, area1))
+        return [self._process_face_roi(face_roi, image_path, params) for face_roi in face_rois]
+    
+    def _process_face_roi(self, face_roi, image_path, params=None):
+        """
+        Detect, filter, crop and save the eyes of a single face ROI
+        
+        Args:
+            face_roi: Tuple of (face index, ROI x offset, ROI y offset, gray ROI, colour ROI)
+            image_path: Path to the source image (used for crop filenames)
+            params: Optional detection_params overrides (e.g. a detection tier)
             
-            anatomically_valid_eyes = final_eyes
+        Returns:
+            Tuple of (eye records, eye cascade scale count)
+        """
+        params = params or self.detection_params
+        i, face_x1, face_y1, face_roi_gray, face_roi_color = face_roi
+        _, eye_cascade = self._get_thread_cascades()
+        
+        # Bound the eye search window relative to the face ROI
+        eye_min_size, eye_max_size = self.search_window_policy.eye_window(face_roi_gray.shape, params)
         
-        return anatomically_valid_eyes
+        # Only scan the anatomical eye band, skipping the nose and mouth area
+        band_y1, band_y2 = self._get_eye_band(face_roi_gray.shape[0], params)
+        eye_search_gray = face_roi_gray[band_y1:band_y2]
+        
+        eye_scales = SearchWindowPolicy.count_scales(
+            eye_search_gray.shape, SearchWindowPolicy.EYE_WINDOW,
+            params['eye_scale_factor'], eye_min_size, eye_max_size
+        )
+        
+        # Detect eyes in the face region with improved parameters
+        with stage_timer('eye_cascade'):
+            eyes = eye_cascade.detectMultiScale(
+                eye_search_gray,
+                scaleFactor=params['eye_scale_factor'],
+                minNeighbors=params['eye_min_neighbors'],
+                minSize=eye_min_size,
+                maxSize=eye_max_size or (0, 0)
+            )
+        
+        # Map band coordinates back to the face ROI
+        if band_y1 and len(eyes) > 0:
+            eyes = [(ex, ey + band_y1, ew, eh) for (ex, ey, ew, eh) in eyes]
+        
+        # Filter and process detected eyes
+        eye_records = self._filter_and_process_eyes(
+            eyes, face_roi_color, i, image_path, roi_offset=(face_x1, face_y1), filter_params=params
+        )
+        return eye_records, eye_scales
+    
+    def _get_region_executor(self):
+        """Get the shared executor for concurrent tiles/face ROIs within one image"""
+        with self._region_executor_lock:
+            if self._region_executor is None:
+                self._region_executor = ThreadPoolExecutor(
+                    max_workers=max(1, self.processing_config['region_workers']),
+                    thread_name_prefix='region'
+                )
+            return self._region_executor
     
-    def _rectangles_overlap(self, x1, y1, w1, h1, x2, y2, w2, h2, threshold=0.5):
-        """Check if two rectangles overlap significantly"""
-        # Calculate intersection
-        x_left = max(x1, x2)
-        y_top = max(y1, y2)
-        x_right = min(x1 + w1, x2 + w2)
-        y_bottom = min(y1 + h1, y2 + h2)
+    def _compute_face_tiles(self, detection_shape, face_max_size, params=None):
+        """
+        Split the detection image into overlapping tiles for tiled face detection
+        
+        Tiles are tile_size_factor times the largest expected face and overlap
+        by one largest face, so every face fits entirely inside at least one tile.
+        
+        Args:
+            params: Optional detection_params overrides (e.g. a detection tier)
+        
+        Returns:
+            List of (x1, y1, x2, y2) tiles, a single full-frame tile when tiling
+            is disabled or would not split the frame
+        """
+        params = params or self.detection_params
+        height, width = detection_shape[:2]
+        full_frame = [(0, 0, width, height)]
         
-        if x_right <= x_left or y_bottom <= y_top:
-            return False
+        if not params.get('tiled_face_detection', False) or not face_max_size:
+            return full_frame
         
-        intersection_area = (x_right - x_left) * (y_bottom - y_top)
-        area1 = w1 * h1
-        area2 = w2 * h2
+        max_face = max(face_max_size)
+        tile_side = int(max_face * params.get('tile_size_factor', 4))
+        if tile_side >= max(width, height):
+            return full_frame
         
-        # Check if intersection is significant relative to smaller rectangle
-        min_area = min(area1, area2)
-        overlap_ratio = intersection_area / min_area
+        stride = max(1, tile_side - max_face)
         
-        return overlap_ratio > threshold
+        def starts(length):
+            positions = list(range(0, max(1, length - tile_side) + 1, stride))
+            if positions[-1] + tile_side < length:
+                positions.append(length - tile_side)
+            return positions
+        
+        return [
+            (x, y, min(width, x + tile_side), min(height, y + tile_side))
+            for y in starts(height)
+            for x in starts(width)
+        ]
+    
+    def _detect_faces_in_tile(self, detection_image, tile, face_min_size, face_max_size, tier=None,
+                              tier_params=None):
+        """Run the face detector on one tile and return boxes in detection-image coordinates"""
+        face_detector = self._get_thread_face_detector(tier)
+        x1, y1, x2, y2 = tile
+        faces = face_detector.detect(detection_image[y1:y2, x1:x2], face_min_size, face_max_size, tier_params)
+        return [(fx + x1, fy + y1, fw, fh) for (fx, fy, fw, fh) in faces]
+    
+    def _detect_faces_tiled(self, detection_image, tiles, face_min_size, face_max_size, cascade_scales,
+                            tier=None, tier_params=None):
+        """
+        Detect faces in overlapping tiles concurrently and merge duplicates
+        
+        Faces seen by several tiles (or cut by a tile border) are merged with
+        the same overlap suppression used for eyes, keeping the largest box.
+        """
+        executor = self._get_region_executor()
+        futures = [
+            executor.submit(self._detect_faces_in_tile, detection_image, tile, face_min_size, face_max_size,
+                            tier, tier_params)
+            for tile in tiles
+        ]
+        
+        counts_scales = self._get_thread_face_detector(tier).uses_cascade_pyramid
+        scale_factor = (tier_params or self.detection_params)['face_scale_factor']
+        boxes = []
+        for tile, future in zip(tiles, futures):
+            boxes.extend(future.result())
+            if not counts_scales:
+                continue
+            x1, y1, x2, y2 = tile
+            cascade_scales['face'] += SearchWindowPolicy.count_scales(
+                (y2 - y1, x2 - x1), SearchWindowPolicy.FACE_WINDOW,
+                scale_factor, face_min_size, face_max_size
+            )
+        
+        if not boxes:
+            return []
+        
+        merged = overlap_nms(np.asarray(boxes, dtype=np.int64))
+        logger.debug(f"Tiled face detection: {len(tiles)} tiles, {len(boxes)} raw, {len(merged)} merged")
+        # Restore reading order (top-to-bottom, left-to-right) for stable face indices
+        return sorted((tuple(int(v) for v in box) for box in merged), key=lambda b: (b[1], b[0]))
     
-    def _extract_eye_with_padding(self, face_roi_color, ex, ey, ew, eh):
+    def _get_eye_band(self, roi_height, params=None):
+        """
+        Get the (top, bottom) rows of the face ROI that the eye cascade scans
+        
+        Returns the full ROI height when the eye band is disabled.
+        """
+        params = params or self.detection_params
+        if not params.get('eye_band_enabled', False):
+            return 0, roi_height
+        
+        top_ratio, bottom_ratio = params.get('eye_band', (0.0, 1.0))
+        band_y1 = max(0, int(roi_height * top_ratio))
+        band_y2 = min(roi_height, max(band_y1 + 1, int(roi_height * bottom_ratio)))
+        return band_y1, band_y2
+    
+    def _load_detection_image(self, image_path, params=None):
+        """
+        Load the grayscale image used for face detection (phase 1 of two-phase loading)
+        
+        JPEGs large enough for the detection proxy are decoded directly to a
+        reduced-resolution grayscale image in the DCT domain, so the full colour
+        frame is only decoded later if faces are found. Other formats (and
+        full-frame detection) use the regular colour decode.
+        
+        Returns:
+            Tuple of (colour image or None, grayscale image, scale from full
+            resolution to the grayscale image, full-resolution (height, width))
+        """
+        header_size = None
+        if Path(image_path).suffix.lower() in JPEG_EXTENSIONS:
+            try:
+                header_size = self._read_image_size(image_path)
+            except Exception as e:
+                logger.debug(f"Could not read image header for {image_path}: {e}")
+        
+        reduction = self._choose_decode_reduction(header_size, params)
+        
+        if reduction > 1:
+            gray = cv2.imread(str(image_path), REDUCED_GRAYSCALE_FLAGS[reduction])
+            if gray is not None:
+                full_w, full_h = header_size
+                # cv2.imread applies EXIF orientation, the header size does not
+                if (gray.shape[1] >= gray.shape[0]) != (full_w >= full_h):
+                    full_w, full_h = full_h, full_w
+                decode_scale = gray.shape[1] / float(full_w)
+                return None, gray, decode_scale, (full_h, full_w)
+        
+        # Fallback: current full colour decode path (PNG/BMP/TIFF, small JPEGs)
+        img = cv2.imread(str(image_path))
+        if img is None:
+            return None, None, 1.0, None
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        return img, gray, 1.0, img.shape[:2]
+    
+    def _read_image_size(self, image_path):
+        """Read (width, height) from the image header without decoding pixels"""
+        with Image.open(image_path) as header:
+            return header.size
+    
+    def _choose_decode_reduction(self, image_size, params=None):
+        """
+        Pick the largest JPEG decode reduction (1, 2, 4 or 8) that still leaves
+        the long edge at or above detection_max_dimension
+        
+        Args:
+            image_size: (width, height) from the JPEG header, or None for other formats
+            params: Optional detection parameter snapshot (default: detection_params)
+        """
+        max_dim = (params or self.detection_params).get('detection_max_dimension')
+        if not max_dim or not image_size:
+            return 1
+        
+        long_edge = max(image_size)
+        for reduction in sorted(REDUCED_GRAYSCALE_FLAGS, reverse=True):
+            if long_edge / reduction >= max_dim:
+                return reduction
+        return 1
+    
+    def _build_colour_proxy(self, image_path, img, proxy_shape):
+        """
+        BGR detection proxy (not equalized) for face detectors trained on colour input
+        
+        Uses the colour frame if it is already decoded, else a reduced-resolution
+        colour decode (only JPEGs reach detection without a colour frame).
+        
+        Returns:
+            BGR image with the shape of the gray detection proxy, or None if the
+            image could not be decoded
+        """
+        proxy_h, proxy_w = proxy_shape[:2]
+        if img is None:
+            # Largest JPEG decode reduction that still covers the proxy
+            long_edge = max(self._read_image_size(image_path))
+            reduction = max((r for r in REDUCED_COLOR_FLAGS if long_edge / r >= max(proxy_h, proxy_w)), default=1)
+            img = cv2.imread(str(image_path), REDUCED_COLOR_FLAGS.get(reduction, cv2.IMREAD_COLOR))
+            if img is None:
+                return None
+        if img.shape[:2] == (proxy_h, proxy_w):
+            return img
+        return cv2.resize(img, (proxy_w, proxy_h), interpolation=cv2.INTER_AREA)
+    
+    def _build_detection_proxy(self, gray, params=None):
+        """
+        Downscale a grayscale frame so its long edge fits detection_max_dimension
+        
+        Returns:
+            Tuple of (proxy image, scale factor from full resolution to proxy)
+        """
+        max_dim = (params or self.detection_params).get('detection_max_dimension')
+        height, width = gray.shape[:2]
+        
+        if not max_dim or max(width, height) <= max_dim:
+            return gray, 1.0
+        
+        scale = max_dim / float(max(width, height))
+        proxy_size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+        proxy = cv2.resize(gray, proxy_size, interpolation=cv2.INTER_AREA)
+        return proxy, scale
+    
+    def _map_boxes_to_full_resolution(self, boxes, scale, image_shape):
+        """Map (x, y, w, h) boxes detected on the proxy back onto the full-resolution frame"""
+        if scale == 1.0 or len(boxes) == 0:
+            return boxes
+        
+        full_h, full_w = image_shape[:2]
+        mapped = []
+        for (x, y, w, h) in boxes:
+            fx = min(full_w - 1, int(round(x / scale)))
+            fy = min(full_h - 1, int(round(y / scale)))
+            fw = min(full_w - fx, int(round(w / scale)))
+            fh = min(full_h - fy, int(round(h / scale)))
+            mapped.append((fx, fy, fw, fh))
+        return mapped
+    
+    def _filter_and_process_eyes(self, eyes, face_roi_color, face_index, image_path, roi_offset=(0, 0),
+                                 filter_params=None):
+        """
+        Filter detected eyes and process them with aspect ratio preservation
+        
+        Args:
+            filter_params: Detection parameter snapshot for filtering and cropping (e.g. a detection
+                           tier of the active QoS profile); defaults to detection_params
+        
+        Returns:
+            List of eye records with the saved filename and the eye box in
+            full-image coordinates (face ROI box shifted by roi_offset)
+        """
+        eye_records = []
+        
+        # Filter eyes by quality and remove duplicates
+        with stage_timer('eye_filter'):
+            filtered_eyes = self._filter_eye_detections(eyes, filter_params)
+        
+        for j, (ex, ey, ew, eh) in enumerate(filtered_eyes):
+            try:
+                # Extract eye region with natural eye proportions and padding
+                with stage_timer('eye_extract'):
+                    padded_eye_img = self._extract_eye_with_padding(face_roi_color, ex, ey, ew, eh, filter_params)
+                
+                if padded_eye_img is not None:
+                    # Save the eye image with preserved aspect ratio, plus its smaller variants,
+                    # named after the hash of its encoded bytes
+                    saved = self._save_eye_image_with_variants(padded_eye_img, params=filter_params)
+                    if saved is not None:
+                        eye_filename, variants = saved
+                        eye_records.append({
+                            'filename': eye_filename,
+                            'face_index': face_index,
+                            'eye_index': j,
+                            'box': [int(ex + roi_offset[0]), int(ey + roi_offset[1]), int(ew), int(eh)],
+                            'variants': variants
+                        })
+                        logger.info(f"Saved enhanced eye image: {eye_filename} from {Path(image_path).name} "
+                                    f"face {face_index} (size: {padded_eye_img.shape[1]}x{padded_eye_img.shape[0]})")
+                        
+            except Exception as e:
+                logger.error(f"Error processing eye {j} from face {face_index}: {e}")
+                continue
+        
+        return eye_records
+    
+    def _filter_eye_detections(self, eyes, filter_params=None):
+        """Filter eye detections to remove poor quality, overlapping, and anatomically incorrect detections"""
+        return filter_eye_boxes(eyes, filter_params or self.detection_params)
+    
+    def _extract_eye_with_padding(self, face_roi_color, ex, ey, ew, eh, params=None):
         """Extract eye region with natural eye proportions and padding"""
+        params = params or self.detection_params
         try:
             face_h, face_w = face_roi_color.shape[:2]
             
@@ -349,8 +1239,8 @@ class ImageProcessor:
                 new_ex, new_ey, new_ew, new_eh = ex, ey, ew, eh
             
             # Apply proportional padding
-            padding_w = int(new_ew * self.detection_params['padding_factor'])
-            padding_h = int(new_eh * self.detection_params['padding_factor'])
+            padding_w = int(new_ew * params['padding_factor'])
+            padding_h = int(new_eh * params['padding_factor'])
             
             # Calculate final padded coordinates
             x1 = max(0, new_ex - padding_w)
@@ -362,7 +1252,7 @@ class ImageProcessor:
             padded_eye = face_roi_color[y1:y2, x1:x2]
             
             # Validate extracted region
-            if padded_eye.size == 0 or padded_eye.shape[0] < self.detection_params['min_dimension'] or padded_eye.shape[1] < self.detection_params['min_dimension']:
+            if padded_eye.size == 0 or padded_eye.shape[0] < params['min_dimension'] or padded_eye.shape[1] < params['min_dimension']:
                 return None
             
             return padded_eye
@@ -371,74 +1261,494 @@ class ImageProcessor:
             logger.error(f"Error extracting eye with natural proportions: {e}")
             return None
     
+    def _get_thread_crop_pipeline(self, params=None):
+        """
+        Get the calling thread's crop post-processing pipeline (owns reusable buffers)
+        
+        The pipeline is pointed at params (the image's parameter snapshot, so crops
+        follow the active QoS profile), or at detection_params if none is given.
+        """
+        pipeline = getattr(self._thread_local, 'crop_pipeline', None)
+        if pipeline is None:
+            pipeline = CropPipeline(self.detection_params)
+            self._thread_local.crop_pipeline = pipeline
+        pipeline.detection_params = params or self.detection_params
+        return pipeline
+    
+    def get_crop_stage_timings(self):
+        """Get the mean time per crop of every post-processing stage"""
+        return get_stage_timings()
+    
     def _save_eye_image_enhanced(self, eye_img, eye_path):
         """Save an eye image with preserved aspect ratio and intelligent resizing"""
+        return self._save_eye_image_with_variants(eye_img, eye_path) is not None
+    
+    def _save_eye_image_with_variants(self, eye_img, eye_path=None, params=None):
+        """
+        Save an eye image and its level-of-detail variants
+        
+        All variants are encoded in one pass from the same post-processed pixels.
+        Without an explicit eye_path the crop is named after the digest of its
+        encoded bytes, so reprocessing an image reproduces the same filenames
+        and identical crops are stored once.
+        
+        Args:
+            eye_img: BGR eye crop
+            eye_path: Output path (default: content-addressed name in cropped_eyes_dir)
+            params: Detection parameter snapshot of the image (default: detection_params)
+        
+        Returns:
+            (eye filename, list of variant descriptions, smallest first, the
+            full crop last), or None if the crop could not be saved
+        """
         try:
             if eye_img is None or eye_img.size == 0:
-                return False
+                return None
             
-            original_h, original_w = eye_img.shape[:2]
-            max_dim = self.detection_params['max_dimension']
+            # Resize, sharpen, colour adjust and encode with the worker's pipeline
+            encoded, final_image, lod_variants = self._get_thread_crop_pipeline(params).process(eye_img)
+            if encoded is None:
+                return None
             
-            # Calculate new dimensions while preserving aspect ratio
-            if max(original_w, original_h) > max_dim:
-                # Resize while maintaining aspect ratio
-                if original_w > original_h:
-                    new_w = max_dim
-                    new_h = int((original_h * max_dim) / original_w)
-                else:
-                    new_h = max_dim
-                    new_w = int((original_w * max_dim) / original_h)
-                
-                # Ensure minimum dimensions
-                if new_w < self.detection_params['min_dimension']:
-                    new_w = self.detection_params['min_dimension']
-                if new_h < self.detection_params['min_dimension']:
-                    new_h = self.detection_params['min_dimension']
-                
-                # Apply high-quality resize
-                resized_eye = cv2.resize(eye_img, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
-            else:
-                # Use original size if already within limits
-                resized_eye = eye_img.copy()
+            # Save with high quality
+            if eye_path is None:
+                eye_path = self.cropped_eyes_dir / f"{content_digest(encoded)}.jpg"
+            eye_path = Path(eye_path)
+            variants = []
+            with stage_timer('crop_write'):
+                self._write_crop_file(eye_path, encoded)
+                for lod in lod_variants:
+                    variant_filename = (f"{CROP_VARIANTS_SUBDIR}/{eye_path.stem}_{lod['size']}_"
+                                        f"{content_digest(lod['data'], 8)}.{lod['format']}")
+                    self._write_crop_file(self.cropped_eyes_dir / variant_filename, lod['data'])
+                    variants.append(self._describe_variant(variant_filename, lod['size'], lod['format'],
+                                                           lod['width'], lod['height'], len(lod['data'])))
             
-            # Apply subtle sharpening for better quality
-            kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
-            sharpened = cv2.filter2D(resized_eye, -1, kernel)
-            final_image = cv2.addWeighted(resized_eye, 0.8, sharpened, 0.2, 0)
+            # Pack the crop into the texture atlas while its pixels are still in the buffer
+            if self.atlas_builder is not None:
+                with stage_timer('atlas_add'):
+                    self.atlas_builder.add(eye_path.name, final_image)
             
-            # Save with high quality
-            success = cv2.imwrite(str(eye_path), final_image, [cv2.IMWRITE_JPEG_QUALITY, 95])
-            return success
+            height, width = final_image.shape[:2]
+            variants.append(self._describe_variant(eye_path.name, max(width, height), 'jpg',
+                                                   width, height, len(encoded)))
+            return eye_path.name, variants
             
         except Exception as e:
             logger.error(f"Error saving enhanced eye image to {eye_path}: {e}")
-            return False
+            return None
+    
+    @staticmethod
+    def _write_crop_file(path, data):
+        """
+        Write a crop atomically, or just refresh its timestamp if the same bytes exist
+        
+        Content-addressed files with the same name and size hold the same
+        bytes, and the refreshed mtime keeps 'newest first' listings correct.
+        """
+        path = Path(path)
+        if path.exists() and path.stat().st_size == len(data):
+            os.utime(path)
+            return
+        
+        tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    
+    @staticmethod
+    def _describe_variant(filename, size, fmt, width, height, num_bytes):
+        """Build the notification entry for one crop variant"""
+        return {
+            'filename': filename,
+            'url': f'/eyes/{filename}',
+            'size': int(size),
+            'format': fmt,
+            'width': int(width),
+            'height': int(height),
+            'bytes': int(num_bytes)
+        }
+    
+    def get_eye_atlas_entry(self, eye_filename):
+        """Get the atlas sheet URL and UV rectangle of an eye crop (None if not packed)"""
+        if self.atlas_builder is None:
+            return None
+        return self.atlas_builder.get_entry(eye_filename)
+    
+    def get_eye_variants(self, eye_filename):
+        """
+        List the variants of an existing eye crop from the files on disk
+        
+        Used when re-announcing crops saved earlier (e.g. on client connect).
+        
+        Returns:
+            List of variant descriptions, smallest first, the full crop last
+        """
+        variants = []
+        stem = Path(eye_filename).stem
+        try:
+            # Newest file per size wins if variant settings changed between runs
+            variant_paths = {}
+            for variant_path in self.crop_variants_dir.glob(f"{stem}_*.*"):
+                size = variant_path.stem[len(stem) + 1:].split('_')[0]
+                if not size.isdigit():
+                    continue
+                newest = variant_paths.get(size)
+                if newest is None or variant_path.stat().st_mtime > newest.stat().st_mtime:
+                    variant_paths[size] = variant_path
+            
+            for size, variant_path in variant_paths.items():
+                with Image.open(variant_path) as variant_img:
+                    width, height = variant_img.size
+                variants.append(self._describe_variant(
+                    f"{CROP_VARIANTS_SUBDIR}/{variant_path.name}", int(size), variant_path.suffix[1:],
+                    width, height, variant_path.stat().st_size
+                ))
+            
+            eye_path = self.cropped_eyes_dir / eye_filename
+            if eye_path.exists():
+                with Image.open(eye_path) as eye_img:
+                    width, height = eye_img.size
+                variants.append(self._describe_variant(eye_filename, max(width, height), 'jpg',
+                                                       width, height, eye_path.stat().st_size))
+        except Exception as e:
+            logger.error(f"Error listing variants of {eye_filename}: {e}")
+        
+        return sorted(variants, key=lambda variant: variant['size'])
     
     def _save_eye_image(self, eye_img, eye_path):
         """Legacy save method - redirects to enhanced version for compatibility"""
         return self._save_eye_image_enhanced(eye_img, eye_path)
     
-    def process_existing_images(self):
-        """Process all existing images in the originals directory"""
+    def get_capture_time(self, image_path):
+        """
+        Get when an image was taken, as a Unix timestamp
+        
+        Uses EXIF DateTimeOriginal (or DateTime) when present, otherwise the
+        file modification time. Only the image header is read.
+        """
+        try:
+            with Image.open(image_path) as img:
+                exif = img.getexif()
+                value = exif.get_ifd(EXIF_IFD_TAG).get(EXIF_DATETIME_ORIGINAL) or exif.get(EXIF_DATETIME)
+            if value:
+                return datetime.strptime(str(value).strip('\x00 '), '%Y:%m:%d %H:%M:%S').timestamp()
+        except Exception:
+            pass
+        
+        try:
+            return os.path.getmtime(image_path)
+        except OSError:
+            return 0.0
+    
+    def submit_image(self, image_path, live=True, capture_time=None):
+        """
+        Queue an image for detection on the worker pool
+        
+        Live arrivals run before any queued backlog image; within each group
+        the newest capture runs first. A file version (size, mtime, ctime and
+        inode; see file_signature) that is queued or running is not submitted twice: submitting it again returns
+        the existing future, except that a live submission of a still-queued
+        backlog image moves it to the live queue. Claims are released when the
+        job finishes (after the backlog checkpoint has recorded the file).
+        
+        Args:
+            image_path: Path to the input image
+            live: Whether the image is a new arrival (adds a timestamp to notifications)
+            capture_time: Capture timestamp if already known (see get_capture_time)
+            
+        Returns:
+            Future resolving to the detection result (see process_image)
+        """
+        image_path = Path(image_path)
+        key = str(image_path)
+        signature = file_signature(image_path)
+        submitted_at = time.perf_counter()
+        job = {}
+        
+        def on_done(path, result):
+            try:
+                self.notify_eye_images(result['eyes'] if result else [], live=live, source=path.name)
+                if live and self.qos is not None:
+                    self.qos.record_latency(time.perf_counter() - submitted_at)
+                    # Only live detections predict live latency; backlog and batch work must not
+                    # push the controller to a cheaper profile
+                    if result is not None and not result.get('cached'):
+                        self.qos.record_service_time(result['detection_seconds'])
+                if result is not None and self.backlog_checkpoint is not None:
+                    self.backlog_checkpoint.mark_done(path.name, signature, result['eye_filenames'])
+                self._maybe_push_pipeline_metrics()
+            finally:
+                self._release_claim(key, job)
+        
+        def on_failed(future):
+            # on_done is not called for cancelled or failed jobs
+            if future.cancelled() or future.exception() is not None:
+                self._release_claim(key, job)
+        
+        if capture_time is None:
+            capture_time = self.get_capture_time(image_path)
+        
+        with self._claims_lock:
+            claim = self._claims.get(key)
+            if claim is not None:
+                # cancel() only succeeds for jobs still waiting in the queue
+                if claim['signature'] != signature or (live and not claim['live']):
+                    if not claim['future'].cancel() and claim['signature'] == signature:
+                        return claim['future']
+                else:
+                    return claim['future']
+            
+            future = self.worker_pool.submit(image_path, callback=on_done,
+                                             priority=make_priority(live, capture_time))
+            job['future'] = future
+            self._claims[key] = {'signature': signature, 'live': live, 'future': future}
+        
+        # Outside the lock: the callback runs immediately if the job already finished
+        future.add_done_callback(on_failed)
+        return future
+    
+    def _release_claim(self, key, job):
+        """Forget a finished job's claim (only if it has not been replaced by a newer job)"""
+        with self._claims_lock:
+            claim = self._claims.get(key)
+            if claim is not None and claim['future'] is job.get('future'):
+                del self._claims[key]
+    
+    def notify_eye_images(self, eye_records, live=True, source=None):
+        """Notify connected clients about the eye images saved from one source image"""
+        if not eye_records or self.eye_events is None:
+            return
+        
+        payloads = []
+        for record in eye_records:
+            filename = record['filename']
+            payload = {
+                'filename': filename,
+                'url': f'/eyes/{filename}',
+                'face_index': record.get('face_index', 0),
+                'eye_index': record.get('eye_index', 0),
+                'variants': record.get('variants', []),
+                'atlas': self.get_eye_atlas_entry(filename)
+            }
+            if live:
+                payload['timestamp'] = datetime.now().isoformat()
+            payloads.append(payload)
+        
+        self.eye_events.publish(source, payloads, live=live)
+        logger.info(f"Notified clients of {len(payloads)} new eye images from {source}")
+    
+    def get_event_stats(self):
+        """Get eye notification message counts and delivery latency"""
+        return self.eye_events.get_stats() if self.eye_events is not None else None
+    
+    def get_pool_stats(self):
+        """Get detection queue depth and per-worker utilisation"""
+        return self.worker_pool.get_stats()
+    
+    def get_qos_stats(self):
+        """Get the active detection profile, live latency and recent profile changes"""
+        return self.qos.get_stats() if self.qos is not None else None
+    
+    def get_pipeline_metrics(self):
+        """Get per-stage latency histograms (count, mean, p50/p95/p99, max)"""
+        return get_pipeline_metrics()
+    
+    def _maybe_push_pipeline_metrics(self):
+        """Emit a 'pipeline_metrics' debug event at most every pipeline_metrics_push_interval"""
+        interval = self.processing_config['pipeline_metrics_push_interval']
+        if not interval or self.socketio is None:
+            return
+        now = time.time()
+        if now - self._last_metrics_push < interval:
+            return
+        self._last_metrics_push = now
+        try:
+            self.socketio.emit('pipeline_metrics', self.get_pipeline_metrics())
+        except Exception as e:
+            logger.error(f"Error emitting pipeline metrics: {e}")
+    
+    def get_near_duplicate_stats(self):
+        """Get the near-duplicate (burst frame) lookup and hit counts"""
+        if self.near_duplicates is None:
+            return None
+        stats = self.near_duplicates.get_stats()
+        stats['mode'] = self.processing_config['near_duplicate_mode']
+        return stats
+    
+    def get_ingest_stats(self):
+        """Get new-file event, deduplication and readiness wait counters"""
+        return self.ingest_queue.get_stats()
+    
+    def process_existing_images(self, progress_fn=None, result_fn=None):
+        """
+        Process all existing images in the originals directory on the worker pool
+        
+        Originals recorded in the backlog checkpoint (same name, size and
+        mtime) are skipped, as are files already submitted as live arrivals.
+        Blocks until the backlog has drained or stop_backlog_processing is called.
+        
+        Args:
+            progress_fn: Optional callable(progress) invoked at most every
+                         backlog_progress_interval seconds and when finished
+            result_fn: Optional callable(image_path, result) invoked from the
+                       worker threads as each image finishes (result is None on
+                       failure; not called for cancelled images)
+        """
         logger.info("Processing existing images in originals directory...")
         
         image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif'}
-        processed_count = 0
-        
-        for image_path in self.originals_dir.iterdir():
-            if image_path.suffix.lower() in image_extensions:
-                eye_filenames = self.detect_faces_and_eyes(image_path)
-                if eye_filenames and self.socketio:
-                    # Notify clients of new eye images
-                    for filename in eye_filenames:
-                        self.socketio.emit('new_eye_image_available', {
-                            'filename': filename,
-                            'url': f'/eyes/{filename}'
-                        })
-                processed_count += 1
+        start_time = time.time()
+        self._update_backlog_progress({'state': 'scanning', 'total': 0, 'done': 0, 'failed': 0,
+                                       'cancelled': 0, 'skipped': 0, 'started_at': datetime.now().isoformat()})
         
-        logger.info(f"Processed {processed_count} existing images")
+        # Drop cached results produced with different detection parameters
+        fingerprint = self.get_params_fingerprint()
+        if self.detection_cache is not None:
+            self.detection_cache.invalidate_stale(fingerprint)
+        
+        # Pack crops saved by earlier runs and free slots of deleted crops
+        if self.atlas_builder is not None:
+            self.atlas_builder.sync(self.cropped_eyes_dir)
+        
+        originals = [image_path for image_path in self.originals_dir.iterdir()
+                     if image_path.suffix.lower() in image_extensions]
+        
+        # Skip originals finished by an earlier run
+        skipped = 0
+        if self.backlog_checkpoint is not None:
+            self.backlog_checkpoint.begin(fingerprint, (image_path.name for image_path in originals))
+            pending = [image_path for image_path in originals
+                       if not self.backlog_checkpoint.is_done(image_path.name, file_signature(image_path))]
+            skipped = len(originals) - len(pending)
+            if skipped:
+                logger.info(f"Resuming backlog: {skipped} originals already processed")
+            originals = pending
+        
+        # Newest captures first; optionally skip everything but the latest N
+        backlog = sorted(
+            ((self.get_capture_time(image_path), image_path) for image_path in originals),
+            key=lambda entry: entry[0],
+            reverse=True
+        )
+        latest_only = self.processing_config['backlog_latest_only']
+        if latest_only and len(backlog) > latest_only:
+            logger.info(f"Skipping {len(backlog) - latest_only} older images (latest {latest_only} only)")
+            skipped += len(backlog) - latest_only
+            backlog = backlog[:latest_only]
+        
+        self._update_backlog_progress({'state': 'running', 'total': len(backlog), 'skipped': skipped})
+        
+        def on_finished(image_path, future):
+            # Cancelled: moved to the live queue or stopped (picked up again on restart)
+            if future.cancelled():
+                outcome = 'cancelled'
+            elif future.exception() is not None or future.result() is None:
+                outcome = 'failed'
+            else:
+                outcome = 'done'
+            with self._backlog_lock:
+                self.backlog_progress[outcome] += 1
+            if result_fn is not None and outcome != 'cancelled':
+                result_fn(image_path, future.result() if outcome == 'done' else None)
+        
+        futures = []
+        for capture_time, image_path in backlog:
+            if self._backlog_stop.is_set():
+                break
+            future = self.submit_image(image_path, live=False, capture_time=capture_time)
+            future.add_done_callback(lambda future, image_path=image_path: on_finished(image_path, future))
+            futures.append(future)
+        with self._backlog_lock:
+            self._backlog_futures = futures
+        
+        # Wait for the backlog to drain, reporting progress along the way
+        interval = self.processing_config['backlog_progress_interval']
+        last_report = 0.0
+        for future in futures:
+            finished = False
+            while not finished and not self._backlog_stop.is_set():
+                try:
+                    future.exception(timeout=interval)
+                    finished = True
+                except TimeoutError:
+                    pass
+                except CancelledError:
+                    finished = True
+                if progress_fn is not None and time.time() - last_report >= interval:
+                    last_report = time.time()
+                    progress_fn(self.get_backlog_progress())
+            if self._backlog_stop.is_set():
+                break
+        
+        if self.detection_cache is not None:
+            self.detection_cache.save()
+        if self.backlog_checkpoint is not None:
+            self.backlog_checkpoint.save()
+        
+        duration = time.time() - start_time
+        state = 'stopped' if self._backlog_stop.is_set() else 'complete'
+        self._update_backlog_progress({'state': state, 'duration_seconds': round(duration, 2),
+                                       'finished_at': datetime.now().isoformat()})
+        if progress_fn is not None:
+            progress_fn(self.get_backlog_progress())
+        logger.info(f"Processed {len(futures)} existing images in {duration:.2f}s "
+                    f"with {self.worker_pool.num_workers} workers ({skipped} skipped, {state})")
+    
+    def start_backlog_processing(self, progress_fn=None, result_fn=None):
+        """
+        Process the existing originals in a background thread
+        
+        Call after start_monitoring so files arriving meanwhile are picked up
+        live; both paths share submit_image, so no file is processed twice.
+        
+        Args:
+            progress_fn: Optional callable(progress), see process_existing_images
+            result_fn: Optional callable(image_path, result), see process_existing_images
+        """
+        if self._backlog_thread is not None and self._backlog_thread.is_alive():
+            logger.warning("Backlog processing already running")
+            return
+        
+        def run():
+            try:
+                self.process_existing_images(progress_fn, result_fn)
+            except Exception as e:
+                logger.error(f"Error processing existing images: {e}")
+                self._update_backlog_progress({'state': 'failed', 'error': str(e)})
+                if progress_fn is not None:
+                    progress_fn(self.get_backlog_progress())
+        
+        self._backlog_stop.clear()
+        self._backlog_thread = threading.Thread(target=run, name='backlog', daemon=True)
+        self._backlog_thread.start()
+    
+    def stop_backlog_processing(self):
+        """Cancel queued backlog images and wait for the backlog thread to finish"""
+        self._backlog_stop.set()
+        with self._backlog_lock:
+            futures = list(self._backlog_futures)
+        cancelled = sum(1 for future in futures if future.cancel())
+        if cancelled:
+            logger.info(f"Cancelled {cancelled} queued backlog images (resumed on next start)")
+        if self._backlog_thread is not None:
+            self._backlog_thread.join()
+            self._backlog_thread = None
+    
+    def _update_backlog_progress(self, changes):
+        """Merge changes into the backlog progress record"""
+        with self._backlog_lock:
+            self.backlog_progress.update(changes)
+    
+    def get_backlog_progress(self):
+        """Get the state and counts of the existing-originals backlog"""
+        with self._backlog_lock:
+            progress = dict(self.backlog_progress)
+        total = progress.get('total', 0)
+        if total:
+            finished = progress['done'] + progress['failed'] + progress['cancelled']
+            progress['percent'] = round(100.0 * finished / total, 1)
+        return progress
     
     def start_monitoring(self):
         """Start monitoring the originals directory for new images"""
@@ -447,6 +1757,11 @@ class ImageProcessor:
             return
             
         try:
+            self.ingest_queue.start()
+            if self.qos is not None:
+                self.qos.start()
+            if self.atlas_builder is not None:
+                self.atlas_builder.start()
             event_handler = ImageFileHandler(self)
             self.observer = Observer()
             self.observer.schedule(event_handler, str(self.originals_dir), recursive=False)
@@ -458,12 +1773,125 @@ class ImageProcessor:
             logger.error(f"Error starting directory monitoring: {e}")
     
     def stop_monitoring(self):
-        """Stop monitoring the originals directory"""
+        """Stop monitoring the originals directory and the detection workers"""
+        self.stop_backlog_processing()
+        
         if self.observer and self.is_monitoring:
             self.observer.stop()
             self.observer.join()
             self.is_monitoring = False
             logger.info("Stopped monitoring directory")
+        
+        self.ingest_queue.stop()
+        self.worker_pool.stop()
+        if self.qos is not None:
+            self.qos.stop()
+        
+        with self._region_executor_lock:
+            if self._region_executor is not None:
+                self._region_executor.shutdown(wait=True)
+                self._region_executor = None
+        
+        if self.detection_cache is not None:
+            self.detection_cache.save()
+        
+        if self.backlog_checkpoint is not None:
+            self.backlog_checkpoint.save()
+        
+        if self.atlas_builder is not None:
+            self.atlas_builder.stop()
+        
+        if self.eye_events is not None:
+            self.eye_events.stop()
+
+
+class SearchWindowPolicy:
+    """
+    Derive cascade minSize/maxSize search windows from image dimensions
+    
+    detectMultiScale evaluates one pyramid level per scale step between
+    minSize and maxSize, so bounding both ends to the expected subject size
+    bounds the number of cascade scales per image. The 'fixed' policy keeps
+    the absolute face_min_size/eye_min_size limits with no maximum.
+    """
+    
+    # Native training windows of the bundled Haar cascades
+    FACE_WINDOW = (24, 24)
+    EYE_WINDOW = (20, 20)
+    
+    def __init__(self, detection_params):
+        self.detection_params = detection_params
+    
+    @property
+    def adaptive(self):
+        return self._is_adaptive(self.detection_params)
+    
+    @staticmethod
+    def _is_adaptive(params):
+        return params.get('search_window_policy', 'fixed') == 'adaptive'
+    
+    def face_window(self, detection_shape, detection_scale=1.0, params=None):
+        """
+        Face (minSize, maxSize) in detection-image pixels
+        
+        Args:
+            detection_shape: Shape of the (possibly downscaled) detection image
+            detection_scale: Scale from full resolution to the detection image
+            params: Optional detection_params overrides (e.g. a detection tier)
+        """
+        params = params or self.detection_params
+        if not self._is_adaptive(params):
+            min_size = params['face_min_size']
+            if detection_scale != 1.0:
+                min_size = (max(1, int(round(min_size[0] * detection_scale))),
+                            max(1, int(round(min_size[1] * detection_scale))))
+            return min_size, None
+        
+        low, high = params.get('face_size_range', (0.1, 1.0))
+        short_edge = min(detection_shape[:2])
+        min_side = max(self.FACE_WINDOW[0], int(short_edge * low))
+        max_side = max(min_side, int(short_edge * high))
+        return (min_side, min_side), (max_side, max_side)
+    
+    def eye_window(self, face_roi_shape, params=None):
+        """Eye (minSize, maxSize) in face ROI pixels"""
+        params = params or self.detection_params
+        eye_min_size = params['eye_min_size']
+        if not self._is_adaptive(params):
+            return eye_min_size, None
+        
+        low, high = params.get('eye_size_range', (0.08, 0.5))
+        roi_width = face_roi_shape[1]
+        # Never search below the configured absolute eye_min_size
+        min_side = max(eye_min_size[0], self.EYE_WINDOW[0], int(roi_width * low))
+        max_side = max(min_side, int(roi_width * high))
+        return (min_side, min_side), (max_side, max_side)
+    
+    @staticmethod
+    def count_scales(image_shape, base_window, scale_factor, min_size, max_size=None):
+        """
+        Count the pyramid levels detectMultiScale evaluates for a search window
+        
+        Mirrors OpenCV's loop: scales grow by scale_factor from the cascade's
+        native window, levels below min_size are skipped and the loop stops
+        once the window exceeds max_size or the image.
+        """
+        height, width = image_shape[:2]
+        limit_w, limit_h = width, height
+        if max_size:
+            limit_w, limit_h = min(limit_w, max_size[0]), min(limit_h, max_size[1])
+        
+        count = 0
+        factor = 1.0
+        while True:
+            window_w = int(round(base_window[0] * factor))
+            window_h = int(round(base_window[1] * factor))
+            if window_w > limit_w or window_h > limit_h:
+                break
+            if window_w >= min_size[0] and window_h >= min_size[1]:
+                count += 1
+            factor *= scale_factor
+        return count
 
 
 class ImageFileHandler(FileSystemEventHandler):
@@ -476,38 +1904,36 @@ class ImageFileHandler(FileSystemEventHandler):
     def on_created(self, event):
         """Handle new file creation"""
         if not event.is_directory:
-            file_path = Path(event.src_path)
-            if file_path.suffix.lower() in self.image_extensions:
-                # Add small delay to ensure file is fully written
-                time.sleep(0.5)
-                self._process_new_image(file_path)
+            self._enqueue(Path(event.src_path))
+    
+    def on_modified(self, event):
+        """Handle writes to a new file (deduplicated by the ingest queue)"""
+        if not event.is_directory:
+            self._enqueue(Path(event.src_path))
+    
+    def on_closed(self, event):
+        """Handle close-after-write (inotify only): the file is complete"""
+        if not event.is_directory:
+            self._enqueue(Path(event.src_path), closed=True)
     
     def on_moved(self, event):
         """Handle file moves (like drag and drop)"""
         if not event.is_directory:
-            file_path = Path(event.dest_path)
-            if file_path.suffix.lower() in self.image_extensions:
-                time.sleep(0.5)
-                self._process_new_image(file_path)
+            self._enqueue(Path(event.dest_path))
     
-    def _process_new_image(self, file_path):
-        """Process a new image file"""
+    def _enqueue(self, file_path, closed=False):
+        """
+        Hand an image path to the ingest queue
+        
+        Runs on the observer thread, so it only records the path; the ingest
+        queue waits for the file to be complete before processing it.
+        """
+        if file_path.suffix.lower() not in self.image_extensions:
+            return
         try:
-            logger.info(f"New image detected: {file_path.name}")
-            eye_filenames = self.image_processor.detect_faces_and_eyes(file_path)
-            
-            if eye_filenames and self.image_processor.socketio:
-                # Notify clients of new eye images
-                for filename in eye_filenames:
-                    self.image_processor.socketio.emit('new_eye_image_available', {
-                        'filename': filename,
-                        'url': f'/eyes/{filename}',
-                        'timestamp': datetime.now().isoformat()
-                    })
-                    logger.info(f"Notified clients of new eye image: {filename}")
-            
+            self.image_processor.ingest_queue.offer(file_path, closed=closed)
         except Exception as e:
-            logger.error(f"Error processing new image {file_path}: {e}")
+            logger.error(f"Error queueing new image {file_path}: {e}")
 
 
 def create_test_image(output_path, width=400, height=300):
@@ -544,8 +1970,112 @@ def create_test_image(output_path, width=400, height=300):
         return False
 
 
-if __name__ == "__main__":
-    # Test the image processor independently
+
+def run_batch(input_dir, output_dir, num_workers=None, resume=True, use_cache=True, results_file=None):
+    """
+    Process every image in a directory offline and stream one JSONL record per image
+    
+    Uses the server's backlog path (process_existing_images on the worker pool),
+    so crops and results match live processing with the same detection_params.
+    Near-duplicate reuse is always off, so every image is detected on its own.
+    Crops, atlases, the detection cache and the checkpoint are written under
+    output_dir. An interrupted run resumes from the checkpoint; records of the
+    last few images before an interruption may be repeated (the later record wins).
+    
+    Args:
+        input_dir: Directory of original images
+        output_dir: Directory for crops, checkpoint and results
+        num_workers: Parallel detection workers (defaults to CPU count)
+        resume: Skip images finished by an earlier run (False starts over)
+        use_cache: Reuse detection results cached by earlier runs
+        results_file: JSONL results path (defaults to output_dir/results.jsonl)
+        
+    Returns:
+        Dictionary with counts, duration and throughput
+    """
+    input_dir = Path(input_dir)
+    output_dir = Path(output_dir)
+    if not input_dir.is_dir():
+        raise Exception(f"Input directory does not exist: {input_dir}")
+    results_file = Path(results_file) if results_file else output_dir / 'results.jsonl'
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    processor = ImageProcessor(originals_dir=input_dir, cropped_eyes_dir=output_dir / 'cropped_eyes',
+                               num_workers=num_workers)
+    if not use_cache:
+        processor.detection_cache = None
+    # Reused results would depend on worker completion order, not just on the inputs
+    processor.near_duplicates = None
+    if not resume:
+        if processor.backlog_checkpoint is not None:
+            processor.backlog_checkpoint.reset()
+        results_file.unlink(missing_ok=True)
+    
+    # Finish a record cut off by an interruption before appending
+    if results_file.exists() and results_file.stat().st_size:
+        with open(results_file, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                with open(results_file, 'a') as out:
+                    out.write('\n')
+    
+    write_lock = threading.Lock()
+    completions = []
+    eye_count = [0]
+    
+    with open(results_file, 'a') as out:
+        def on_result(image_path, result):
+            record = {'image': image_path.name, 'status': 'ok' if result is not None else 'failed'}
+            if result is not None:
+                record.update(result)
+            line = json.dumps(record)
+            with write_lock:
+                out.write(line + '\n')
+                out.flush()
+                completions.append(time.perf_counter())
+                if result is not None:
+                    eye_count[0] += len(result['eye_filenames'])
+        
+        def on_progress(progress):
+            if progress.get('state') == 'running':
+                logger.info(f"Batch progress: {progress.get('percent', 0.0)}% "
+                            f"({progress['done']} done, {progress['failed']} failed of {progress['total']})")
+        
+        start_time = time.perf_counter()
+        processor.start_backlog_processing(on_progress, on_result)
+        try:
+            while processor._backlog_thread.is_alive():
+                processor._backlog_thread.join(0.5)
+        except KeyboardInterrupt:
+            logger.info("Interrupted - stopping batch (run again to resume)")
+        finally:
+            processor.stop_monitoring()
+        duration = time.perf_counter() - start_time
+    
+    progress = processor.get_backlog_progress()
+    processed = progress.get('done', 0) + progress.get('failed', 0)
+    # Steady-state rate between the first and last completion (excludes startup and scanning)
+    sustained = None
+    if len(completions) > 1 and completions[-1] > completions[0]:
+        sustained = round((len(completions) - 1) / (completions[-1] - completions[0]), 2)
+    return {
+        'state': progress.get('state'),
+        'total': progress.get('total', 0),
+        'processed': processed,
+        'done': progress.get('done', 0),
+        'failed': progress.get('failed', 0),
+        'skipped': progress.get('skipped', 0),
+        'eyes': eye_count[0],
+        'workers': processor.worker_pool.num_workers,
+        'duration_seconds': round(duration, 2),
+        'images_per_second': round(processed / duration, 2) if duration > 0 else None,
+        'sustained_images_per_second': sustained,
+        'results_file': str(results_file)
+    }
+
+
+def run_watch():
+    """Process the default originals directory and keep watching it for new images"""
     processor = ImageProcessor()
     
     # Create a test image if none exist
@@ -553,11 +2083,10 @@ if __name__ == "__main__":
     if not test_image_path.exists():
         create_test_image(test_image_path)
     
-    # Process existing images
-    processor.process_existing_images()
-    
-    # Start monitoring (this would run indefinitely in production)
+    # Watch for new images first, then work through the existing ones in the
+    # background, so new files are never stuck behind the backlog
     processor.start_monitoring()
+    processor.start_backlog_processing()
     
     try:
         # Keep the script running for testing
@@ -566,4 +2095,31 @@ if __name__ == "__main__":
             time.sleep(1)
     except KeyboardInterrupt:
         print("Stopping image processor...")
-        processor.stop_monitoring() 
\ No newline at end of file
+        processor.stop_monitoring()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Eye extraction for the Experimental Theatre Digital Program')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('watch', help='Process data/originals and watch it for new images (default)')
+    batch_parser = subparsers.add_parser('batch', help='Process a directory of images offline')
+    batch_parser.add_argument('input_dir', help='Directory of original images')
+    batch_parser.add_argument('output_dir', help='Directory for eye crops, checkpoint and results.jsonl')
+    batch_parser.add_argument('--workers', type=int, help='Parallel detection workers (default: CPU count)')
+    batch_parser.add_argument('--results', help='JSONL results file (default: OUTPUT_DIR/results.jsonl)')
+    batch_parser.add_argument('--restart', action='store_true',
+                              help='Ignore the checkpoint and previous results and start over')
+    batch_parser.add_argument('--no-cache', action='store_true', help='Do not reuse cached detection results')
+    args = parser.parse_args()
+    
+    if args.command == 'batch':
+        summary = run_batch(args.input_dir, args.output_dir, num_workers=args.workers,
+                            resume=not args.restart, use_cache=not args.no_cache, results_file=args.results)
+        print(f"Batch {summary['state']}: {summary['processed']} of {summary['total']} images processed "
+              f"({summary['failed']} failed, {summary['skipped']} already done), {summary['eyes']} eyes")
+        print(f"{summary['duration_seconds']}s with {summary['workers']} workers: "
+              f"{summary['images_per_second']} images/s overall, "
+              f"{summary['sustained_images_per_second'] or 'n/a'} images/s sustained")
+        print(f"Results: {summary['results_file']}")
+    else:
+        run_watch()
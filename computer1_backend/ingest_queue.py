@@ -0,0 +1,234 @@
+"""
+Image Ingest Queue for Experimental Theatre Digital Program
+
+This module handles:
+- A bounded queue of new image paths fed by the watchdog observer thread
+- Deduplication of repeated created/modified/moved/closed events per path
+- A readiness checker that waits until a file is completely written
+  (close-write event or stable size/mtime, plus a JPEG end marker check)
+- Dispatch of ready files to processing off the observer thread
+
+The observer thread only records the path under a lock, so event handling
+stays in the microsecond range however large the backlog gets.
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JPEG_EXTENSIONS = {'.jpg', '.jpeg'}
+JPEG_END_MARKER = b'\xff\xd9'
+
+
+class IngestQueue:
+    def __init__(self, dispatch_fn: Callable, max_pending: int = 1000, settle_time: float = 0.3,
+                 poll_interval: float = 0.05, timeout: float = 30.0, history_size: int = 2000):
+        """
+        Initialize the ingest queue
+
+        Args:
+            dispatch_fn: Callable(path) run once a file is ready, e.g. ImageProcessor.submit_image
+            max_pending: Maximum number of files waiting for readiness (extra events are dropped)
+            settle_time: Seconds size and mtime must stay unchanged without a close-write event
+            poll_interval: Seconds between readiness checks
+            timeout: Seconds after which a file that never settles is dispatched anyway
+            history_size: Number of dispatched files remembered to drop late duplicate events
+        """
+        self.dispatch_fn = dispatch_fn
+        self.max_pending = max_pending
+        self.settle_time = settle_time
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.history_size = history_size
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending: Dict[str, Dict] = {}
+        self._dispatched = OrderedDict()  # path -> file_signature when dispatched
+        self._thread: Optional[threading.Thread] = None
+        self.is_running = False
+
+        self.stats = {
+            'events': 0,
+            'queued': 0,
+            'deduplicated': 0,
+            'dropped_full': 0,
+            'dispatched': 0,
+            'vanished': 0,
+            'timed_out': 0,
+            'wait_seconds': 0.0
+        }
+
+    def start(self):
+        """Start the readiness checker thread"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._thread = threading.Thread(target=self._check_loop, name='ingest-readiness', daemon=True)
+        self._thread.start()
+        logger.info("Started image ingest queue")
+
+    def stop(self):
+        """Stop the readiness checker thread (pending files are discarded)"""
+        if not self.is_running:
+            return
+        self.is_running = False
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        logger.info("Stopped image ingest queue")
+
+    def offer(self, path, closed: bool = False):
+        """
+        Record a file system event for a path (called on the observer thread)
+
+        Args:
+            path: Image path from a created/modified/moved/closed event
+            closed: True for close-write events (the writer has finished)
+        """
+        key = str(path)
+        now = time.perf_counter()
+        with self._lock:
+            self.stats['events'] += 1
+            entry = self._pending.get(key)
+            if entry is not None:
+                self.stats['deduplicated'] += 1
+                entry['closed'] = entry['closed'] or closed
+                entry['last_event'] = now
+            elif len(self._pending) >= self.max_pending:
+                self.stats['dropped_full'] += 1
+                logger.warning(f"Ingest queue full ({self.max_pending}), dropping {Path(key).name}")
+                return
+            else:
+                self._pending[key] = {
+                    'path': Path(key),
+                    'queued_at': now,
+                    'last_event': now,
+                    'closed': closed,
+                    'signature': None,
+                    'stable_since': now
+                }
+                self.stats['queued'] += 1
+        if closed:
+            self._wakeup.set()
+
+    def _check_loop(self):
+        """Readiness checker main loop"""
+        while self.is_running:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            try:
+                self.check_pending()
+            except Exception as e:
+                logger.error(f"Error checking ingest queue: {e}")
+
+    def check_pending(self):
+        """Dispatch every pending file that is completely written"""
+        now = time.perf_counter()
+        with self._lock:
+            entries = list(self._pending.items())
+
+        for key, entry in entries:
+            ready, signature = self._is_ready(entry, now)
+            if signature is None:
+                with self._lock:
+                    self._pending.pop(key, None)
+                    self.stats['vanished'] += 1
+                continue
+            if not ready:
+                continue
+
+            with self._lock:
+                # An event arriving during the check may have changed the entry
+                if self._pending.get(key) is not entry:
+                    continue
+                del self._pending[key]
+
+                # Late duplicate of a file that was already dispatched unchanged
+                if self._dispatched.get(key) == signature:
+                    self.stats['deduplicated'] += 1
+                    continue
+                self._dispatched[key] = signature
+                self._dispatched.move_to_end(key)
+                while len(self._dispatched) > self.history_size:
+                    self._dispatched.popitem(last=False)
+
+                self.stats['dispatched'] += 1
+                self.stats['wait_seconds'] += now - entry['queued_at']
+
+            try:
+                self.dispatch_fn(entry['path'])
+            except Exception as e:
+                logger.error(f"Error dispatching {entry['path']}: {e}")
+
+    def _is_ready(self, entry: Dict, now: float):
+        """
+        Check whether a pending file is completely written
+
+        Returns:
+            (ready, signature); signature is None if the file no longer exists
+        """
+        try:
+            stat = entry['path'].stat()
+        except OSError:
+            return False, None
+
+        signature = (stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_ino)  # as file_signature
+        if signature != entry['signature']:
+            entry['signature'] = signature
+            entry['stable_since'] = now
+            if not entry['closed']:
+                return False, signature
+
+        if stat.st_size == 0:
+            return False, signature
+
+        if now - entry['queued_at'] >= self.timeout:
+            with self._lock:
+                self.stats['timed_out'] += 1
+            logger.warning(f"{entry['path'].name} did not settle within {self.timeout}s, processing anyway")
+            return True, signature
+
+        stable_for = now - entry['stable_since']
+        if entry['closed'] or stable_for >= self.settle_time:
+            # Some cameras pad JPEGs after the end marker, so a long enough
+            # stable period is accepted without it
+            if self._has_end_marker(entry['path']) or stable_for >= self.settle_time * 4:
+                return True, signature
+        return False, signature
+
+    @staticmethod
+    def _has_end_marker(path: Path) -> bool:
+        """JPEG files must end with the EOI marker; other formats rely on size stability"""
+        if path.suffix.lower() not in JPEG_EXTENSIONS:
+            return True
+        try:
+            with open(path, 'rb') as f:
+                f.seek(-2, 2)
+                return f.read(2) == JPEG_END_MARKER
+        except OSError:
+            return False
+
+    def get_depth(self) -> int:
+        """Number of files waiting for readiness"""
+        with self._lock:
+            return len(self._pending)
+
+    def get_stats(self) -> Dict:
+        """Get event, deduplication and dispatch counters"""
+        with self._lock:
+            stats = dict(self.stats, pending=len(self._pending), max_pending=self.max_pending)
+        wait_seconds = stats.pop('wait_seconds')
+        stats['mean_wait_ms'] = round(wait_seconds * 1000 / stats['dispatched'], 1) if stats['dispatched'] else None
+        return stats
@@ -4,6 +4,9 @@ import os
 import threading
 import time
 from image_processor import ImageProcessor
+from crop_pipeline import is_content_addressed
+from eye_events import BATCH_EVENT, PER_EYE_EVENT
+from pipeline_metrics import get_pipeline_metrics
 from sd_card_monitor import SDCardMonitor
 from keyboard_listener import KeyboardTriggerListener
 import socket
@@ -32,10 +35,55 @@ def index():
     """Serve the main client page"""
     return render_template('index.html')
 
+# Content-addressed crops never change, so browsers may cache them for a year
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+def send_eye_file(directory, filename):
+    """
+    Send an eye crop, with a strong ETag and immutable caching for content-addressed names
+    
+    The filename stem is derived from the file bytes, so it doubles as a
+    strong ETag and If-None-Match requests are answered with 304.
+    """
+    if not is_content_addressed(filename):
+        return send_from_directory(directory, filename)
+    
+    response = send_from_directory(directory, filename, etag=os.path.splitext(filename)[0],
+                                   max_age=31536000)
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
 @app.route('/eyes/<filename>')
 def serve_eye_image(filename):
     """Serve cropped eye images to the client"""
-    return send_from_directory(CROPPED_EYES_DIR, filename)
+    return send_eye_file(CROPPED_EYES_DIR, filename)
+
+@app.route('/eyes/lod/<filename>')
+def serve_eye_image_variant(filename):
+    """Serve level-of-detail variants of cropped eye images"""
+    return send_eye_file(os.path.join(CROPPED_EYES_DIR, 'lod'), filename)
+
+@app.route('/atlas/manifest')
+def get_atlas_manifest():
+    """Get the UV manifest of the eye texture atlases"""
+    if not image_processor or not image_processor.atlas_builder:
+        return {'status': 'error', 'message': 'Eye atlases not available'}, 404
+    return {'status': 'success', 'manifest': image_processor.atlas_builder.get_manifest()}
+
+@app.route('/atlas/<int:sheet_index>.jpg')
+def serve_atlas_sheet(sheet_index):
+    """Serve one eye texture atlas sheet"""
+    if not image_processor or not image_processor.atlas_builder:
+        return {'status': 'error', 'message': 'Eye atlases not available'}, 404
+    sheet_path = image_processor.atlas_builder.get_sheet_path(sheet_index)
+    if sheet_path is None or not sheet_path.exists():
+        return {'status': 'error', 'message': f'Atlas sheet {sheet_index} not found'}, 404
+    return send_from_directory(str(sheet_path.parent), sheet_path.name)
+
+@app.route('/metrics/pipeline')
+def get_pipeline_metrics_route():
+    """Get per-stage latency histograms of the image pipeline (p50/p95/p99, counts)"""
+    return {'status': 'success', 'metrics': get_pipeline_metrics()}
 
 @app.route('/get_existing_eyes')
 def get_existing_eyes():
@@ -53,7 +101,9 @@ def get_existing_eyes():
                 eye_files.append({
                     'filename': filename,
                     'url': f'/eyes/{filename}',
-                    'timestamp': os.path.getmtime(os.path.join(CROPPED_EYES_DIR, filename))
+                    'timestamp': os.path.getmtime(os.path.join(CROPPED_EYES_DIR, filename)),
+                    'variants': image_processor.get_eye_variants(filename) if image_processor else [],
+                    'atlas': image_processor.get_eye_atlas_entry(filename) if image_processor else None
                 })
         
         return {'status': 'success', 'eyes': eye_files}
@@ -71,6 +121,17 @@ def get_status():
         'sd_card_monitoring_active': sd_card_monitor.is_monitoring if sd_card_monitor else False,
         'current_sd_cards': sd_card_monitor.get_current_cards() if sd_card_monitor else [],
         'import_in_progress': sd_card_monitor.is_importing if sd_card_monitor else False,
+        'detection_pool': image_processor.get_pool_stats() if image_processor else None,
+        'detection_cache': image_processor.detection_cache.get_stats() if (image_processor and image_processor.detection_cache) else None,
+        'face_detector_costs': image_processor.get_detector_costs() if image_processor else None,
+        'crop_stage_timings': image_processor.get_crop_stage_timings() if image_processor else None,
+        'eye_atlas': image_processor.atlas_builder.get_stats() if (image_processor and image_processor.atlas_builder) else None,
+        'detection_tiers': image_processor.get_tier_stats() if image_processor else None,
+        'eye_events': image_processor.get_event_stats() if image_processor else None,
+        'ingest_queue': image_processor.get_ingest_stats() if image_processor else None,
+        'detection_qos': image_processor.get_qos_stats() if image_processor else None,
+        'backlog': image_processor.get_backlog_progress() if image_processor else None,
+        'near_duplicates': image_processor.get_near_duplicate_stats() if image_processor else None,
         'directories': {
             'originals': ORIGINALS_DIR,
             'cropped_eyes': CROPPED_EYES_DIR
@@ -88,15 +149,13 @@ def process_test_image():
         
         if create_test_image(test_image_path):
             # Process the test image
-            eye_filenames = image_processor.detect_faces_and_eyes(test_image_path)
+            result = image_processor.process_image(test_image_path)
+            eye_filenames = list(result['eye_filenames']) if result else []
             
             # Emit the new eye images to clients
-            for filename in eye_filenames:
-                socketio.emit('new_eye_image_available', {
-                    'filename': filename,
-                    'url': f'/eyes/{filename}',
-                    'timestamp': time.time()
-                })
+            if result:
+                image_processor.notify_eye_images(result['eyes'], live=True,
+                                                  source=os.path.basename(test_image_path))
             
             return {'status': 'success', 'eyes_found': len(eye_filenames), 'filenames': eye_filenames}
         else:
@@ -104,6 +163,18 @@ def process_test_image():
     else:
         return {'status': 'error', 'message': 'Image processor not initialized'}
 
+def get_connection_status():
+    """Build the 'connection_status' payload (processor, monitors and backlog progress)"""
+    return {
+        'status': 'connected',
+        'image_processor_ready': image_processor is not None,
+        'monitoring_active': image_processor.is_monitoring if image_processor else False,
+        'backlog': image_processor.get_backlog_progress() if image_processor else None,
+        'sd_card_monitoring_active': sd_card_monitor.is_monitoring if sd_card_monitor else False,
+        'current_sd_cards': sd_card_monitor.get_current_cards() if sd_card_monitor else [],
+        'import_in_progress': sd_card_monitor.is_importing if sd_card_monitor else False
+    }
+
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
@@ -111,14 +182,7 @@ def handle_connect():
     emit('server_message', {'data': 'Connected to server'})
     
     # Send current status
-    emit('connection_status', {
-        'status': 'connected',
-        'image_processor_ready': image_processor is not None,
-        'monitoring_active': image_processor.is_monitoring if image_processor else False,
-        'sd_card_monitoring_active': sd_card_monitor.is_monitoring if sd_card_monitor else False,
-        'current_sd_cards': sd_card_monitor.get_current_cards() if sd_card_monitor else [],
-        'import_in_progress': sd_card_monitor.is_importing if sd_card_monitor else False
-    })
+    emit('connection_status', get_connection_status())
     
     # Send existing eye images to the newly connected client
     send_existing_eye_images()
@@ -177,20 +241,18 @@ def handle_animation_trigger():
 def handle_status_request():
     """Handle request for current system status"""
     global image_processor, sd_card_monitor
-    emit('connection_status', {
-        'status': 'connected',
-        'image_processor_ready': image_processor is not None,
-        'monitoring_active': image_processor.is_monitoring if image_processor else False,
-        'sd_card_monitoring_active': sd_card_monitor.is_monitoring if sd_card_monitor else False,
-        'current_sd_cards': sd_card_monitor.get_current_cards() if sd_card_monitor else [],
-        'import_in_progress': sd_card_monitor.is_importing if sd_card_monitor else False
-    })
+    emit('connection_status', get_connection_status())
 
 @socketio.on('request_existing_eyes')
 def handle_request_existing_eyes():
     """Handle request for existing eye images"""
     send_existing_eye_images()
 
+@socketio.on('request_pipeline_metrics')
+def handle_pipeline_metrics_request():
+    """Debug: send the per-stage latency histograms to the requesting client"""
+    emit('pipeline_metrics', get_pipeline_metrics())
+
 @socketio.on('request_keyboard_status')
 def handle_keyboard_status_request():
     """Handle request for keyboard listener status"""
@@ -260,14 +322,30 @@ def send_existing_eye_images():
             image_files.sort(key=lambda f: os.path.getmtime(os.path.join(CROPPED_EYES_DIR, f)), reverse=True)
             
             # Send existing eye images (limit to most recent 20)
+            payloads = []
             for filename in image_files[:20]:
-                emit('new_eye_image_available', {
+                payloads.append({
                     'filename': filename,
                     'url': f'/eyes/{filename}',
                     'timestamp': os.path.getmtime(os.path.join(CROPPED_EYES_DIR, filename)),
-                    'existing': True  # Flag to indicate this is an existing image
+                    'existing': True,  # Flag to indicate this is an existing image
+                    'variants': image_processor.get_eye_variants(filename) if image_processor else [],
+                    'atlas': image_processor.get_eye_atlas_entry(filename) if image_processor else None
                 })
             
+            # One batched message unless the legacy per-eye event mode is configured
+            if image_processor and image_processor.processing_config['eye_event_mode'] != 'per_eye':
+                if payloads:
+                    emit(BATCH_EVENT, {
+                        'images': [{'source': None, 'faces': [{'face_index': None, 'eyes': payloads}],
+                                    'eye_count': len(payloads)}],
+                        'count': len(payloads),
+                        'existing': True
+                    })
+            else:
+                for payload in payloads:
+                    emit(PER_EYE_EVENT, payload)
+            
             print(f"Sent {min(len(image_files), 20)} existing eye images to client")
     except Exception as e:
         print(f"Error sending existing eye images: {e}")
@@ -294,23 +372,18 @@ def initialize_image_processor():
             cropped_eyes_dir=CROPPED_EYES_DIR
         )
         
-        # Process any existing images
-        image_processor.process_existing_images()
-        
-        # Start monitoring for new images
+        # Start monitoring first so images arriving during the backlog are not missed
         image_processor.start_monitoring()
         
+        # Process existing images in the background, broadcasting progress
+        image_processor.start_backlog_processing(
+            progress_fn=lambda progress: socketio.emit('connection_status', get_connection_status())
+        )
+        
         print("Image processor initialized and monitoring started")
         
         # Broadcast the updated status to all connected clients
-        socketio.emit('connection_status', {
-            'status': 'connected',
-            'image_processor_ready': True,
-            'monitoring_active': image_processor.is_monitoring,
-            'sd_card_monitoring_active': sd_card_monitor.is_monitoring if sd_card_monitor else False,
-            'current_sd_cards': sd_card_monitor.get_current_cards() if sd_card_monitor else [],
-            'import_in_progress': sd_card_monitor.is_importing if sd_card_monitor else False
-        })
+        socketio.emit('connection_status', get_connection_status())
         
     except Exception as e:
         print(f"Error initializing image processor: {e}")
@@ -550,22 +623,46 @@ def cleanup_on_shutdown():
             os.remove(import_history_file)
             print(f"✓ Cleared import history: {import_history_file}")
         
+        # Clear detection result cache
+        detection_cache_file = os.path.join(DATA_DIR, 'detection_cache.json')
+        if os.path.exists(detection_cache_file):
+            os.remove(detection_cache_file)
+            print(f"✓ Cleared detection cache: {detection_cache_file}")
+        
+        # Clear startup backlog checkpoint
+        backlog_checkpoint_file = os.path.join(DATA_DIR, 'backlog_checkpoint.json')
+        if os.path.exists(backlog_checkpoint_file):
+            os.remove(backlog_checkpoint_file)
+            print(f"✓ Cleared backlog checkpoint: {backlog_checkpoint_file}")
+        
+        # Clear eye texture atlases
+        atlas_dir = os.path.join(DATA_DIR, 'atlases')
+        if os.path.exists(atlas_dir):
+            shutil.rmtree(atlas_dir)
+            print(f"✓ Cleared eye atlases: {atlas_dir}")
+        
         print("✓ Cleanup completed successfully")
         
     except Exception as e:
         print(f"✗ Error during cleanup: {e}")
 
-def signal_handler(signum, frame):
-    """Handle shutdown signals"""
-    print(f"\nReceived signal {signum}, shutting down...")
-    cleanup_on_shutdown()
-    
-    # Stop monitoring services
+def stop_services():
+    """Stop the image processor and SD card monitor (they save their state while stopping)"""
     global image_processor, sd_card_monitor
     if image_processor:
         image_processor.stop_monitoring()
     if sd_card_monitor:
         sd_card_monitor.stop_monitoring()
+
+def shutdown():
+    """Stop every service, then clean up (last, so no stopping service writes state back)"""
+    stop_services()
+    cleanup_on_shutdown()
+
+def signal_handler(signum, frame):
+    """Handle shutdown signals"""
+    print(f"\nReceived signal {signum}, shutting down...")
+    shutdown()
     
     print("Server stopped by signal")
     sys.exit(0)
@@ -578,7 +675,7 @@ if __name__ == '__main__':
     # Register cleanup handlers
     signal.signal(signal.SIGINT, signal_handler)  # Ctrl+C
     signal.signal(signal.SIGTERM, signal_handler)  # Termination signal
-    atexit.register(cleanup_on_shutdown)  # Normal exit
+    atexit.register(shutdown)  # Normal exit
     
     # Create data directories if they don't exist
     os.makedirs(CROPPED_EYES_DIR, exist_ok=True)
@@ -595,9 +692,5 @@ if __name__ == '__main__':
         socketio.run(app, host='0.0.0.0', port=5000, debug=True, use_reloader=False)
     except KeyboardInterrupt:
         print("\nShutting down server...")
-        cleanup_on_shutdown()
-        if image_processor:
-            image_processor.stop_monitoring()
-        if sd_card_monitor:
-            sd_card_monitor.stop_monitoring()
+        shutdown()
         print("Server stopped.") 
\ No newline at end of file
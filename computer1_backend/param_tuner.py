@@ -0,0 +1,324 @@
+"""
+Detection Parameter Tuner for Experimental Theatre Digital Program
+
+This module handles:
+- Grid or random search over detection_params (scale factors, neighbours,
+  minimum sizes, detection proxy resolution)
+- Scoring every trial against labelled eye boxes (precision, recall, F1 at an IoU threshold)
+- Running trials in parallel worker processes (one ImageProcessor each)
+- The Pareto front of mean latency against precision and recall, and the
+  best trial within a per-image time budget
+- Drafting a label file from the current detector output for hand correction
+
+Label files are JSON: {"version": 1, "images": {"<image name>": [[x, y, w, h], ...]}}
+with eye boxes in full-resolution pixel coordinates of the original image, and
+an optional free-text "source" saying how the boxes were obtained.
+
+Usage:
+    python param_tuner.py --bootstrap-labels ../shared/test_images/eye_labels.json
+    python param_tuner.py --mode random --trials 40 --jobs 4 --budget-ms 300
+    python param_tuner.py --mode grid --max-trials 200 --json tuning.json
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2
+
+from image_processor import ImageProcessor
+from benchmark_fixtures import DEFAULT_IMAGES_DIR, IMAGE_EXTENSIONS, percentile
+
+logger = logging.getLogger(__name__)
+
+LABELS_FORMAT_VERSION = 1
+DEFAULT_LABELS_FILE = DEFAULT_IMAGES_DIR / 'eye_labels.json'
+
+# Values tried per parameter. With the default 'adaptive' search window policy
+# the face minimum size is face_size_range[0] (fraction of the short edge) and
+# eye_min_size is the absolute floor of the eye window.
+SEARCH_SPACE = {
+    'face_scale_factor': [1.05, 1.1, 1.2, 1.3],
+    'face_min_neighbors': [3, 4, 5, 6],
+    'face_size_range': [(0.05, 1.0), (0.1, 1.0), (0.2, 1.0)],
+    'eye_scale_factor': [1.03, 1.05, 1.1, 1.15],
+    'eye_min_neighbors': [3, 4, 6, 8],
+    'eye_min_size': [(10, 10), (15, 15), (20, 20)],
+    'detection_max_dimension': [640, 960, 1280]
+}
+
+# Per worker process state (see _init_worker)
+_worker_processor: Optional[ImageProcessor] = None
+_worker_baseline: Dict = {}
+
+
+def load_labels(labels_file) -> Dict[str, List[List[int]]]:
+    """Load labelled eye boxes keyed by image name"""
+    with open(labels_file) as f:
+        data = json.load(f)
+    if data.get('version') != LABELS_FORMAT_VERSION:
+        raise Exception(f"Unsupported eye label file version: {data.get('version')}")
+    return {name: [list(map(int, box)) for box in boxes] for name, boxes in data['images'].items()}
+
+
+def box_iou(a, b) -> float:
+    """Intersection over union of two (x, y, w, h) boxes"""
+    ix = max(0, min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1]))
+    intersection = ix * iy
+    union = a[2] * a[3] + b[2] * b[3] - intersection
+    return intersection / float(union) if union > 0 else 0.0
+
+
+def match_boxes(predicted, labelled, iou_threshold=0.3) -> int:
+    """Greedily match predicted to labelled boxes by IoU; returns the number of true positives"""
+    pairs = sorted(
+        ((box_iou(p, l), i, j) for i, p in enumerate(predicted) for j, l in enumerate(labelled)),
+        reverse=True
+    )
+    used_predicted, used_labelled = set(), set()
+    for iou, i, j in pairs:
+        if iou < iou_threshold:
+            break
+        if i in used_predicted or j in used_labelled:
+            continue
+        used_predicted.add(i)
+        used_labelled.add(j)
+    return len(used_predicted)
+
+
+def build_trials(mode='random', num_trials=40, max_trials=None, seed=1234, space=None) -> List[Dict]:
+    """
+    Build the parameter overrides of every trial
+
+    The first trial is always the current defaults ({}), as the reference point.
+    Random mode samples distinct grid points with a fixed seed, so runs are repeatable.
+    """
+    space = space or SEARCH_SPACE
+    keys = sorted(space)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+
+    if mode == 'grid':
+        trials = grid[:max_trials] if max_trials else grid
+    else:
+        trials = random.Random(seed).sample(grid, min(num_trials, len(grid)))
+    return [{}] + trials
+
+
+def _init_worker(work_dir):
+    """Create this process's ImageProcessor (cache, near-duplicate reuse, atlas and QoS off)"""
+    global _worker_processor, _worker_baseline
+    cv2.setNumThreads(1)
+    logging.getLogger('image_processor').setLevel(logging.WARNING)
+    crops_dir = Path(work_dir) / f"worker_{os.getpid()}"
+    _worker_processor = ImageProcessor(originals_dir=crops_dir / 'unused', cropped_eyes_dir=crops_dir,
+                                       num_workers=1)
+    _worker_processor.detection_cache = None
+    _worker_processor.processing_config['near_duplicate_mode'] = 'off'
+    _worker_processor.near_duplicates = None
+    _worker_processor.atlas_builder = None
+    _worker_processor.qos = None
+    _worker_baseline = dict(_worker_processor.detection_params)
+
+
+def run_trial(trial_index, overrides, image_paths, labels, iou_threshold=0.3, repeats=1) -> Dict:
+    """
+    Run one parameter set over the labelled images (in a worker process)
+
+    Returns:
+        Trial record with latency, precision, recall and F1
+    """
+    processor = _worker_processor
+    # Update in place: the search window policy and crop pipeline hold this dict
+    processor.detection_params.clear()
+    processor.detection_params.update(_worker_baseline)
+    processor.detection_params.update(overrides)
+
+    latencies = []
+    true_positives = predicted = labelled = 0
+    for repeat in range(repeats):
+        for image_path in image_paths:
+            start_time = time.perf_counter()
+            result = processor.process_image(image_path)
+            latencies.append(time.perf_counter() - start_time)
+            if repeat:
+                continue
+            boxes = [record['box'] for record in result['eyes']] if result else []
+            truth = labels.get(Path(image_path).name, [])
+            true_positives += match_boxes(boxes, truth, iou_threshold)
+            predicted += len(boxes)
+            labelled += len(truth)
+
+    precision = true_positives / float(predicted) if predicted else 0.0
+    recall = true_positives / float(labelled) if labelled else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        'trial': trial_index,
+        'params': {key: list(value) if isinstance(value, tuple) else value for key, value in overrides.items()},
+        'mean_latency_ms': round(statistics.mean(latencies) * 1000, 2),
+        'p95_latency_ms': round(percentile(latencies, 95) * 1000, 2),
+        'precision': round(precision, 4),
+        'recall': round(recall, 4),
+        'f1': round(f1, 4),
+        'true_positives': true_positives,
+        'predicted': predicted,
+        'labelled': labelled
+    }
+
+
+def pareto_front(trials: List[Dict]) -> List[Dict]:
+    """Trials not dominated on (lower mean latency, higher precision, higher recall), fastest first"""
+    def dominates(a, b):
+        no_worse = (a['mean_latency_ms'] <= b['mean_latency_ms'] and a['precision'] >= b['precision']
+                    and a['recall'] >= b['recall'])
+        better = (a['mean_latency_ms'] < b['mean_latency_ms'] or a['precision'] > b['precision']
+                  or a['recall'] > b['recall'])
+        return no_worse and better
+
+    front = [t for t in trials if not any(dominates(other, t) for other in trials if other is not t)]
+    return sorted(front, key=lambda t: t['mean_latency_ms'])
+
+
+def best_within_budget(trials: List[Dict], budget_ms: Optional[float]) -> Optional[Dict]:
+    """Highest-F1 trial (then fastest) whose p95 latency fits the per-image budget"""
+    candidates = [t for t in trials if budget_ms is None or t['p95_latency_ms'] <= budget_ms]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda t: (t['f1'], -t['mean_latency_ms']))
+
+
+def tune(image_paths, labels, trials, jobs=None, iou_threshold=0.3, repeats=1, budget_ms=None) -> Dict:
+    """
+    Run every trial across worker processes and summarise the results
+
+    Latency is measured with one OpenCV thread per process while other
+    trials run, so compare trials with each other rather than with a
+    single-process benchmark (use jobs=1 for uncontended figures).
+    """
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    work_dir = Path(tempfile.mkdtemp(prefix='eye_tuning_'))
+    start_time = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(str(work_dir),)) as executor:
+        futures = [executor.submit(run_trial, index, overrides, image_paths, labels, iou_threshold, repeats)
+                   for index, overrides in enumerate(trials)]
+        results = []
+        for future in futures:
+            results.append(future.result())
+            logger.info(f"Trial {len(results)}/{len(futures)} done")
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    front = pareto_front(results)
+    return {
+        'images': [Path(p).name for p in image_paths],
+        'iou_threshold': iou_threshold,
+        'repeats': repeats,
+        'jobs': jobs,
+        'duration_s': round(time.perf_counter() - start_time, 2),
+        'baseline': results[0],
+        'trials': results,
+        'pareto_front': [t['trial'] for t in front],
+        'budget_ms': budget_ms,
+        'recommended': best_within_budget(results, budget_ms)
+    }
+
+
+def bootstrap_labels(image_paths, labels_file, overrides=None):
+    """
+    Write the current detector's eye boxes as a draft label file
+
+    The draft must be reviewed by hand (remove false positives, add missed
+    eyes) before it is used for tuning.
+    """
+    _init_worker(tempfile.mkdtemp(prefix='eye_labels_'))
+    _worker_processor.detection_params.update(overrides or {})
+    images = {}
+    for image_path in image_paths:
+        result = _worker_processor.process_image(image_path)
+        images[Path(image_path).name] = [record['box'] for record in result['eyes']] if result else []
+    with open(labels_file, 'w') as f:
+        json.dump({
+            'version': LABELS_FORMAT_VERSION,
+            'source': 'Draft from the detector output (param_tuner.py --bootstrap-labels); '
+                      'not yet reviewed by hand',
+            'images': images
+        }, f, indent=2)
+    logger.info(f"Wrote draft labels for {len(images)} images to {labels_file}")
+
+
+def print_front_table(results):
+    """Print the Pareto front and the recommended trial"""
+    by_index = {t['trial']: t for t in results['trials']}
+    print(f"{len(results['trials'])} trials in {results['duration_s']}s on {results['jobs']} processes; "
+          f"Pareto front (fastest first):")
+    print(f"{'trial':>6}{'mean ms':>10}{'p95 ms':>10}{'prec':>7}{'recall':>8}{'f1':>7}  params")
+    for index in results['pareto_front']:
+        t = by_index[index]
+        params = 'defaults' if not t['params'] else json.dumps(t['params'], sort_keys=True)
+        print(f"{index:>6}{t['mean_latency_ms']:>10}{t['p95_latency_ms']:>10}{t['precision']:>7.3f}"
+              f"{t['recall']:>8.3f}{t['f1']:>7.3f}  {params}")
+    base = results['baseline']
+    print(f"defaults: {base['mean_latency_ms']} ms, precision {base['precision']:.3f}, recall {base['recall']:.3f}")
+    best = results['recommended']
+    if best is not None:
+        budget = f"p95 <= {results['budget_ms']} ms" if results['budget_ms'] else 'no budget'
+        print(f"recommended ({budget}): trial {best['trial']} {json.dumps(best['params'], sort_keys=True)}")
+    else:
+        print(f"no trial fits p95 <= {results['budget_ms']} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tune detection_params against labelled eye boxes')
+    parser.add_argument('--images', default=str(DEFAULT_IMAGES_DIR), help='Directory of labelled images')
+    parser.add_argument('--labels', default=str(DEFAULT_LABELS_FILE), help='Eye label JSON file')
+    parser.add_argument('--bootstrap-labels', metavar='PATH',
+                        help='Write the current detections as a draft label file and exit')
+    parser.add_argument('--mode', choices=['random', 'grid'], default='random', help='Search strategy')
+    parser.add_argument('--trials', type=int, default=40, help='Random trials (plus the defaults)')
+    parser.add_argument('--max-trials', type=int, help='Cap on grid trials')
+    parser.add_argument('--seed', type=int, default=1234, help='Random search seed')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Parallel trial processes')
+    parser.add_argument('--repeats', type=int, default=1, help='Timed passes per trial')
+    parser.add_argument('--iou', type=float, default=0.3, help='IoU needed to match a labelled eye')
+    parser.add_argument('--budget-ms', type=float, help='Per-image p95 time budget for the recommendation')
+    parser.add_argument('--json', help='Optional path to write all trials and the front as JSON')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger('image_processor').setLevel(logging.WARNING)
+
+    image_paths = sorted(p for p in Path(args.images).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+
+    if args.bootstrap_labels:
+        bootstrap_labels(image_paths, args.bootstrap_labels)
+        return
+
+    labels = load_labels(args.labels)
+    image_paths = [p for p in image_paths if p.name in labels]
+    if not image_paths:
+        raise Exception(f"No images in {args.images} are labelled in {args.labels}")
+
+    trials = build_trials(args.mode, args.trials, args.max_trials, args.seed)
+    results = tune(image_paths, labels, trials, args.jobs, args.iou, args.repeats, args.budget_ms)
+    print_front_table(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,493 @@
+"""
+Pipeline Benchmark for Experimental Theatre Digital Program
+
+This module handles:
+- Side-by-side comparison of detection_params variants over the test images
+  (latency, hit rate, cascade scales), upscaled or as synthetic group photos
+- A reproducible suite (native, 12/24/45 MP) reporting images/s, latency
+  percentiles, peak RSS and eyes found as JSON, and comparison of two result files
+
+Image preparation and processor setup live in benchmark_fixtures.py. Single
+components are benchmarked next to their modules: eye_filters_benchmark.py,
+crop_pipeline_benchmark.py, eye_events_benchmark.py, detection_pool_benchmark.py
+(scheduling), qos_benchmark.py and pipeline_metrics_benchmark.py.
+
+Usage:
+    python pipeline_benchmark.py --upscale 4 --variants resolution
+    python pipeline_benchmark.py --upscale 4 --variants search_window
+    python pipeline_benchmark.py --group --variants tiling
+    python pipeline_benchmark.py --upscale 1 --variants detector
+    python pipeline_benchmark.py --suite --repeats 3 --json baseline.json
+    python pipeline_benchmark.py --compare baseline.json candidate.json
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from benchmark_fixtures import (BASE_DIR, DEFAULT_IMAGES_DIR, make_processor, percentile, prepare_group_images,
+                                prepare_images, prepare_megapixel_images, write_json)
+from detector_backends import get_backend_costs, reset_backend_costs
+
+logger = logging.getLogger(__name__)
+
+# Detection resolution variants
+DETECTION_RESOLUTION_VARIANTS = {
+    'full_frame': {'detection_max_dimension': None, 'search_window_policy': 'fixed'},
+    'proxy_1280': {'detection_max_dimension': 1280, 'search_window_policy': 'fixed'},
+    'proxy_960': {'detection_max_dimension': 960, 'search_window_policy': 'fixed'}
+}
+
+# Search window policy variants
+SEARCH_WINDOW_VARIANTS = {
+    'fixed_window': {'search_window_policy': 'fixed'},
+    'adaptive_window': {'search_window_policy': 'adaptive'}
+}
+
+# Eye search band variants
+EYE_BAND_VARIANTS = {
+    'full_face_roi': {'eye_band_enabled': False},
+    'eye_band': {'eye_band_enabled': True},
+    'eye_band_no_post_filter': {'eye_band_enabled': True, 'eye_position_filter': False}
+}
+
+# Tiled face detection variants (run on --group mosaics)
+TILING_VARIANTS = {
+    'single_pass': {'detection_max_dimension': None, 'face_size_range': (0.04, 0.2),
+                    'tiled_face_detection': False},
+    'tiled': {'detection_max_dimension': None, 'face_size_range': (0.04, 0.2),
+              'tiled_face_detection': True}
+}
+
+# Per-face eye stage concurrency variants (processing_config, run on --group mosaics)
+FACE_CONCURRENCY_VARIANTS = {
+    'serial_faces': {'detection_max_dimension': None, 'face_size_range': (0.04, 0.2),
+                     'processing.parallel_faces': False},
+    'parallel_faces': {'detection_max_dimension': None, 'face_size_range': (0.04, 0.2),
+                       'processing.parallel_faces': True}
+}
+
+# Face detector backend variants (YuNet needs models/face_detection_yunet_2023mar.onnx)
+DETECTOR_VARIANTS = {
+    'haar': {'face_detector': 'haar'},
+    'yunet': {'face_detector': 'yunet'}
+}
+
+# Tiered detection variants (escalation chain vs first tier only)
+TIER_VARIANTS = {
+    'single_tier': {'tiered_detection': False},
+    'tiered': {'tiered_detection': True},
+    'tiered_tight_budget': {'tiered_detection': True, 'detection_time_budget': 0.05}
+}
+
+# Benchmark suite image sets: None keeps the native test images, numbers are megapixels
+SUITE_SETS = {'native': None, '12mp': 12, '24mp': 24, '45mp': 45}
+SUITE_FORMAT_VERSION = 1
+
+# Metrics compared between suite result files: (key, True if higher is better)
+SUITE_METRICS = [
+    ('images_per_second', True),
+    ('p50_latency_ms', False),
+    ('p95_latency_ms', False),
+    ('p99_latency_ms', False),
+    ('peak_rss_mb', False)
+]
+
+VARIANT_SETS = {
+    'resolution': DETECTION_RESOLUTION_VARIANTS,
+    'search_window': SEARCH_WINDOW_VARIANTS,
+    'eye_band': EYE_BAND_VARIANTS,
+    'tiling': TILING_VARIANTS,
+    'face_concurrency': FACE_CONCURRENCY_VARIANTS,
+    'detector': DETECTOR_VARIANTS,
+    'tiers': TIER_VARIANTS
+}
+
+
+def run_variant(name, param_overrides, image_paths, output_dir, repeats=1):
+    """
+    Run detection over every image with the given detection_params overrides
+
+    Returns:
+        Dictionary with latency statistics and per-image eye counts
+    """
+    processor = make_processor(output_dir, name, param_overrides=param_overrides)
+
+    latencies = []
+    eyes_per_image = {}
+    cascade_scales = {'face': 0, 'eye': 0}
+    reset_backend_costs()
+
+    for _ in range(repeats):
+        for image_path in image_paths:
+            start_time = time.perf_counter()
+            result = processor.process_image(image_path)
+            latencies.append(time.perf_counter() - start_time)
+            eyes_per_image[image_path.name] = len(result['eye_filenames']) if result else 0
+            if result:
+                for stage, count in result.get('cascade_scales', {}).items():
+                    cascade_scales[stage] += count
+
+    tier_stats = processor.get_tier_stats()
+    processor.stop_monitoring()
+    images_with_eyes = sum(1 for count in eyes_per_image.values() if count > 0)
+
+    return {
+        'name': name,
+        'params': {k: v for k, v in param_overrides.items()},
+        'images': len(image_paths),
+        'mean_latency_ms': round(statistics.mean(latencies) * 1000, 2) if latencies else 0.0,
+        'p50_latency_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_latency_ms': round(percentile(latencies, 95) * 1000, 2),
+        'eyes_found': sum(eyes_per_image.values()),
+        'images_with_eyes': images_with_eyes,
+        'eyes_per_image': eyes_per_image,
+        'cascade_scales': cascade_scales,
+        'face_detector_costs': get_backend_costs(),
+        'tier_stats': tier_stats
+    }
+
+
+def compare_variants(variants, image_paths, output_dir, repeats=1):
+    """
+    Run several variants and add a hit rate relative to the first (baseline) variant
+
+    The hit rate is the fraction of baseline images with eyes in which the
+    variant also found at least one eye.
+    """
+    results = [run_variant(name, overrides, image_paths, output_dir, repeats)
+               for name, overrides in variants.items()]
+
+    baseline = results[0]
+    baseline_hits = {name for name, count in baseline['eyes_per_image'].items() if count > 0}
+
+    for result in results:
+        variant_hits = {name for name, count in result['eyes_per_image'].items() if count > 0}
+        result['hit_rate_vs_baseline'] = (
+            round(len(baseline_hits & variant_hits) / len(baseline_hits), 3) if baseline_hits else None
+        )
+        result['speedup_vs_baseline'] = (
+            round(baseline['mean_latency_ms'] / result['mean_latency_ms'], 2)
+            if result['mean_latency_ms'] else None
+        )
+
+    return results
+
+
+def print_table(results):
+    """Print a compact comparison table"""
+    print(f"{'variant':<26}{'mean ms':>10}{'p95 ms':>10}{'eyes':>7}{'hit rate':>10}{'speedup':>9}"
+          f"{'face scales':>13}{'eye scales':>12}")
+    for result in results:
+        print(f"{result['name']:<26}{result['mean_latency_ms']:>10.1f}{result['p95_latency_ms']:>10.1f}"
+              f"{result['eyes_found']:>7}{str(result['hit_rate_vs_baseline']):>10}"
+              f"{str(result['speedup_vs_baseline']):>9}"
+              f"{result['cascade_scales']['face']:>13}{result['cascade_scales']['eye']:>12}")
+
+    print("\nface detector cost (ms per megapixel):")
+    for result in results:
+        costs = ', '.join(f"{name}={cost['ms_per_megapixel']}"
+                          for name, cost in result['face_detector_costs'].items())
+        print(f"  {result['name']:<24}{costs or 'n/a'}")
+
+    print("\ndetection tiers (hit rate / mean ms / budget skips):")
+    for result in results:
+        tiers = ', '.join(f"{tier['name']}={tier['hit_rate']}/{tier['mean_ms']}/{tier['skipped_for_budget']}"
+                          for tier in result['tier_stats'] if tier['attempts'] or tier['skipped_for_budget'])
+        print(f"  {result['name']:<24}{tiers or 'n/a'}")
+
+
+def reset_peak_rss():
+    """Reset the kernel's peak RSS counter (Linux only); returns False if unsupported"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """Peak resident set size in MB (since the last reset_peak_rss where supported)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024.0, 1)
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024.0 * 1024.0 if sys.platform == 'darwin' else 1024.0), 1)
+
+
+def describe_machine():
+    """Machine and library details stored with suite results"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                                capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        'hostname': platform.node(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+        'git_commit': commit
+    }
+
+
+def run_suite_set(name, image_paths, output_dir, repeats=3, workers=1, param_overrides=None):
+    """
+    Benchmark one image set through the worker pool
+
+    The detection cache and QoS controller are disabled so every pass does
+    the same work. One warm-up pass per worker loads the cascades first.
+    """
+    processor = make_processor(output_dir, name, workers, param_overrides)
+    processor.qos = None
+
+    processor.worker_pool.map([image_paths[0]] * processor.worker_pool.num_workers)
+
+    latencies = []
+
+    def timed_process(image_path):
+        start_time = time.perf_counter()
+        result = processor.process_image(image_path)
+        latencies.append(time.perf_counter() - start_time)
+        return result
+
+    processor.worker_pool.process_fn = timed_process
+    rss_reset = reset_peak_rss()
+    start_time = time.perf_counter()
+    results = processor.worker_pool.map(list(image_paths) * repeats)
+    duration = time.perf_counter() - start_time
+    peak_rss = peak_rss_mb()
+    processor.stop_monitoring()
+
+    eyes_per_pass = [
+        sum(len(result['eye_filenames']) for result in results[i:i + len(image_paths)] if result)
+        for i in range(0, len(results), len(image_paths))
+    ]
+    pixels = []
+    for image_path in image_paths:
+        with Image.open(image_path) as img:
+            pixels.append(img.size[0] * img.size[1])
+
+    return {
+        'images': len(image_paths),
+        'megapixels': round(statistics.mean(pixels) / 1e6, 1),
+        'processed': len(results),
+        'duration_s': round(duration, 3),
+        'images_per_second': round(len(results) / duration, 3),
+        'mean_latency_ms': round(statistics.mean(latencies) * 1000, 2),
+        'p50_latency_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_latency_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_latency_ms': round(percentile(latencies, 99) * 1000, 2),
+        'peak_rss_mb': peak_rss,
+        'peak_rss_per_set': rss_reset,
+        'eyes_found': eyes_per_pass[0] if eyes_per_pass else 0,
+        'eyes_consistent': len(set(eyes_per_pass)) <= 1
+    }
+
+
+def run_suite(images_dir, work_dir, sets=None, repeats=3, workers=1, param_overrides=None):
+    """
+    Run the reproducible benchmark suite
+
+    Args:
+        images_dir: Directory of source test images
+        work_dir: Scratch directory for prepared images and crops
+        sets: Names from SUITE_SETS (default: all, smallest first)
+        repeats: Measured passes over every set
+        workers: Detection worker threads
+        param_overrides: Optional detection_params overrides for every set
+
+    Returns:
+        JSON-serialisable result dictionary (see compare_suite_results)
+    """
+    work_dir = Path(work_dir)
+    sets = sets or list(SUITE_SETS)
+    fingerprint_processor = make_processor(work_dir, 'fingerprint', param_overrides=param_overrides)
+    params_fingerprint = fingerprint_processor.get_params_fingerprint()
+    fingerprint_processor.stop_monitoring()
+
+    results = {}
+    for name in sets:
+        megapixels = SUITE_SETS[name]
+        if megapixels is None:
+            image_paths = prepare_images(images_dir, work_dir / 'images' / name)
+        else:
+            image_paths = prepare_megapixel_images(images_dir, work_dir / 'images' / name, megapixels)
+        results[name] = run_suite_set(name, image_paths, work_dir / 'output', repeats, workers,
+                                      param_overrides)
+        logger.info(f"Suite set {name}: {results[name]['images_per_second']} images/s")
+
+    return {
+        'suite_version': SUITE_FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'machine': describe_machine(),
+        'settings': {
+            'repeats': repeats,
+            'workers': workers,
+            'param_overrides': param_overrides or {},
+            'params_fingerprint': params_fingerprint
+        },
+        'sets': results
+    }
+
+
+def print_suite_table(results):
+    """Print suite results"""
+    print(f"{'set':<8}{'MP':>6}{'img/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'RSS MB':>9}{'eyes':>6}")
+    for name, result in results['sets'].items():
+        print(f"{name:<8}{str(result['megapixels']):>6}{result['images_per_second']:>9}"
+              f"{result['p50_latency_ms']:>10}{result['p95_latency_ms']:>10}{result['p99_latency_ms']:>10}"
+              f"{result['peak_rss_mb']:>9}{result['eyes_found']:>6}")
+
+
+def compare_suite_results(baseline, candidate, threshold=5.0):
+    """
+    Compare two suite result files set by set
+
+    Args:
+        baseline: Result dictionary of the reference run
+        candidate: Result dictionary of the run being judged
+        threshold: Percentage change treated as a regression/improvement
+
+    Returns:
+        Dictionary with per-set metric changes, 'regressions' and warnings
+    """
+    warnings = []
+    if baseline.get('suite_version') != candidate.get('suite_version'):
+        warnings.append('suite format versions differ')
+    for key in ('hostname', 'cpu_count', 'opencv'):
+        if baseline['machine'].get(key) != candidate['machine'].get(key):
+            warnings.append(f"machine {key} differs: {baseline['machine'].get(key)} vs "
+                            f"{candidate['machine'].get(key)}")
+    for key in ('repeats', 'workers'):
+        if baseline['settings'].get(key) != candidate['settings'].get(key):
+            warnings.append(f"setting {key} differs")
+
+    sets = {}
+    regressions = []
+    for name, base in baseline['sets'].items():
+        cand = candidate['sets'].get(name)
+        if cand is None:
+            warnings.append(f"set {name} missing from candidate")
+            continue
+        metrics = {}
+        for key, higher_is_better in SUITE_METRICS:
+            change = (cand[key] - base[key]) * 100.0 / base[key] if base[key] else 0.0
+            better = change > threshold if higher_is_better else change < -threshold
+            worse = change < -threshold if higher_is_better else change > threshold
+            metrics[key] = {
+                'baseline': base[key],
+                'candidate': cand[key],
+                'change_pct': round(change, 1),
+                'verdict': 'better' if better else 'worse' if worse else 'same'
+            }
+            if worse:
+                regressions.append(f"{name}.{key}")
+        metrics['eyes_found'] = {
+            'baseline': base['eyes_found'],
+            'candidate': cand['eyes_found'],
+            'change': cand['eyes_found'] - base['eyes_found']
+        }
+        sets[name] = metrics
+
+    return {'threshold_pct': threshold, 'warnings': warnings, 'regressions': regressions, 'sets': sets}
+
+
+def print_comparison_table(comparison):
+    """Print a suite comparison"""
+    for warning in comparison['warnings']:
+        print(f"warning: {warning}")
+    print(f"{'set':<8}{'metric':<20}{'baseline':>11}{'candidate':>11}{'change':>9}  verdict")
+    for name, metrics in comparison['sets'].items():
+        for key, _ in SUITE_METRICS:
+            metric = metrics[key]
+            print(f"{name:<8}{key:<20}{metric['baseline']:>11}{metric['candidate']:>11}"
+                  f"{metric['change_pct']:>8}%  {metric['verdict']}")
+        eyes = metrics['eyes_found']
+        print(f"{name:<8}{'eyes_found':<20}{eyes['baseline']:>11}{eyes['candidate']:>11}{eyes['change']:>+9}")
+    status = ', '.join(comparison['regressions']) if comparison['regressions'] else 'none'
+    print(f"regressions beyond {comparison['threshold_pct']}%: {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the eye detection pipeline')
+    parser.add_argument('--images', default=str(DEFAULT_IMAGES_DIR), help='Directory of benchmark images')
+    parser.add_argument('--upscale', type=float, default=4.0,
+                        help='Upscale factor to simulate full camera frames (4 ~ 13-15 MP)')
+    parser.add_argument('--repeats', type=int, default=1, help='Passes over the image set per variant')
+    parser.add_argument('--variants', choices=sorted(VARIANT_SETS), default='resolution',
+                        help='Which set of detection_params variants to compare')
+    parser.add_argument('--group', action='store_true',
+                        help='Benchmark on synthetic group photos built from the test images')
+    parser.add_argument('--suite', action='store_true',
+                        help='Run the reproducible suite (native and 12/24/45 MP sets)')
+    parser.add_argument('--sets', nargs='+', choices=list(SUITE_SETS), help='Suite sets to run (default: all)')
+    parser.add_argument('--workers', type=int, default=1, help='Detection workers for --suite')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CANDIDATE'),
+                        help='Compare two --suite JSON result files')
+    parser.add_argument('--threshold', type=float, default=5.0,
+                        help='Percent change reported as a regression by --compare')
+    parser.add_argument('--json', help='Optional path to write the results as JSON')
+    args = parser.parse_args()
+
+    logging.getLogger('image_processor').setLevel(logging.WARNING)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            candidate = json.load(f)
+        comparison = compare_suite_results(baseline, candidate, args.threshold)
+        print_comparison_table(comparison)
+        write_json(comparison, args.json)
+        sys.exit(1 if comparison['regressions'] else 0)
+
+    work_dir = Path(tempfile.mkdtemp(prefix='eye_benchmark_'))
+    try:
+        if args.suite:
+            results = run_suite(args.images, work_dir, args.sets, max(args.repeats, 3), args.workers)
+            print_suite_table(results)
+            write_json(results, args.json)
+            return
+
+        if args.group:
+            image_paths = prepare_group_images(args.images, work_dir / 'images')
+        else:
+            image_paths = prepare_images(args.images, work_dir / 'images', args.upscale)
+        results = compare_variants(VARIANT_SETS[args.variants], image_paths,
+                                   work_dir / 'output', args.repeats)
+        print_table(results)
+        write_json(results, args.json)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Pipeline Metrics Benchmark for Experimental Theatre Digital Program
+
+This module handles:
+- Per-stage latency histograms (pipeline_metrics) over the test images
+- Cost of the stage instrumentation itself: image latency with metrics
+  enabled and disabled, and the time of one stage_timer call
+
+Usage:
+    python pipeline_metrics_benchmark.py --repeats 5
+    python pipeline_metrics_benchmark.py --upscale 1 --json stage_metrics.json
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import argparse
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmark_fixtures import DEFAULT_IMAGES_DIR, make_processor, prepare_images, write_json
+from pipeline_metrics import get_pipeline_metrics, reset_pipeline_metrics, set_metrics_enabled, stage_timer
+
+
+def benchmark_stage_metrics(image_paths, output_dir, repeats=3, timer_calls=200000):
+    """
+    Per-stage histograms over the image set, and the instrumentation overhead
+
+    Runs the images with metrics enabled and disabled (interleaved per
+    repeat to share drift) and times stage_timer itself in both states.
+    """
+    processor = make_processor(output_dir, 'stage_metrics')
+
+    timings = {True: [], False: []}
+    reset_pipeline_metrics()
+    stages = {}
+    for _ in range(repeats):
+        for enabled in (True, False):
+            set_metrics_enabled(enabled)
+            for image_path in image_paths:
+                start_time = time.perf_counter()
+                processor.process_image(image_path)
+                timings[enabled].append(time.perf_counter() - start_time)
+    set_metrics_enabled(True)
+    stages = get_pipeline_metrics()['stages']
+    processor.stop_monitoring()
+
+    timer_cost = {}
+    for enabled in (True, False):
+        set_metrics_enabled(enabled)
+        start_time = time.perf_counter()
+        for _ in range(timer_calls):
+            with stage_timer('benchmark_overhead'):
+                pass
+        timer_cost['enabled' if enabled else 'disabled'] = round(
+            (time.perf_counter() - start_time) * 1e9 / timer_calls, 1)
+    set_metrics_enabled(True)
+    reset_pipeline_metrics()
+
+    timers_per_image = sum(stage['count'] for name, stage in stages.items()
+                           if not name.startswith('crop_')) / max(1, len(timings[True]))
+    return {
+        'images': len(image_paths),
+        'repeats': repeats,
+        'stages': stages,
+        'mean_image_ms': {
+            'enabled': round(statistics.mean(timings[True]) * 1000, 2),
+            'disabled': round(statistics.mean(timings[False]) * 1000, 2)
+        },
+        'timer_ns': timer_cost,
+        'timers_per_image': round(timers_per_image, 1)
+    }
+
+
+def print_stage_metrics_table(results):
+    """Print the per-stage histograms and instrumentation overhead"""
+    print(f"{'stage':<18}{'count':>7}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, stage in sorted(results['stages'].items(), key=lambda item: -item[1]['total_ms']):
+        print(f"{name:<18}{stage['count']:>7}{stage['mean_ms']:>10.3f}{stage['p50_ms']:>10.3f}"
+              f"{stage['p95_ms']:>10.3f}{stage['p99_ms']:>10.3f}{stage['max_ms']:>10.3f}")
+    print(f"mean image: {results['mean_image_ms']['enabled']} ms enabled, "
+          f"{results['mean_image_ms']['disabled']} ms disabled")
+    print(f"stage_timer: {results['timer_ns']['enabled']} ns enabled, {results['timer_ns']['disabled']} ns disabled, "
+          f"~{results['timers_per_image']} timers per image")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Print per-stage latency histograms and instrumentation overhead')
+    parser.add_argument('--images', default=str(DEFAULT_IMAGES_DIR), help='Directory of benchmark images')
+    parser.add_argument('--upscale', type=float, default=4.0,
+                        help='Upscale factor to simulate full camera frames (4 ~ 13-15 MP)')
+    parser.add_argument('--repeats', type=int, default=3, help='Passes over the image set per state')
+    parser.add_argument('--json', help='Optional path to write the results as JSON')
+    args = parser.parse_args()
+
+    logging.getLogger('image_processor').setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory(prefix='eye_benchmark_') as work_dir:
+        work_dir = Path(work_dir)
+        image_paths = prepare_images(args.images, work_dir / 'images', args.upscale)
+        results = benchmark_stage_metrics(image_paths, work_dir / 'output', args.repeats)
+    print_stage_metrics_table(results)
+    write_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+QoS Benchmark for Experimental Theatre Digital Program
+
+This module handles:
+- Live latency while images arrive faster than full-quality detection runs
+- Comparison of static detection parameters with the QoS controller
+
+Usage:
+    python qos_benchmark.py --arrival-interval 0.2
+    python qos_benchmark.py --arrivals 120 --target-latency 0.5
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from benchmark_fixtures import (DEFAULT_IMAGES_DIR, make_processor, percentile, prepare_images,
+                                write_json)
+
+
+def benchmark_qos(image_paths, work_dir, arrivals=60, arrival_interval=0.2, target_latency=1.0):
+    """
+    Live latency while images arrive faster than full-quality detection runs
+
+    Every arrival is a live submission; latency runs from submission to the
+    detection result. The controller uses a 1 s dwell so it reacts within
+    the run.
+    """
+    work_dir = Path(work_dir)
+    results = {}
+
+    for mode in ('static', 'qos'):
+        processor = make_processor(work_dir, mode)
+        qos = processor.qos if mode == 'qos' else None
+        processor.qos = qos
+        if qos is not None:
+            qos.target_latency = target_latency
+            qos.min_dwell = 1.0
+            qos.start()
+
+        latencies = []
+        eyes = [0]
+
+        def on_done(future, submitted_at):
+            latencies.append(time.perf_counter() - submitted_at)
+            result = future.result()
+            eyes[0] += len(result['eyes']) if result else 0
+
+        start_time = time.perf_counter()
+        futures = []
+        for i in range(arrivals):
+            submitted_at = time.perf_counter()
+            future = processor.submit_image(image_paths[i % len(image_paths)], live=True)
+            future.add_done_callback(lambda f, t=submitted_at: on_done(f, t))
+            futures.append(future)
+            time.sleep(arrival_interval)
+        for future in futures:
+            future.result()
+        duration = time.perf_counter() - start_time
+
+        qos_stats = processor.get_qos_stats()
+        processor.stop_monitoring()
+        results[mode] = {
+            'arrivals': arrivals,
+            'duration_s': round(duration, 2),
+            'p50_latency_ms': round(percentile(latencies, 50) * 1000, 1),
+            'p95_latency_ms': round(percentile(latencies, 95) * 1000, 1),
+            'max_latency_ms': round(max(latencies) * 1000, 1),
+            'eyes_found': eyes[0],
+            'profile_changes': [f"{change['previous_profile']}->{change['profile']}"
+                                for change in qos_stats['recent_changes']] if qos_stats and qos else []
+        }
+
+    return results
+
+
+def print_qos_table(results):
+    """Print the QoS comparison"""
+    print(f"{'mode':<10}{'arrivals':>9}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'eyes':>6}  profile changes")
+    for name, result in results.items():
+        print(f"{name:<10}{result['arrivals']:>9}{result['p50_latency_ms']:>10}{result['p95_latency_ms']:>10}"
+              f"{result['max_latency_ms']:>10}{result['eyes_found']:>6}  {', '.join(result['profile_changes'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare live latency under overload with and without QoS')
+    parser.add_argument('--images', default=str(DEFAULT_IMAGES_DIR), help='Directory of benchmark images')
+    parser.add_argument('--upscale', type=float, default=4.0,
+                        help='Upscale factor to simulate full camera frames (4 ~ 13-15 MP)')
+    parser.add_argument('--arrivals', type=int, default=60, help='Live images submitted')
+    parser.add_argument('--arrival-interval', type=float, default=0.2, help='Seconds between arrivals')
+    parser.add_argument('--target-latency', type=float, default=1.0, help='QoS target latency in seconds')
+    parser.add_argument('--json', help='Optional path to write the results as JSON')
+    args = parser.parse_args()
+
+    logging.getLogger('image_processor').setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory(prefix='eye_benchmark_') as work_dir:
+        work_dir = Path(work_dir)
+        image_paths = prepare_images(args.images, work_dir / 'images', args.upscale)
+        results = benchmark_qos(image_paths, work_dir / 'output', args.arrivals, args.arrival_interval,
+                                args.target_latency)
+    print_qos_table(results)
+    write_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Detection Quality-of-Service Controller for Experimental Theatre Digital Program
+
+This module handles:
+- Tracking end-to-end latency of live images and per-image detection time
+- Projecting the latency of the next live arrival from the live queue depth
+- Stepping through progressively cheaper detection_params profiles when the
+  projection exceeds the target, and back again once load subsides
+- A status event for every profile change
+
+Profiles are override dictionaries applied on top of the baseline
+detection_params, ordered from full quality to cheapest. The controller
+moves one level per decision and waits at least min_dwell seconds between
+changes, so a single slow image does not make it oscillate.
+
+The controller never modifies detection_params. It publishes the active
+profile's overrides as an immutable mapping (profile_params), replaced by a
+single assignment on every change; the image processor reads it once per
+image, so no image sees a mix of two profiles.
+
+Author: AI Assistant
+Date: January 2025
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from types import MappingProxyType
+from typing import Callable, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QOS_EVENT = 'detection_qos'
+
+# Full quality first; every later profile should be cheaper than the previous one
+DEFAULT_PROFILES = [
+    {'name': 'full', 'params': {}},
+    {'name': 'fast', 'params': {'face_scale_factor': 1.2, 'detection_max_dimension': 960,
+                                'detection_time_budget': 0.5}},
+    {'name': 'fastest', 'params': {'face_scale_factor': 1.3, 'detection_max_dimension': 640,
+                                   'eye_scale_factor': 1.1, 'tiered_detection': False}}
+]
+
+
+class QoSController:
+    def __init__(self, queue_depth_fn: Callable, num_workers: int = 1,
+                 profiles: Optional[List[Dict]] = None, target_latency: float = 1.0,
+                 recover_ratio: float = 0.5, min_dwell: float = 3.0, window: float = 10.0,
+                 interval: float = 0.5, emit_fn: Optional[Callable] = None):
+        """
+        Initialize the controller
+
+        Args:
+            queue_depth_fn: Callable returning the number of live images waiting for a worker
+            num_workers: Number of detection workers draining the queue
+            profiles: List of {'name', 'params'} from full quality to cheapest
+            target_latency: Seconds from arrival to saved eyes to stay under
+            recover_ratio: Step back to a better profile below target_latency * recover_ratio
+            min_dwell: Minimum seconds between profile changes
+            window: Seconds of live latency samples considered
+            interval: Seconds between decisions
+            emit_fn: Optional callable(event, payload), e.g. socketio.emit
+        """
+        self.queue_depth_fn = queue_depth_fn
+        self.num_workers = max(1, num_workers)
+        self.profiles = profiles or DEFAULT_PROFILES
+        self.target_latency = target_latency
+        self.recover_ratio = recover_ratio
+        self.min_dwell = min_dwell
+        self.window = window
+        self.interval = interval
+        self.emit_fn = emit_fn
+
+        self._lock = threading.Lock()
+        self._latencies = deque()  # (completed_at, seconds) of live images
+        self._service_time: Optional[float] = None  # Moving average per profile level
+        self.level = 0
+        self.profile_params = MappingProxyType(dict(self.profiles[0]['params']))
+        self._last_change = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.changes = deque(maxlen=50)
+        self.change_count = 0
+
+    def start(self):
+        """Start the decision thread"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._control_loop, name='detection-qos', daemon=True)
+        self._thread.start()
+        logger.info(f"Started detection QoS controller (target {self.target_latency:.2f}s)")
+
+    def stop(self, restore: bool = True):
+        """Stop the decision thread and optionally restore the full quality profile"""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        if restore and self.level != 0:
+            self._apply_level(0, 'stopped', None)
+
+    def record_latency(self, seconds: float):
+        """Record the end-to-end latency of a live image (queued to eyes saved)"""
+        now = time.perf_counter()
+        with self._lock:
+            self._latencies.append((now, seconds))
+
+    def record_service_time(self, seconds: float):
+        """Record the detection time of one image under the current profile"""
+        with self._lock:
+            if self._service_time is None:
+                self._service_time = seconds
+            else:
+                self._service_time = 0.8 * self._service_time + 0.2 * seconds
+
+    def _control_loop(self):
+        """Decision thread main loop"""
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.evaluate()
+            except Exception as e:
+                logger.error(f"Error in detection QoS controller: {e}")
+
+    def _observe(self, now: float) -> Dict:
+        """Current recent latency, live queue depth and projected latency"""
+        with self._lock:
+            while self._latencies and now - self._latencies[0][0] > self.window:
+                self._latencies.popleft()
+            recent = [seconds for _, seconds in self._latencies]
+            service_time = self._service_time
+
+        depth = self.queue_depth_fn()
+        # A new arrival waits for the queued live images, then runs itself
+        projected = (depth / self.num_workers + 1) * (service_time or 0.0)
+        observed = max(recent) if recent else 0.0
+        return {
+            'queue_depth': depth,
+            'observed_latency': observed,
+            'projected_latency': projected,
+            'service_time': service_time
+        }
+
+    def evaluate(self):
+        """Make one decision: degrade, recover or hold the current profile"""
+        now = time.perf_counter()
+        if now - self._last_change < self.min_dwell:
+            return
+
+        observation = self._observe(now)
+        if observation['service_time'] is None and observation['queue_depth'] > 0:
+            return  # No detection timed under this profile yet
+
+        load = max(observation['observed_latency'], observation['projected_latency'])
+
+        if load > self.target_latency and self.level < len(self.profiles) - 1:
+            self._apply_level(self.level + 1, 'overloaded', observation)
+        elif load < self.target_latency * self.recover_ratio and self.level > 0:
+            self._apply_level(self.level - 1, 'recovered', observation)
+
+    def _apply_level(self, level: int, reason: str, observation: Optional[Dict]):
+        """Publish the overrides of the given profile level and announce it"""
+        previous = self.profiles[self.level]['name']
+
+        # One reference swap: readers see either the old or the new profile, never a mix
+        self.profile_params = MappingProxyType(dict(self.profiles[level]['params']))
+
+        with self._lock:
+            self.level = level
+            self._last_change = time.perf_counter()
+            # Detection time under the old profile no longer predicts the new one
+            self._service_time = None
+            self._latencies.clear()
+
+        event = {
+            'profile': self.profiles[level]['name'],
+            'previous_profile': previous,
+            'level': level,
+            'reason': reason,
+            'target_latency_ms': round(self.target_latency * 1000, 1),
+            'timestamp': datetime.now().isoformat()
+        }
+        if observation is not None:
+            event.update({
+                'queue_depth': observation['queue_depth'],
+                'observed_latency_ms': round(observation['observed_latency'] * 1000, 1),
+                'projected_latency_ms': round(observation['projected_latency'] * 1000, 1)
+            })
+        self.changes.append(event)
+        self.change_count += 1
+        logger.info(f"Detection profile {previous} -> {event['profile']} ({reason})")
+
+        if self.emit_fn is not None:
+            try:
+                self.emit_fn(QOS_EVENT, event)
+            except Exception as e:
+                logger.error(f"Error emitting {QOS_EVENT}: {e}")
+
+    def get_stats(self) -> Dict:
+        """Get the active profile, current load and recent profile changes"""
+        observation = self._observe(time.perf_counter())
+        return {
+            'profile': self.profiles[self.level]['name'],
+            'level': self.level,
+            'target_latency_ms': round(self.target_latency * 1000, 1),
+            'queue_depth': observation['queue_depth'],
+            'observed_latency_ms': round(observation['observed_latency'] * 1000, 1),
+            'projected_latency_ms': round(observation['projected_latency'] * 1000, 1),
+            'changes': self.change_count,
+            'recent_changes': list(self.changes)[-10:]
+        }
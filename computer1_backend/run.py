@@ -3,7 +3,8 @@
 Simple script to run the Experimental Theatre Digital Program Server
 """
 
-from main_server import app, socketio, startup_sequence, BASE_DIR, DATA_DIR, CROPPED_EYES_DIR, ORIGINALS_DIR
+from main_server import (app, socketio, startup_sequence, stop_services, BASE_DIR, DATA_DIR, CROPPED_EYES_DIR,
+                         ORIGINALS_DIR)
 import sys
 import os
 import threading
@@ -34,20 +35,38 @@ def cleanup_on_shutdown():
             os.remove(import_history_file)
             print(f"✓ Cleared import history: {import_history_file}")
         
+        # Clear detection result cache
+        detection_cache_file = os.path.join(DATA_DIR, 'detection_cache.json')
+        if os.path.exists(detection_cache_file):
+            os.remove(detection_cache_file)
+            print(f"✓ Cleared detection cache: {detection_cache_file}")
+        
+        # Clear startup backlog checkpoint
+        backlog_checkpoint_file = os.path.join(DATA_DIR, 'backlog_checkpoint.json')
+        if os.path.exists(backlog_checkpoint_file):
+            os.remove(backlog_checkpoint_file)
+            print(f"✓ Cleared backlog checkpoint: {backlog_checkpoint_file}")
+        
+        # Clear eye texture atlases
+        atlas_dir = os.path.join(DATA_DIR, 'atlases')
+        if os.path.exists(atlas_dir):
+            shutil.rmtree(atlas_dir)
+            print(f"✓ Cleared eye atlases: {atlas_dir}")
+        
         print("✓ Cleanup completed successfully")
         
     except Exception as e:
         print(f"✗ Error during cleanup: {e}")
 
+def shutdown():
+    """Stop every service, then clean up (last, so no stopping service writes state back)"""
+    stop_services()
+    cleanup_on_shutdown()
+
 def signal_handler(signum, frame):
     """Handle shutdown signals"""
     print(f"\nReceived signal {signum}, shutting down...")
-    cleanup_on_shutdown()
-    
-    # Stop image processor if it exists
-    from main_server import image_processor
-    if image_processor:
-        image_processor.stop_monitoring()
+    shutdown()
     
     print("Server stopped by signal")
     sys.exit(0)
@@ -68,7 +87,7 @@ def main():
     # Register cleanup handlers
     signal.signal(signal.SIGINT, signal_handler)  # Ctrl+C
     signal.signal(signal.SIGTERM, signal_handler)  # Termination signal
-    atexit.register(cleanup_on_shutdown)  # Normal exit
+    atexit.register(shutdown)  # Normal exit
     
     # Create data directories if they don't exist (same as main_server.py)
     os.makedirs(CROPPED_EYES_DIR, exist_ok=True)
@@ -91,16 +110,12 @@ def main():
         )
     except KeyboardInterrupt:
         print("\nShutting down server...")
-        cleanup_on_shutdown()
-        # Import here to avoid circular imports
-        from main_server import image_processor
-        if image_processor:
-            image_processor.stop_monitoring()
+        shutdown()
         print("Server stopped by user")
         sys.exit(0)
     except Exception as e:
         print(f"Error starting server: {e}")
-        cleanup_on_shutdown()
+        shutdown()
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -2563,6 +2563,7 @@ class TheatreClient {
         this.particleSystem = null;
         this.shapeManager = null; // New shape manager for eye-textured shapes
         this.eyeShapes = []; // Legacy - keeping for compatibility
+        this.atlasSheets = new Map(); // Atlas sheet URL -> Promise of the loaded sheet image
         this.visualPhase = 1; // 1: particles only, 2: particles + shapes, 3: convergence, 4: dispersion, 5: portal departure
         this.lastTime = 0;
         
@@ -2872,6 +2873,39 @@ class TheatreClient {
             this.addDebugMessage(`${messagePrefix} eye image: ${data.filename}`);
         });
 
+        // Batched eye images: one message per source image (or flush interval), grouped by face
+        this.socket.on('new_eye_images', (data) => {
+            console.log('New eye images available:', data);
+            const eyes = data.images.flatMap((image) => image.faces.flatMap((face) => face.eyes));
+            if (data.existing) {
+                // Existing eyes come out of the texture atlas sheets: one request per sheet, not per eye
+                Promise.all(eyes.map((eye) => this.resolveEyeImageUrl(eye))).then((urls) => {
+                    eyes.forEach((eye, index) => {
+                        this.displayEyeImage(eye.filename, urls[index], true);
+                    });
+                });
+            } else {
+                eyes.forEach((eye) => {
+                    this.displayEyeImage(eye.filename, eye.url, false);
+                });
+            }
+
+            const messagePrefix = data.existing ? 'Loaded existing' : 'New';
+            this.addDebugMessage(`${messagePrefix} eye images: ${data.count} from ${data.images.length} image(s)`);
+        });
+
+        // Detection quality profile switched by the server under load
+        this.socket.on('detection_qos', (data) => {
+            console.log('Detection profile changed:', data);
+            const level = data.reason === 'overloaded' ? 'warning' : 'info';
+            this.addDebugMessage(`Detection profile ${data.previous_profile} → ${data.profile} (${data.reason})`, level);
+        });
+
+        // Debug: per-stage pipeline latency histograms (socket.emit('request_pipeline_metrics'))
+        this.socket.on('pipeline_metrics', (data) => {
+            console.table(data.stages);
+        });
+
         this.socket.on('trigger_final_animation', (data) => {
             console.log('Trigger final animation received:', data);
             this.triggerFinalAnimation();
@@ -3273,6 +3307,38 @@ class TheatreClient {
         console.log(`Created ${this.animationMeshes.length} placeholder meshes`);
     }
 
+    loadAtlasSheet(url) {
+        if (!this.atlasSheets.has(url)) {
+            this.atlasSheets.set(url, new Promise((resolve, reject) => {
+                const sheet = new Image();
+                sheet.onload = () => resolve(sheet);
+                sheet.onerror = reject;
+                sheet.src = url;
+            }));
+        }
+        return this.atlasSheets.get(url);
+    }
+
+    async resolveEyeImageUrl(eye) {
+        // Cut the eye out of its atlas sheet; fall back to the crop URL without an atlas entry
+        if (!eye.atlas) {
+            return eye.url;
+        }
+        try {
+            const sheet = await this.loadAtlasSheet(eye.atlas.url);
+            const canvas = document.createElement('canvas');
+            canvas.width = eye.atlas.width;
+            canvas.height = eye.atlas.height;
+            canvas.getContext('2d').drawImage(sheet, eye.atlas.x, eye.atlas.y, eye.atlas.width, eye.atlas.height,
+                                              0, 0, eye.atlas.width, eye.atlas.height);
+            return canvas.toDataURL('image/jpeg', 0.92);
+        } catch (error) {
+            console.warn(`Atlas sheet ${eye.atlas.url} unavailable, loading ${eye.url}`, error);
+            this.atlasSheets.delete(eye.atlas.url);
+            return eye.url;
+        }
+    }
+
     displayEyeImage(filename, url, existing = false) {
         console.log(`Displaying eye image: ${filename}`);
         
@@ -4670,6 +4736,12 @@ class TheatreClient {
         if (monitoringStatus) {
             monitoringStatus.textContent = data.monitoring_active ? 'Active' : 'Inactive';
             monitoringStatus.className = data.monitoring_active ? 'status-ready' : 'status-error';
+
+            // Existing originals are processed in the background after monitoring starts
+            const backlog = data.backlog;
+            if (data.monitoring_active && backlog && backlog.state === 'running' && backlog.total) {
+                monitoringStatus.textContent = `Active (backlog ${backlog.percent || 0}%)`;
+            }
         }
 
         // Update SD card monitor status
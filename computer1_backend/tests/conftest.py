@@ -0,0 +1,11 @@
+"""
+Test configuration for Experimental Theatre Digital Program
+
+The backend modules are flat scripts imported by name (``from eye_filters
+import ...``), so the backend directory is put on sys.path for the tests.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
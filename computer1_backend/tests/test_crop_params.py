@@ -0,0 +1,40 @@
+"""
+Tests that eye crops follow the per-image detection parameter snapshot
+"""
+
+from types import MappingProxyType
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from image_processor import ImageProcessor
+
+
+@pytest.fixture
+def processor(tmp_path):
+    processor = ImageProcessor(originals_dir=tmp_path / 'originals',
+                               cropped_eyes_dir=tmp_path / 'eyes', num_workers=1)
+    processor.atlas_builder = None
+    yield processor
+    processor.worker_pool.stop()
+
+
+def crop_size(processor, filename):
+    with Image.open(processor.cropped_eyes_dir / filename) as img:
+        return img.size
+
+
+def test_crops_follow_qos_profile_snapshot(processor):
+    eye_img = np.random.default_rng(0).integers(0, 255, size=(80, 160, 3), dtype=np.uint8)
+    assert processor.detection_params['max_dimension'] == 120
+
+    processor.qos.profile_params = MappingProxyType({'max_dimension': 60, 'crop_variant_sizes': []})
+    filename, variants = processor._save_eye_image_with_variants(eye_img, params=processor.get_detection_params())
+    assert crop_size(processor, filename) == (60, 30)
+    assert len(variants) == 1
+
+    # The same thread's pipeline goes back to the base parameters
+    filename, variants = processor._save_eye_image_with_variants(eye_img)
+    assert crop_size(processor, filename) == (120, 60)
+    assert [variant['size'] for variant in variants] == [32, 64, 120]
@@ -0,0 +1,26 @@
+"""
+Tests for DetectionCache content hashing
+"""
+
+import os
+import time
+
+from detection_cache import DetectionCache
+
+
+def test_content_hash_follows_copy_over_with_kept_mtime(tmp_path):
+    cache = DetectionCache(tmp_path / 'cache.json', tmp_path)
+    path = tmp_path / 'frame.jpg'
+    path.write_bytes(b'a' * 1024)
+    first = cache.content_hash(path)
+    assert cache.content_hash(path) == first
+
+    stat = path.stat()
+    time.sleep(0.05)  # next ctime tick
+    with open(path, 'r+b') as f:
+        f.write(b'b' * 1024)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    second = cache.content_hash(path)
+    assert second != first
+    assert cache.content_hash(path) == second
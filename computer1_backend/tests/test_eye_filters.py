@@ -0,0 +1,85 @@
+"""
+Tests for the scalar and vectorized eye filters and their dispatch
+"""
+
+import numpy as np
+import pytest
+
+import eye_filters
+from eye_filters import (VECTORIZE_MIN_CANDIDATES, filter_eye_boxes, filter_eye_boxes_scalar,
+                         filter_eye_boxes_vectorized)
+from eye_filters_benchmark import reference_filter_eye_detections, synthetic_eye_candidates
+
+FILTERS = [filter_eye_boxes_scalar, filter_eye_boxes_vectorized, filter_eye_boxes]
+
+PARAMS = {'quality_threshold': 55, 'max_eyes_per_face': 3, 'eye_position_filter': False}
+POSITION_PARAMS = dict(PARAMS, eye_position_filter=True, upper_face_ratio=0.7)
+
+
+@pytest.mark.parametrize('filter_fn', FILTERS)
+def test_area_threshold_overlap_and_cap(filter_fn):
+    eyes = [
+        (10, 10, 20, 20),    # kept (largest, first of the tie)
+        (12, 12, 18, 18),    # dropped: lies inside the first box
+        (60, 10, 20, 20),    # kept (largest, second of the tie)
+        (5, 5, 5, 5),        # dropped: area 25 below quality_threshold
+        (100, 100, 10, 10),  # kept
+        (200, 200, 8, 8),    # dropped: max_eyes_per_face reached
+    ]
+    assert filter_fn(eyes, PARAMS) == [(10, 10, 20, 20), (60, 10, 20, 20), (100, 100, 10, 10)]
+
+
+@pytest.mark.parametrize('filter_fn', FILTERS)
+def test_position_filter_drops_lower_face(filter_fn):
+    eyes = [(10, 10, 20, 20), (60, 12, 20, 20), (30, 80, 20, 20)]
+    assert filter_fn(eyes, POSITION_PARAMS) == [(10, 10, 20, 20), (60, 12, 20, 20)]
+    assert filter_fn(eyes, PARAMS) == eyes
+
+
+@pytest.mark.parametrize('filter_fn', FILTERS)
+def test_returns_python_int_tuples(filter_fn):
+    eyes = np.array([[10, 10, 20, 20], [60, 10, 20, 20]], dtype=np.int32)
+    result = filter_fn(eyes, PARAMS)
+    assert result == [(10, 10, 20, 20), (60, 10, 20, 20)]
+    assert all(type(v) is int for box in result for v in box)
+
+
+@pytest.mark.parametrize('filter_fn', FILTERS)
+@pytest.mark.parametrize('eyes', [[], (), np.empty((0, 4), dtype=np.int32)])
+def test_empty_input(filter_fn, eyes):
+    assert filter_fn(eyes, PARAMS) == []
+    assert filter_fn(eyes, POSITION_PARAMS) == []
+
+
+@pytest.mark.parametrize('filter_fn', FILTERS)
+def test_all_below_area_threshold(filter_fn):
+    eyes = [(0, 0, 5, 5), (20, 20, 7, 7)]
+    assert filter_fn(eyes, PARAMS) == []
+    assert filter_fn(eyes, POSITION_PARAMS) == []
+
+
+@pytest.mark.parametrize('params', [PARAMS, POSITION_PARAMS], ids=['plain', 'position'])
+@pytest.mark.parametrize('count', [1, 2, 5, 12, VECTORIZE_MIN_CANDIDATES - 1, VECTORIZE_MIN_CANDIDATES, 80])
+def test_filters_match_reference_loops(count, params):
+    for eyes in synthetic_eye_candidates(count, num_sets=25, seed=count):
+        expected = reference_filter_eye_detections([tuple(int(v) for v in box) for box in eyes], params)
+        assert filter_eye_boxes_scalar(eyes, params) == expected
+        assert filter_eye_boxes_vectorized(eyes, params) == expected
+        assert filter_eye_boxes(eyes, params) == expected
+
+
+@pytest.mark.parametrize('count, expected', [
+    (0, 'scalar'),
+    (VECTORIZE_MIN_CANDIDATES - 1, 'scalar'),
+    (VECTORIZE_MIN_CANDIDATES, 'vectorized'),
+    (VECTORIZE_MIN_CANDIDATES + 1, 'vectorized'),
+])
+def test_dispatch_boundary(monkeypatch, count, expected):
+    assert VECTORIZE_MIN_CANDIDATES == 32
+
+    calls = []
+    monkeypatch.setattr(eye_filters, 'filter_eye_boxes_scalar', lambda eyes, params: calls.append('scalar'))
+    monkeypatch.setattr(eye_filters, 'filter_eye_boxes_vectorized', lambda eyes, params: calls.append('vectorized'))
+
+    eye_filters.filter_eye_boxes([(i * 30, 0, 20, 20) for i in range(count)], PARAMS)
+    assert calls == [expected]
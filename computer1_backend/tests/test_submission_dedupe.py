@@ -0,0 +1,171 @@
+"""
+Tests for submission deduplication: ImageProcessor.submit_image claims and
+the IngestQueue dispatch history
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from backlog_checkpoint import file_signature
+from image_processor import ImageProcessor
+from ingest_queue import IngestQueue
+
+
+class FakeDetector:
+    """Stands in for process_image; jobs block until release() is called"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, image_path):
+        with self._lock:
+            self.calls.append(image_path.name)
+        self.gate.wait(10)
+        return {'eyes': [], 'eye_filenames': [], 'detection_seconds': 0.0}
+
+    def release(self):
+        self.gate.set()
+
+
+@pytest.fixture
+def processor(tmp_path):
+    processor = ImageProcessor(originals_dir=tmp_path / 'originals',
+                               cropped_eyes_dir=tmp_path / 'eyes', num_workers=1)
+    processor.detector = FakeDetector()
+    processor.worker_pool.process_fn = processor.detector
+    yield processor
+    processor.detector.release()
+    processor.worker_pool.stop()
+
+
+def write_image(path, payload=b'a'):
+    path.write_bytes(payload * 1024)
+    return path
+
+
+def copy_over(path, payload):
+    """Overwrite a file in place with same-size content, keeping its mtime"""
+    stat = path.stat()
+    # ctime has clock-tick granularity; make sure the rewrite lands on a later tick
+    time.sleep(0.05)
+    with open(path, 'r+b') as f:
+        f.write(payload * stat.st_size)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def wait_for_claims_released(processor, timeout=5.0):
+    deadline = time.time() + timeout
+    while processor._claims:
+        assert time.time() < deadline, "claims were not released"
+        time.sleep(0.01)
+
+
+def test_copy_over_changes_file_signature(tmp_path):
+    path = write_image(tmp_path / 'frame.png')
+    before = file_signature(path)
+    copy_over(path, b'b')
+    after = file_signature(path)
+
+    assert before[:2] == after[:2]
+    assert before != after
+    assert file_signature(tmp_path / 'missing.png') is None
+
+
+def test_concurrent_submits_share_one_job(processor):
+    path = write_image(processor.originals_dir / 'frame.png')
+    barrier = threading.Barrier(8)
+    futures = []
+
+    def submit():
+        barrier.wait()
+        futures.append(processor.submit_image(path))
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(future) for future in futures}) == 1
+    processor.detector.release()
+    futures[0].result(timeout=5)
+    wait_for_claims_released(processor)
+    assert processor.detector.calls == ['frame.png']
+
+
+def test_resubmit_after_completion_runs_again(processor):
+    path = write_image(processor.originals_dir / 'frame.png')
+    processor.detector.release()
+
+    first = processor.submit_image(path)
+    first.result(timeout=5)
+    wait_for_claims_released(processor)
+
+    second = processor.submit_image(path)
+    assert second is not first
+    second.result(timeout=5)
+    wait_for_claims_released(processor)
+    assert processor.detector.calls == ['frame.png', 'frame.png']
+
+
+def test_copy_over_with_same_size_and_mtime_is_submitted_again(processor):
+    path = write_image(processor.originals_dir / 'frame.png')
+    first = processor.submit_image(path)
+
+    copy_over(path, b'b')
+    second = processor.submit_image(path)
+    assert second is not first
+
+    processor.detector.release()
+    first.result(timeout=5)
+    second.result(timeout=5)
+    wait_for_claims_released(processor)
+    assert processor.detector.calls == ['frame.png', 'frame.png']
+
+
+def test_live_submit_moves_queued_backlog_image(processor):
+    blocker = write_image(processor.originals_dir / 'blocker.png')
+    path = write_image(processor.originals_dir / 'frame.png')
+    processor.submit_image(blocker)
+    deadline = time.time() + 5
+    while not processor.detector.calls:  # the only worker is now busy
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+    backlog = processor.submit_image(path, live=False)
+    assert processor.submit_image(path, live=False) is backlog
+    live = processor.submit_image(path, live=True)
+    assert live is not backlog
+    assert backlog.cancelled()
+
+    processor.detector.release()
+    live.result(timeout=5)
+    wait_for_claims_released(processor)
+    assert processor.detector.calls == ['blocker.png', 'frame.png']
+
+
+def test_ingest_queue_drops_late_duplicates_but_not_copies(tmp_path):
+    dispatched = []
+    ingest = IngestQueue(dispatched.append, settle_time=0.0)
+    path = write_image(tmp_path / 'frame.png')
+
+    ingest.offer(path, closed=True)
+    ingest.check_pending()
+    assert dispatched == [path]
+
+    # Late event for the unchanged file
+    ingest.offer(path, closed=True)
+    ingest.check_pending()
+    assert dispatched == [path]
+    assert ingest.stats['deduplicated'] == 1
+
+    # Same size and mtime, new content
+    copy_over(path, b'b')
+    ingest.offer(path, closed=True)
+    ingest.check_pending()
+    assert dispatched == [path, path]